@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+
+"""Benchmark suite for the data pipeline and the inference hot paths.
+
+Generates synthetic SST / chlorophyll / currents CSVs on a regular grid over the Sri Lanka bounding
+box (`--days` x grid cells at `--grid-step` degrees), runs the pipeline on them and times each stage:
+
+  merge          merge_datasets.py (exact join)               subprocess: wall time, peak RSS
+  label          create_final_dataset.py --skip-bathymetry    subprocess: wall time, peak RSS
+  land_mask      keep_sea_rows_in_sri_lanka_bbox              in-process: median time, peak traced memory
+  train          train_random_forest.py (+ compiled export)   subprocess: wall time, peak RSS
+  predict_single RowScorer, one row at a time (.pkl, .forest) in-process: median per-row latency
+  predict_batch  predict_batch on the labeled dataset          in-process: median time, peak traced memory
+
+Results go to a JSON file. Compare against a saved baseline to catch regressions:
+
+  python benchmarks/pipeline_bench.py --days 30 --output bench.json --save-baseline benchmarks/pipeline_baseline.json
+  python benchmarks/pipeline_bench.py --days 30 --baseline benchmarks/pipeline_baseline.json --max-regression 0.25
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+
+TRAIN_DIR = Path(__file__).resolve().parent.parent
+if str(TRAIN_DIR) not in sys.path:
+    sys.path.insert(0, str(TRAIN_DIR))
+
+from land_mask import SRI_LANKA_BBOX, keep_sea_rows_in_sri_lanka_bbox  # noqa: E402
+
+
+CASES = ("merge", "label", "land_mask", "train", "predict_single", "predict_batch")
+SINGLE_ROWS = 200
+
+
+def synthetic_sources(out_dir: Path, *, days: int, grid_step: float, seed: int) -> int:
+    """Write sst.csv, chlorophyll.csv and currents.csv shaped like the real products; returns rows per source."""
+    rng = np.random.default_rng(seed)
+    bbox = SRI_LANKA_BBOX
+    lats = np.round(np.arange(bbox.lat_min, bbox.lat_max + 1e-9, grid_step), 4)
+    lons = np.round(np.arange(bbox.lon_min, bbox.lon_max + 1e-9, grid_step), 4)
+    lat, lon = (a.ravel() for a in np.meshgrid(lats, lons, indexing="ij"))
+    n_cells = len(lat)
+
+    dates = pd.date_range("2020-01-01", periods=days, freq="D")
+    time = np.repeat(dates.strftime("%Y-%m-%d").to_numpy(), n_cells)
+    day = np.repeat(np.arange(days), n_cells)
+    lat_all, lon_all = np.tile(lat, days), np.tile(lon, days)
+    n = len(time)
+
+    # Smooth seasonal/latitudinal structure plus noise, in the ranges of the real data.
+    sst = 28.0 + 0.8 * np.sin(2 * np.pi * day / 365) - 0.3 * (lat_all - 8.0) + rng.normal(0, 0.8, n)
+    coast = np.hypot(lat_all - 7.8, (lon_all - 80.7) * 1.3)
+    chlor_a = np.exp(rng.normal(np.log(0.15) + 0.8 * np.exp(-coast), 0.5))
+    u, v = rng.normal(0, 0.3, n), rng.normal(0, 0.3, n)
+
+    base = {"time": time, "lat": lat_all, "lon": lon_all}
+    pd.DataFrame({**base, "sst": sst.round(2)}).to_csv(out_dir / "sst.csv", index=False)
+    pd.DataFrame({**base, "chlor_a": chlor_a.round(4)}).to_csv(out_dir / "chlorophyll.csv", index=False)
+    pd.DataFrame({**base, "water_u": u.round(3), "water_v": v.round(3)}).to_csv(out_dir / "currents.csv", index=False)
+    return n
+
+
+def run_cli(args: list[str], repeats: int) -> dict:
+    """Median wall time and the largest peak RSS of `repeats` runs of a script in TRAIN_DIR."""
+    timings, peaks = [], []
+    for _ in range(repeats):
+        with tempfile.TemporaryFile() as err:
+            started = time.perf_counter()
+            proc = subprocess.Popen([sys.executable, *args], cwd=TRAIN_DIR, stdout=subprocess.DEVNULL, stderr=err)
+            # wait4 reports the child's own resource usage (peak RSS), unlike RUSAGE_CHILDREN.
+            _, status, usage = os.wait4(proc.pid, 0)
+            timings.append(time.perf_counter() - started)
+            proc.returncode = os.waitstatus_to_exitcode(status)
+            if proc.returncode != 0:
+                err.seek(0)
+                raise RuntimeError(f"{' '.join(args[:1])} failed:\n{err.read().decode()[-2000:]}")
+        peaks.append(usage.ru_maxrss / 1024)  # KiB on Linux
+    return {"seconds": statistics.median(timings), "repeats": repeats, "peak_rss_mb": max(peaks)}
+
+
+def run_inline(fn: Callable[[], object], repeats: int) -> dict:
+    """Median time of `repeats` untraced calls, then one call under tracemalloc for peak memory."""
+    fn()  # warm-up: caches, lazy imports
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"seconds": statistics.median(timings), "repeats": repeats, "peak_traced_mb": peak / 2**20}
+
+
+def _with_rate(result: dict, rows: int) -> dict:
+    return {**result, "rows": rows, "rows_per_second": rows / result["seconds"] if result["seconds"] else None}
+
+
+def run_suite(args: argparse.Namespace, work: Path) -> dict:
+    from predict_fish_zone import RowScorer, load_artifact, predict_batch  # noqa: PLC0415
+
+    results: dict[str, dict] = {}
+    n_source_rows = synthetic_sources(work, days=args.days, grid_step=args.grid_step, seed=args.seed)
+    merged, final, model = work / "merged.csv", work / "final.csv", work / "model.pkl"
+    wanted = set(args.cases)
+
+    # Later stages consume earlier outputs, so a stage runs (untimed) when only its consumers are selected.
+    merge_cmd = ["merge_datasets.py", "--dir", str(work), "--skip-bathymetry", "--output", str(merged)]
+    if "merge" in wanted:
+        results["merge"] = _with_rate(run_cli(merge_cmd, args.repeats), n_source_rows)
+    else:
+        run_cli(merge_cmd, 1)
+
+    merged_df = pd.read_csv(merged)
+    if "land_mask" in wanted:
+        results["land_mask"] = _with_rate(
+            run_inline(lambda: keep_sea_rows_in_sri_lanka_bbox(merged_df), args.repeats), len(merged_df)
+        )
+
+    label_cmd = ["create_final_dataset.py", "--input", str(merged), "--output", str(final), "--skip-bathymetry"]
+    if "label" in wanted:
+        results["label"] = _with_rate(run_cli(label_cmd, args.repeats), len(merged_df))
+    elif wanted & {"train", "predict_single", "predict_batch"}:
+        run_cli(label_cmd, 1)
+
+    if not wanted & {"train", "predict_single", "predict_batch"}:
+        return results
+
+    from dataset_io import read_table  # noqa: PLC0415
+
+    final_df = read_table(final, typed=True)
+    train_cmd = [
+        "train_random_forest.py",
+        "--data",
+        str(final),
+        "--output",
+        str(model),
+        "--n-estimators",
+        str(args.n_estimators),
+        "--no-oob",
+    ]
+    if "train" in wanted:
+        results["train"] = _with_rate(run_cli(train_cmd, args.repeats), len(final_df))
+    else:
+        run_cli(train_cmd, 1)
+
+    for kind, path in (("pkl", model), ("forest", model.with_suffix(".forest"))):
+        started = time.perf_counter()
+        pipeline, feature_columns = load_artifact(path)
+        load_seconds = time.perf_counter() - started
+
+        if "predict_single" in wanted:
+            scorer = RowScorer(pipeline, feature_columns)
+            rows = final_df[feature_columns].head(SINGLE_ROWS).to_dict(orient="records")
+
+            def score_rows() -> None:
+                for row in rows:
+                    scorer.predict(row)
+
+            result = run_inline(score_rows, args.repeats)
+            results[f"predict_single_{kind}"] = {
+                **result,
+                "rows": len(rows),
+                "ms_per_row": result["seconds"] / len(rows) * 1000,
+                "load_seconds": load_seconds,
+            }
+
+        if "predict_batch" in wanted:
+            results[f"predict_batch_{kind}"] = _with_rate(
+                run_inline(lambda: predict_batch(pipeline, feature_columns, final_df), args.repeats), len(final_df)
+            )
+    return results
+
+
+def _environment() -> dict:
+    import sklearn  # noqa: PLC0415
+
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "sklearn": sklearn.__version__,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the fish-zone data pipeline and inference.")
+    parser.add_argument("--days", type=int, default=30, help="Days of synthetic data (default: 30).")
+    parser.add_argument(
+        "--grid-step",
+        type=float,
+        default=0.1,
+        help="Grid spacing in degrees over the Sri Lanka bounding box (default: 0.1, ~2,200 cells).",
+    )
+    parser.add_argument("--n-estimators", type=int, default=100, help="Trees in the benchmarked forest (default: 100).")
+    parser.add_argument("--repeats", type=int, default=3, help="Runs per case; the median is kept (default: 3).")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--cases",
+        nargs="+",
+        choices=CASES,
+        default=list(CASES),
+        help="Cases to time (default: all). Stages they depend on still run, untimed.",
+    )
+    parser.add_argument("--workdir", type=Path, default=None, help="Keep generated data and models here.")
+    parser.add_argument("--output", type=Path, default=None, help="Write the results JSON here.")
+    parser.add_argument("--baseline", type=Path, default=None, help="Baseline JSON to compare against.")
+    parser.add_argument(
+        "--max-regression",
+        type=float,
+        default=0.25,
+        help="Allowed relative slowdown against --baseline before failing (default: 0.25).",
+    )
+    parser.add_argument("--save-baseline", type=Path, default=None, help="Write the results as a new baseline.")
+    args = parser.parse_args()
+
+    work = args.workdir or Path(tempfile.mkdtemp(prefix="fish_bench_"))
+    work.mkdir(parents=True, exist_ok=True)
+    try:
+        results = run_suite(args, work)
+    finally:
+        if args.workdir is None:
+            shutil.rmtree(work, ignore_errors=True)
+
+    report = {
+        "config": {k: getattr(args, k) for k in ("days", "grid_step", "n_estimators", "repeats", "seed")},
+        "environment": _environment(),
+        "results": results,
+    }
+
+    for name, r in results.items():
+        memory = r.get("peak_rss_mb", r.get("peak_traced_mb"))
+        kind = "RSS" if "peak_rss_mb" in r else "traced"
+        if "ms_per_row" in r:
+            rate = f"{r['ms_per_row']:>9.3f} ms/row"
+        else:
+            rate = f"{r['rows_per_second']:>12,.0f} rows/s"
+        print(f"{name:<22}{r['seconds']:>9.3f} s {rate}  peak {kind} {memory:,.0f} MB")
+
+    failed = False
+    if args.baseline is not None:
+        baseline = json.loads(args.baseline.read_text())
+        if baseline.get("config") != report["config"]:
+            print("WARNING: baseline was recorded with a different configuration; ratios are not comparable.")
+        for name, r in results.items():
+            before = baseline.get("results", {}).get(name)
+            if before is None:
+                continue
+            ratio = r["seconds"] / max(before["seconds"], 1e-9)
+            status = "FAIL" if ratio > 1 + args.max_regression else "ok"
+            print(f"{status}: {name} {r['seconds']:.3f} s vs baseline {before['seconds']:.3f} s ({ratio:.2f}x)")
+            failed |= status == "FAIL"
+
+    text = json.dumps(report, indent=2)
+    if args.output is not None:
+        args.output.write_text(text)
+        print(f"Saved results to {args.output}")
+    if args.save_baseline is not None:
+        args.save_baseline.write_text(text)
+        print(f"Saved baseline to {args.save_baseline}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+
+"""Start-up time benchmark for predict_fish_zone.py.
+
+Runs `python -X importtime -c "import predict_fish_zone"` in fresh interpreters, reports the median
+total import time and the slowest top-level imports, and fails if a heavy dependency is imported at
+module level. With `--model` it also times a full single-row CLI prediction. Compare against a saved
+baseline to catch regressions:
+
+  python benchmarks/startup_time.py --save-baseline benchmarks/startup_baseline.json
+  python benchmarks/startup_time.py --baseline benchmarks/startup_baseline.json --max-regression 0.25
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+
+TRAIN_DIR = Path(__file__).resolve().parent.parent
+
+# Must not be imported just by importing the prediction module.
+HEAVY_MODULES = ("pandas", "sklearn", "joblib", "scipy", "pyarrow", "global_land_mask")
+
+SAMPLE_ROW = ["--lat", "7.0", "--lon", "81.9", "--sst", "28.0", "--chlorophyll", "0.3", "--u", "0.2", "--v", "0.1"]
+
+
+def parse_importtime(stderr: str) -> dict[str, dict[str, int]]:
+    """Map module name -> {"self_us", "cumulative_us", "depth"} from `-X importtime` output."""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|", 2)
+        depth = (len(name) - len(name.lstrip())) // 2
+        modules[name.strip()] = {"self_us": int(self_us), "cumulative_us": int(cumulative_us), "depth": depth}
+    return modules
+
+
+def measure_imports(module: str, repeats: int) -> dict:
+    totals = []
+    modules: dict[str, dict[str, int]] = {}
+    for _ in range(repeats):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=TRAIN_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        modules = parse_importtime(proc.stderr)
+        totals.append(sum(m["self_us"] for m in modules.values()))
+
+    top_level = sorted(
+        ((name, m["cumulative_us"]) for name, m in modules.items() if m["depth"] <= 1),
+        key=lambda item: item[1],
+        reverse=True,
+    )
+    return {
+        "import_us": int(statistics.median(totals)),
+        "top_imports": [{"module": name, "cumulative_us": us} for name, us in top_level[:10]],
+        "heavy_imported": sorted(m for m in HEAVY_MODULES if m in modules),
+    }
+
+
+def measure_cli(model: Path, repeats: int) -> int:
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "predict_fish_zone.py", "--model", str(model), *SAMPLE_ROW],
+            cwd=TRAIN_DIR,
+            capture_output=True,
+            check=True,
+        )
+        timings.append(time.perf_counter() - started)
+    return int(statistics.median(timings) * 1e6)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark predict_fish_zone.py start-up time.")
+    parser.add_argument("--repeats", type=int, default=5, help="Fresh interpreters per measurement (median is kept).")
+    parser.add_argument(
+        "--model",
+        type=Path,
+        default=None,
+        help="Also time a full single-row CLI prediction with this model (.forest or .pkl).",
+    )
+    parser.add_argument("--baseline", type=Path, default=None, help="Baseline JSON to compare against.")
+    parser.add_argument(
+        "--max-regression",
+        type=float,
+        default=0.25,
+        help="Allowed relative slowdown against --baseline before failing (default: 0.25).",
+    )
+    parser.add_argument("--save-baseline", type=Path, default=None, help="Write the results as a new baseline.")
+    args = parser.parse_args()
+
+    result = {"python": sys.version.split()[0], **measure_imports("predict_fish_zone", args.repeats)}
+    if args.model is not None:
+        result["cli_us"] = measure_cli(args.model.resolve(), args.repeats)
+
+    print(f"import predict_fish_zone: {result['import_us'] / 1000:.1f} ms (median of {args.repeats})")
+    for item in result["top_imports"]:
+        print(f"  {item['cumulative_us'] / 1000:8.1f} ms  {item['module']}")
+    if "cli_us" in result:
+        print(f"single-row CLI ({args.model.name}): {result['cli_us'] / 1000:.1f} ms")
+
+    failed = False
+    if result["heavy_imported"]:
+        print(f"FAIL: heavy modules imported at module level: {', '.join(result['heavy_imported'])}")
+        failed = True
+
+    if args.baseline is not None:
+        baseline = json.loads(args.baseline.read_text())
+        for key in ("import_us", "cli_us"):
+            if key in result and key in baseline:
+                ratio = result[key] / max(baseline[key], 1)
+                status = "FAIL" if ratio > 1 + args.max_regression else "ok"
+                print(f"{status}: {key} {result[key] / 1000:.1f} ms vs baseline {baseline[key] / 1000:.1f} ms ({ratio:.2f}x)")
+                failed |= status == "FAIL"
+
+    if args.save_baseline is not None:
+        args.save_baseline.write_text(json.dumps(result, indent=2))
+        print(f"Saved baseline to {args.save_baseline}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
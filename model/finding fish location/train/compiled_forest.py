@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+
+"""Flat-array export of the trained {median imputer, RandomForest} pipeline.
+
+All trees are concatenated into one set of node arrays (children, split feature, threshold,
+leaf class probabilities) and saved as a directory of `.npy` files plus `meta.json`, so a
+runtime can load them with plain NumPy instead of unpickling sklearn objects. The arrays are
+memory-mapped on load: several worker processes share one physical copy and start-up does not
+grow with the number of trees. `CompiledForest.predict_proba` walks every tree for a whole batch
+of rows with vectorized gathers and reproduces sklearn's arithmetic step by step (float32
+features, per-leaf normalization, tree-by-tree accumulation), so probabilities are bit-identical
+to `pipeline.predict_proba` evaluated with `n_jobs=1`.
+
+Usage:
+  python compiled_forest.py --model models/rf_fish_zone_model.pkl --output models/rf_fish_zone_model.forest
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import shutil
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Union
+
+import numpy as np
+
+
+COMPILED_FORMAT_VERSION = 1
+COMPILED_META_FILE = "meta.json"
+
+# Upper bound on (trees x rows) node positions walked at once; bounds the traversal temporaries.
+TRAVERSAL_BLOCK = 1 << 21
+
+_ARRAYS = ("classes", "roots", "left", "right", "feature", "threshold", "missing_left", "value")
+
+
+@dataclass(frozen=True)
+class CompiledForest:
+    """A fitted random forest as flat node arrays.
+
+    Node `i` of the concatenated forest splits on `feature[i] <= threshold[i]` and continues at
+    `left[i]` / `right[i]` (absolute indices; a leaf points to itself); `value[i]` holds the leaf's
+    class probabilities. `roots[t]` is the first node of tree `t`. `fill_values` are the imputer
+    statistics used for NaN features (None when the model had no imputer).
+    """
+
+    feature_columns: list[str]
+    classes: np.ndarray
+    fill_values: Optional[np.ndarray]
+    roots: np.ndarray
+    left: np.ndarray
+    right: np.ndarray
+    feature: np.ndarray
+    threshold: np.ndarray
+    missing_left: np.ndarray
+    value: np.ndarray
+
+    @property
+    def classes_(self) -> np.ndarray:
+        """sklearn-compatible alias, so callers can treat the forest like the pipeline."""
+        return self.classes
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    def _features(self, X) -> np.ndarray:
+        if hasattr(X, "columns"):
+            X = X[self.feature_columns]
+        x = np.asarray(X, dtype=np.float64)
+        if x.ndim == 1:
+            x = x[None, :]
+        if x.shape[1] != len(self.feature_columns):
+            raise ValueError(f"Expected {len(self.feature_columns)} features, got {x.shape[1]}.")
+        if self.fill_values is not None:
+            x = np.where(np.isnan(x), self.fill_values, x)
+        # The forest compares float32 features against float64 thresholds, as sklearn does.
+        return x.astype(np.float32)
+
+    def _leaves(self, x: np.ndarray) -> np.ndarray:
+        """Leaf node reached in every tree for every row; shape (n_trees, n_rows).
+
+        All (tree, row) walks advance one level per iteration. Leaves point to themselves, so
+        finished walks can stay in the arrays; they are compacted out once they are the majority.
+        """
+        n_rows = len(x)
+        x_flat = np.ascontiguousarray(x.T).ravel()  # x_flat[feature * n_rows + row]
+        node = np.repeat(self.roots, n_rows)
+        row = np.tile(np.arange(n_rows, dtype=np.int64), self.n_trees)
+        leaves: Optional[np.ndarray] = None
+        slot = None
+
+        while True:
+            at_leaf = self.left[node] == node
+            n_leaf = int(np.count_nonzero(at_leaf))
+            if n_leaf == len(node):
+                break
+            if 2 * n_leaf > len(node):
+                if leaves is None:
+                    leaves, slot = node.copy(), np.arange(len(node))
+                else:
+                    leaves[slot] = node
+                active = ~at_leaf
+                node, row, slot = node[active], row[active], slot[active]
+
+            values = x_flat[self.feature[node] * n_rows + row]
+            go_left = values <= self.threshold[node]
+            if self.fill_values is None:
+                go_left |= np.isnan(values) & self.missing_left[node]
+            node = np.where(go_left, self.left[node], self.right[node])
+
+        if leaves is None:
+            leaves = node
+        else:
+            leaves[slot] = node
+        return leaves.reshape(self.n_trees, n_rows)
+
+    def predict_proba(self, X) -> np.ndarray:
+        x = self._features(X)
+        out = np.zeros((len(x), len(self.classes)), dtype=np.float64)
+        block = max(1, TRAVERSAL_BLOCK // max(self.n_trees, 1))
+
+        for start in range(0, len(x), block):
+            leaves = self._leaves(x[start : start + block])
+            acc = out[start : start + block]
+            # Sum tree by tree in order: the same additions as sklearn's accumulation.
+            for t in range(self.n_trees):
+                acc += self.value[leaves[t]]
+
+        out /= self.n_trees
+        return out
+
+    def predict(self, X) -> np.ndarray:
+        return self.classes[np.argmax(self.predict_proba(X), axis=1)]
+
+    def path_contributions(self, X, class_index: int = -1) -> tuple[float, np.ndarray]:
+        """Tree-path (Saabas) attribution of the `class_index` probability; returns `(bias, contributions)`.
+
+        Every split a row passes through credits `value[child] - value[node]` to the split feature, so
+        `bias + contributions[i].sum()` equals `predict_proba(X)[i, class_index]` up to rounding. `bias`
+        is the forest's mean root value, and `contributions` has shape (n_rows, n_features).
+        """
+        x = self._features(X)
+        n_rows, n_features = x.shape
+        v = np.ascontiguousarray(self.value[:, class_index])
+        contributions = np.zeros(n_rows * n_features, dtype=np.float64)
+        block = max(1, TRAVERSAL_BLOCK // max(self.n_trees, 1))
+
+        for start in range(0, n_rows, block):
+            xb = x[start : start + block]
+            nb = len(xb)
+            x_flat = np.ascontiguousarray(xb.T).ravel()
+            node = np.repeat(self.roots, nb)
+            row = np.tile(np.arange(nb, dtype=np.int64), self.n_trees)
+            acc = np.zeros(nb * n_features, dtype=np.float64)
+            while True:
+                active = self.left[node] != node
+                node, row = node[active], row[active]
+                if not len(node):
+                    break
+                feature = self.feature[node]
+                values = x_flat[feature * nb + row]
+                go_left = values <= self.threshold[node]
+                if self.fill_values is None:
+                    go_left |= np.isnan(values) & self.missing_left[node]
+                child = np.where(go_left, self.left[node], self.right[node])
+                acc += np.bincount(row * n_features + feature, weights=v[child] - v[node], minlength=nb * n_features)
+                node = child
+            contributions[start * n_features : (start + nb) * n_features] = acc
+
+        bias = float(v[self.roots].sum() / self.n_trees)
+        return bias, contributions.reshape(n_rows, n_features) / self.n_trees
+
+
+def compile_pipeline(pipeline, feature_columns: list[str]) -> CompiledForest:
+    """Flatten a fitted {imputer, RandomForestClassifier} pipeline (or a bare forest)."""
+    steps = getattr(pipeline, "named_steps", None)
+    if steps is not None:
+        unknown = [name for name in steps if name not in ("imputer", "model")]
+        if unknown:
+            raise ValueError(f"Cannot compile pipeline steps {unknown}; expected only 'imputer' and 'model'.")
+        imputer, forest = steps.get("imputer"), steps["model"]
+    else:
+        imputer, forest = None, pipeline
+
+    if not hasattr(forest, "estimators_"):
+        raise ValueError(f"Expected a fitted random forest, got {type(forest).__name__}.")
+    if getattr(forest, "n_outputs_", 1) != 1:
+        raise ValueError("Only single-output forests can be compiled.")
+
+    fill_values = None
+    if imputer is not None:
+        fill_values = np.asarray(imputer.statistics_, dtype=np.float64)
+        if len(fill_values) != len(feature_columns) or np.isnan(fill_values).any():
+            raise ValueError("Imputer has empty (all-NaN) features; such pipelines cannot be compiled.")
+
+    roots, left, right, feature, threshold, missing_left, value = [], [], [], [], [], [], []
+    offset = 0
+    for estimator in forest.estimators_:
+        tree = estimator.tree_
+        n = tree.node_count
+        nodes = np.arange(offset, offset + n, dtype=np.int64)
+        is_leaf = tree.children_left < 0
+
+        roots.append(offset)
+        left.append(np.where(is_leaf, nodes, tree.children_left + offset))
+        right.append(np.where(is_leaf, nodes, tree.children_right + offset))
+        feature.append(np.where(is_leaf, 0, tree.feature))
+        threshold.append(tree.threshold.astype(np.float64))
+        missing = getattr(tree, "missing_go_to_left", None)
+        missing_left.append(np.zeros(n, dtype=bool) if missing is None else np.asarray(missing, dtype=bool))
+
+        # DecisionTreeClassifier.predict_proba normalizes the leaf value row to sum to 1.
+        leaf_value = tree.value[:, 0, :].astype(np.float64)
+        normalizer = leaf_value.sum(axis=1)[:, np.newaxis]
+        normalizer[normalizer == 0.0] = 1.0
+        value.append(leaf_value / normalizer)
+        offset += n
+
+    if offset >= np.iinfo(np.int32).max:
+        raise ValueError(f"Forest has too many nodes ({offset:,}) for the int32 node format.")
+
+    return CompiledForest(
+        feature_columns=list(feature_columns),
+        classes=np.asarray(forest.classes_),
+        fill_values=fill_values,
+        roots=np.asarray(roots, dtype=np.int32),
+        left=np.concatenate(left).astype(np.int32),
+        right=np.concatenate(right).astype(np.int32),
+        feature=np.concatenate(feature).astype(np.int32),
+        threshold=np.concatenate(threshold),
+        missing_left=np.concatenate(missing_left),
+        value=np.concatenate(value),
+    )
+
+
+def is_compiled_forest(path: Union[str, Path]) -> bool:
+    path = Path(path)
+    return path.is_dir() and (path / COMPILED_META_FILE).exists()
+
+
+def save_compiled_forest(forest: CompiledForest, path: Union[str, Path]) -> None:
+    """Write `forest` as a directory of .npy arrays, replacing any previous export atomically."""
+    path = Path(path)
+    tmp = path.with_name(path.name + ".tmp")
+    if tmp.exists():
+        shutil.rmtree(tmp)
+    tmp.mkdir(parents=True)
+
+    for name in _ARRAYS:
+        np.save(tmp / f"{name}.npy", np.ascontiguousarray(getattr(forest, name)))
+    if forest.fill_values is not None:
+        np.save(tmp / "fill_values.npy", forest.fill_values)
+
+    meta = {
+        "version": COMPILED_FORMAT_VERSION,
+        "feature_columns": forest.feature_columns,
+        "n_trees": forest.n_trees,
+        "n_nodes": int(len(forest.left)),
+    }
+    (tmp / COMPILED_META_FILE).write_text(json.dumps(meta, indent=2))
+
+    if path.exists():
+        shutil.rmtree(path)
+    tmp.rename(path)
+
+
+def load_compiled_forest(path: Union[str, Path], *, mmap: bool = True) -> CompiledForest:
+    """Load a compiled forest; by default its arrays are read-only memory maps.
+
+    Mapping is O(1) regardless of model size, pages are read on first touch, and processes that
+    map the same files share one copy of the node arrays through the OS page cache.
+    """
+    path = Path(path)
+    meta = json.loads((path / COMPILED_META_FILE).read_text())
+    if meta.get("version") != COMPILED_FORMAT_VERSION:
+        raise ValueError(f"Unsupported compiled forest version in {path}; re-export it from the .pkl.")
+
+    mmap_mode = "r" if mmap else None
+    arrays = {name: np.load(path / f"{name}.npy", mmap_mode=mmap_mode) for name in _ARRAYS}
+    fill_path = path / "fill_values.npy"
+    return CompiledForest(
+        feature_columns=list(meta["feature_columns"]),
+        fill_values=np.load(fill_path) if fill_path.exists() else None,
+        **arrays,
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compile a trained fish-zone model (.pkl) into flat NumPy arrays.")
+    parser.add_argument("--model", type=Path, required=True, help="joblib .pkl saved by train_random_forest.py")
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=None,
+        help="Output directory (default: the model path with a .forest suffix).",
+    )
+    parser.add_argument(
+        "--verify-data",
+        type=Path,
+        default=None,
+        help="Optional dataset to check that compiled probabilities match the pipeline exactly.",
+    )
+    args = parser.parse_args()
+
+    # sklearn/joblib are only needed to read the pickle, not to run the compiled forest.
+    from predict_fish_zone import load_artifact  # noqa: PLC0415
+
+    pipeline, feature_columns = load_artifact(args.model)
+    forest = compile_pipeline(pipeline, feature_columns)
+    out_path = args.output or args.model.with_suffix(".forest")
+    save_compiled_forest(forest, out_path)
+    print(f"Compiled {forest.n_trees} trees / {len(forest.left):,} nodes to {out_path}")
+
+    if args.verify_data is not None:
+        from dataset_io import read_table  # noqa: PLC0415
+
+        X = read_table(args.verify_data, columns=feature_columns, typed=True)
+        model = getattr(pipeline, "named_steps", {}).get("model", pipeline)
+        model.set_params(n_jobs=1)  # sequential accumulation, the order the compiled forest uses
+        expected = pipeline.predict_proba(X)
+        got = load_compiled_forest(out_path).predict_proba(X)
+        mismatched = int((expected != got).any(axis=1).sum())
+        print(f"Verified {len(X):,} rows: {mismatched:,} mismatched")
+        return 1 if mismatched else 0
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -3,12 +3,17 @@
 from __future__ import annotations
 
 import argparse
+import json
 from pathlib import Path
 from typing import Optional
 
 import numpy as np
 import pandas as pd
 
+from dataset_io import TableAppender, read_table, table_columns, write_table
+from dataset_schema import LABEL_COLUMN, LABEL_DTYPE, LABEL_PREFIX, MEASUREMENT_DTYPE, apply_schema
+from incremental import iter_new_chunks, load_manifest, save_manifest
+from instrumentation import add_profile_arguments, stage, start_profiling
 from land_mask import keep_sea_rows_in_sri_lanka_bbox
 
 
@@ -51,6 +56,210 @@ def _has_any_depth_column(df: pd.DataFrame) -> bool:
     return bool({"depth", "bathymetry", "elevation"} & cols)
 
 
+THRESHOLD_KEYS = ("sst_min", "sst_max", "chlorophyll_min", "speed_min", "speed_max", "depth_min", "depth_max")
+
+# Rows labeled per block in `label_matrix`; bounds the (rows x rule sets) temporaries.
+LABEL_BLOCK_ROWS = 1 << 20
+
+# Input rows read per chunk in --incremental mode.
+INCREMENTAL_CHUNK_ROWS = 500_000
+
+
+def _load_rule_sets(path: Path, defaults: dict[str, float]) -> dict[str, dict[str, float]]:
+    """Read named threshold rule sets from JSON.
+
+    Accepts `{"name": {"sst_min": ..., ...}, ...}` or `[{"name": ..., "sst_min": ...}, ...]`.
+    Thresholds a rule set omits fall back to the CLI values.
+    """
+    data = json.loads(path.read_text())
+    if isinstance(data, list):
+        data = {str(r.get("name", f"rule_{i}")): r for i, r in enumerate(data)}
+    if not isinstance(data, dict) or not data:
+        raise ValueError(f"Rule file must contain a non-empty object or list of rule sets: {path}")
+
+    rule_sets: dict[str, dict[str, float]] = {}
+    for name, rule in data.items():
+        unknown = sorted(set(rule) - set(THRESHOLD_KEYS) - {"name"})
+        if unknown:
+            raise ValueError(f"Rule set '{name}' has unknown keys {unknown}. Allowed: {list(THRESHOLD_KEYS)}")
+        rule_sets[str(name)] = {k: float(rule.get(k, defaults[k])) for k in THRESHOLD_KEYS}
+    return rule_sets
+
+
+def label_matrix(
+    sst: np.ndarray,
+    chlor: np.ndarray,
+    speed: np.ndarray,
+    depth: Optional[np.ndarray],
+    rules: list[dict[str, float]],
+) -> np.ndarray:
+    """Evaluate every rule set against every row; returns a (rows, rules) boolean matrix.
+
+    Each condition is a broadcast comparison of a row vector against the vector of all rule
+    thresholds, so N rule sets cost one pass over the data. NaN inputs never satisfy a rule.
+    `depth=None` skips the depth condition.
+    """
+    th = {k: np.asarray([r[k] for r in rules], dtype=float) for k in THRESHOLD_KEYS}
+    out = np.empty((len(sst), len(rules)), dtype=bool)
+
+    for start in range(0, len(sst), LABEL_BLOCK_ROWS):
+        stop = start + LABEL_BLOCK_ROWS
+        s = sst[start:stop, None]
+        c = chlor[start:stop, None]
+        sp = speed[start:stop, None]
+        m = (s >= th["sst_min"]) & (s <= th["sst_max"]) & (c >= th["chlorophyll_min"])
+        m &= (sp >= th["speed_min"]) & (sp <= th["speed_max"])
+        if depth is not None:
+            d = depth[start:stop, None]
+            m &= (d >= th["depth_min"]) & (d <= th["depth_max"])
+        out[start:stop] = m
+
+    return out
+
+
+def label_dataset(
+    df: pd.DataFrame,
+    cli_rule: dict[str, float],
+    rule_sets: dict[str, dict[str, float]],
+    *,
+    allow_land: bool = False,
+    skip_bathymetry: bool = False,
+) -> tuple[pd.DataFrame, np.ndarray, int]:
+    """Drop land rows, add current_speed / bathymetry_depth_m and the label columns.
+
+    `fish_presence` comes from `cli_rule`; each named rule set adds `fish_presence_<name>`.
+    Returns `(df, labels, removed_land_rows)` where `labels` is the (rows, 1 + rule sets) matrix.
+    """
+    df = _normalize_columns(df)
+
+    removed = 0
+    if (not allow_land) and ("lat" in df.columns) and ("lon" in df.columns):
+        before = len(df)
+        with stage("land_mask", rows=before):
+            df = keep_sea_rows_in_sri_lanka_bbox(df, lat_col="lat", lon_col="lon")
+        removed = before - len(df)
+
+    required = ["sst", "chlor_a", "water_u", "water_v"]
+    missing = [c for c in required if c not in df.columns]
+    if missing:
+        raise ValueError(f"Missing required columns: {missing}. Found: {list(df.columns)}")
+
+    # Schema dtypes (float32 measurements); a no-op when the reader already applied them.
+    apply_schema(df)
+    sst = df["sst"].to_numpy(dtype=MEASUREMENT_DTYPE, na_value=np.nan)
+    chlor = df["chlor_a"].to_numpy(dtype=MEASUREMENT_DTYPE, na_value=np.nan)
+    u = df["water_u"].to_numpy(dtype=MEASUREMENT_DTYPE, na_value=np.nan)
+    v = df["water_v"].to_numpy(dtype=MEASUREMENT_DTYPE, na_value=np.nan)
+    depth_m: Optional[pd.Series]
+    if _has_any_depth_column(df):
+        depth_m = _pick_depth_series(df)
+    else:
+        depth_m = None
+
+    current_speed = np.sqrt(u**2 + v**2)
+    df["current_speed"] = current_speed
+    if (not skip_bathymetry) and (depth_m is not None):
+        df["bathymetry_depth_m"] = depth_m
+
+    # Apply depth condition only if available and not explicitly skipped.
+    depth = (
+        depth_m.to_numpy(dtype=MEASUREMENT_DTYPE, na_value=np.nan)
+        if (not skip_bathymetry) and (depth_m is not None)
+        else None
+    )
+
+    # Column 0 is the CLI rule (fish_presence); the rest are the named rule sets.
+    with stage("label", rows=len(df)):
+        labels = label_matrix(sst, chlor, current_speed, depth, [cli_rule, *rule_sets.values()])
+
+        df[LABEL_COLUMN] = labels[:, 0].astype(LABEL_DTYPE)
+        for k, name in enumerate(rule_sets, start=1):
+            df[f"{LABEL_PREFIX}{name}"] = labels[:, k].astype(LABEL_DTYPE)
+
+    return df, labels, removed
+
+
+def _label_incremental(
+    in_path: Path,
+    out_path: Path,
+    cli_rule: dict[str, float],
+    rule_sets: dict[str, dict[str, float]],
+    args: argparse.Namespace,
+) -> tuple[int, np.ndarray]:
+    """Label only input rows for dates not yet in the output and append them.
+
+    Returns `(rows appended, positives per rule column)`.
+    """
+    manifest = load_manifest(out_path)
+    fresh = not manifest["dates"] and not manifest["inputs"]
+    options = {
+        "rules": {"fish_presence": cli_rule, **rule_sets},
+        "allow_land": bool(args.allow_land),
+        "skip_bathymetry": bool(args.skip_bathymetry),
+    }
+    if not fresh and manifest.get("options", options) != options:
+        raise ValueError(
+            "Labeling options changed since the last incremental run. "
+            "Rebuild without --incremental (or delete the manifest) to apply them."
+        )
+
+    chunks, state, _ = iter_new_chunks(in_path, manifest["inputs"].get("input"), INCREMENTAL_CHUNK_ROWS)
+    done = set(manifest["dates"])
+    new_days: set[str] = set()
+    positives = np.zeros(1 + len(rule_sets), dtype=np.int64)
+    skipped = removed = 0
+
+    columns = None
+    if fresh:
+        # Output columns of an empty input, so a run with no rows still writes a header.
+        empty, _, _ = label_dataset(
+            pd.DataFrame(columns=table_columns(in_path)),
+            cli_rule,
+            rule_sets,
+            allow_land=args.allow_land,
+            skip_bathymetry=args.skip_bathymetry,
+        )
+        columns = list(empty.columns)
+    writer = TableAppender(out_path, partition_by_date=args.partition_by_date, append=not fresh, columns=columns)
+    try:
+        for chunk in chunks:
+            chunk = _normalize_columns(chunk)
+            if "time" not in chunk.columns:
+                raise ValueError("--incremental needs a 'time' column to track which dates are labeled.")
+            # Dates already in the output (and rows without a date) would be duplicated on append.
+            days = pd.to_datetime(chunk["time"], errors="coerce").dt.strftime("%Y-%m-%d")
+            keep = days.notna() & ~days.isin(done)
+            skipped += int((~keep).sum())
+            if not keep.any():
+                continue
+
+            labeled, labels, chunk_removed = label_dataset(
+                chunk.loc[keep],
+                cli_rule,
+                rule_sets,
+                allow_land=args.allow_land,
+                skip_bathymetry=args.skip_bathymetry,
+            )
+            writer.write(labeled)
+            new_days.update(days[keep].unique())
+            positives += labels.sum(axis=0)
+            removed += chunk_removed
+    finally:
+        writer.close()
+
+    manifest["inputs"] = {"input": state}
+    manifest["dates"] = sorted(done | new_days)
+    manifest["options"] = options
+    save_manifest(out_path, manifest)
+
+    if removed:
+        print(f"Removed {removed:,} Sri Lankan land rows (kept sea only).")
+    if skipped:
+        print(f"Skipped {skipped:,} rows for dates already labeled (or without a date).")
+    print(f"Labeled {len(new_days):,} new date(s); appended {writer.rows_written:,} rows to {out_path}")
+    return writer.rows_written, positives
+
+
 def main() -> int:
     parser = argparse.ArgumentParser(
         description=(
@@ -60,12 +269,17 @@ def main() -> int:
     parser.add_argument(
         "--input",
         default="merged.csv",
-        help="Input merged dataset CSV (default: merged.csv)",
+        help="Input merged dataset: CSV, Parquet (file or date-partitioned directory) or Feather (default: merged.csv)",
     )
     parser.add_argument(
         "--output",
         default="final_dataset.csv",
-        help="Output CSV (default: final_dataset.csv)",
+        help="Output file; .parquet/.feather select a columnar format (default: final_dataset.csv)",
+    )
+    parser.add_argument(
+        "--partition-by-date",
+        action="store_true",
+        help="Write the output as a Parquet dataset directory with one time=YYYY-MM-DD/ partition per date.",
     )
     parser.add_argument("--sst-min", type=float, default=26.0)
     parser.add_argument("--sst-max", type=float, default=30.0)
@@ -84,59 +298,95 @@ def main() -> int:
         action="store_true",
         help="If set, do NOT filter out Sri Lankan land points (default filters them out).",
     )
+    parser.add_argument(
+        "--rules",
+        default=None,
+        help=(
+            "JSON file of named threshold rule sets (keys: " + ", ".join(THRESHOLD_KEYS) + "). "
+            "All are evaluated in one pass and written as uint8 columns fish_presence_<name>."
+        ),
+    )
+    parser.add_argument(
+        "--labels-out",
+        default=None,
+        help="Optional .npz with the rule-set labels bit-packed per rule (rows x rule sets).",
+    )
+    parser.add_argument(
+        "--rules-report",
+        default=None,
+        help="Optional JSON file with per-rule-set positive counts and rates.",
+    )
+
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help=(
+            "Only label input rows for dates not yet in the output (tracked in <output>.manifest.json) and "
+            "append them. Output must be CSV or --partition-by-date Parquet."
+        ),
+    )
+    add_profile_arguments(parser)
 
     args = parser.parse_args()
+    if args.incremental and args.labels_out:
+        parser.error("--labels-out indexes rows of the whole output and is not supported with --incremental.")
 
     in_path = Path(args.input).expanduser().resolve()
     out_path = Path(args.output).expanduser().resolve()
 
-    df = pd.read_csv(in_path)
-    df = _normalize_columns(df)
+    cli_rule = {k: float(getattr(args, k)) for k in THRESHOLD_KEYS}
+    rule_sets = _load_rule_sets(Path(args.rules).expanduser(), cli_rule) if args.rules else {}
+    names = list(rule_sets)
+    start_profiling("create_final_dataset", args)
 
-    if (not args.allow_land) and ("lat" in df.columns) and ("lon" in df.columns):
-        before = len(df)
-        df = keep_sea_rows_in_sri_lanka_bbox(df, lat_col="lat", lon_col="lon")
-        removed = before - len(df)
+    if args.incremental:
+        # Per-chunk land_mask / label stages are nested under this one.
+        with stage("incremental") as timed:
+            n_rows, positives = _label_incremental(in_path, out_path, cli_rule, rule_sets, args)
+            timed.rows = n_rows
+    else:
+        with stage("load") as timed:
+            df = read_table(in_path, typed=True)
+            timed.rows = len(df)
+        df, labels, removed = label_dataset(
+            df, cli_rule, rule_sets, allow_land=args.allow_land, skip_bathymetry=args.skip_bathymetry
+        )
         if removed:
             print(f"Removed {removed:,} Sri Lankan land rows (kept sea only).")
+        with stage("write", rows=len(df)):
+            write_table(df, out_path, partition_by_date=args.partition_by_date)
+        n_rows, positives = len(df), labels.sum(axis=0)
+        print(f"Wrote {n_rows:,} rows to {out_path}")
 
-    required = ["sst", "chlor_a", "water_u", "water_v"]
-    missing = [c for c in required if c not in df.columns]
-    if missing:
-        raise ValueError(f"Missing required columns: {missing}. Found: {list(df.columns)}")
-
-    sst = pd.to_numeric(df["sst"], errors="coerce")
-    chlor = pd.to_numeric(df["chlor_a"], errors="coerce")
-    u = pd.to_numeric(df["water_u"], errors="coerce")
-    v = pd.to_numeric(df["water_v"], errors="coerce")
-    depth_m: Optional[pd.Series]
-    if _has_any_depth_column(df):
-        depth_m = _pick_depth_series(df)
-    else:
-        depth_m = None
+        if names and args.labels_out:
+            np.savez_compressed(
+                Path(args.labels_out).expanduser(),
+                labels=np.packbits(labels[:, 1:], axis=0),
+                n_rows=np.int64(n_rows),
+                rule_names=np.asarray(names),
+            )
 
-    current_speed = np.sqrt(u.to_numpy(dtype=float) ** 2 + v.to_numpy(dtype=float) ** 2)
-    df["current_speed"] = current_speed
-    if (not args.skip_bathymetry) and (depth_m is not None):
-        df["bathymetry_depth_m"] = depth_m
-
-    mask = (
-        sst.between(args.sst_min, args.sst_max, inclusive="both")
-        & (chlor >= args.chlorophyll_min)
-        & pd.Series(current_speed).between(args.speed_min, args.speed_max, inclusive="both")
-    )
-
-    # Apply depth condition only if available and not explicitly skipped.
-    if (not args.skip_bathymetry) and (depth_m is not None):
-        mask = mask & depth_m.between(args.depth_min, args.depth_max, inclusive="both")
+    count_1 = int(positives[0])
+    print(f"fish_presence=1: {count_1:,} ({(count_1 / max(n_rows, 1)) * 100:.2f}%)")
 
-    df["fish_presence"] = mask.fillna(False).astype(int)
+    if names:
+        report = {
+            "n_rows": int(n_rows),
+            "rule_sets": {
+                name: {
+                    **rule_sets[name],
+                    "positives": int(positives[k]),
+                    "positive_rate": float(positives[k] / max(n_rows, 1)),
+                }
+                for k, name in enumerate(names, start=1)
+            },
+        }
+        for name, stats in report["rule_sets"].items():
+            print(f"fish_presence_{name}=1: {stats['positives']:,} ({stats['positive_rate'] * 100:.2f}%)")
 
-    df.to_csv(out_path, index=False)
+        if args.rules_report:
+            Path(args.rules_report).expanduser().write_text(json.dumps(report, indent=2))
 
-    count_1 = int(df["fish_presence"].sum())
-    print(f"Wrote {len(df):,} rows to {out_path}")
-    print(f"fish_presence=1: {count_1:,} ({(count_1 / max(len(df), 1)) * 100:.2f}%)")
     return 0
 
 
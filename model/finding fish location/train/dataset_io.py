@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+
+"""Table I/O shared by the pipeline scripts.
+
+The format is picked from the path:
+- `.parquet` / `.pq` file, or a directory (date-partitioned Parquet dataset) -> Parquet
+- `.feather` / `.arrow` / `.ipc` -> Feather v2 (Arrow IPC)
+- anything else -> CSV (the default, and the only format that needs no extra dependency)
+
+Columnar formats keep dtypes and support column projection; they need `pyarrow`.
+Readers take `typed=True` to load columns in the compact dtypes of `dataset_schema`.
+"""
+
+from __future__ import annotations
+
+import shutil
+from pathlib import Path
+from typing import Iterator, Optional, Sequence
+
+import pandas as pd
+
+from dataset_schema import apply_schema
+
+
+PARQUET_SUFFIXES = (".parquet", ".pq")
+FEATHER_SUFFIXES = (".feather", ".arrow", ".ipc")
+PARTITION_COLUMN = "time"
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow as pa  # type: ignore
+
+        return pa
+    except Exception as exc:  # pragma: no cover
+        raise RuntimeError(
+            "Parquet/Feather input/output needs the optional dependency 'pyarrow'. Install it with: pip install pyarrow"
+        ) from exc
+
+
+def table_format(path: Path) -> str:
+    """Return 'parquet', 'feather' or 'csv' for `path`."""
+    suffix = path.suffix.lower()
+    if suffix in PARQUET_SUFFIXES or path.is_dir():
+        return "parquet"
+    if suffix in FEATHER_SUFFIXES:
+        return "feather"
+    return "csv"
+
+
+def _restore_partition_time(df: pd.DataFrame) -> pd.DataFrame:
+    # Hive-partitioned reads return the partition key as a categorical of strings.
+    if PARTITION_COLUMN in df.columns and isinstance(df[PARTITION_COLUMN].dtype, pd.CategoricalDtype):
+        df[PARTITION_COLUMN] = pd.to_datetime(df[PARTITION_COLUMN].astype(str), errors="coerce")
+    return df
+
+
+def table_columns(path: Path) -> list[str]:
+    """Column names of a stored table, read from the schema/header only."""
+    fmt = table_format(path)
+    if fmt == "csv":
+        return [str(c) for c in pd.read_csv(path, nrows=0).columns]
+
+    _require_pyarrow()
+    if fmt == "parquet":
+        import pyarrow.dataset as ds  # type: ignore  # noqa: PLC0415
+
+        return list(ds.dataset(path, format="parquet", partitioning="hive").schema.names)
+
+    import pyarrow.feather as feather  # type: ignore  # noqa: PLC0415
+
+    return list(feather.read_table(path, memory_map=True).schema.names)
+
+
+def read_table(path: Path, columns: Optional[Sequence[str]] = None, *, typed: bool = False) -> pd.DataFrame:
+    """Read a CSV/Parquet/Feather table, optionally projecting to `columns`.
+
+    `typed` applies the shared dataset schema (float32 measurements, datetime time, uint8 labels).
+    """
+    fmt = table_format(path)
+    cols = list(columns) if columns is not None else None
+
+    if fmt == "csv":
+        df = pd.read_csv(path, usecols=cols)
+    else:
+        _require_pyarrow()
+        if fmt == "parquet":
+            df = _restore_partition_time(pd.read_parquet(path, columns=cols))
+        else:
+            df = pd.read_feather(path, columns=cols)
+    return apply_schema(df) if typed else df
+
+
+def iter_table_chunks(
+    path: Path, chunksize: int, columns: Optional[Sequence[str]] = None, *, typed: bool = False
+) -> Iterator[pd.DataFrame]:
+    """Yield a table as DataFrames of at most `chunksize` rows (schema-typed if `typed`)."""
+    chunks = _iter_raw_chunks(path, chunksize, columns)
+    if not typed:
+        yield from chunks
+        return
+    for chunk in chunks:
+        yield apply_schema(chunk)
+
+
+def _iter_raw_chunks(path: Path, chunksize: int, columns: Optional[Sequence[str]]) -> Iterator[pd.DataFrame]:
+    fmt = table_format(path)
+    cols = list(columns) if columns is not None else None
+
+    if fmt == "csv":
+        yield from pd.read_csv(path, chunksize=chunksize, usecols=cols)
+        return
+
+    _require_pyarrow()
+    if fmt == "parquet":
+        import pyarrow.dataset as ds  # type: ignore  # noqa: PLC0415
+
+        dataset = ds.dataset(path, format="parquet", partitioning="hive")
+        for batch in dataset.to_batches(columns=cols, batch_size=chunksize):
+            if batch.num_rows:
+                yield _restore_partition_time(batch.to_pandas())
+        return
+
+    import pyarrow.ipc as ipc  # type: ignore  # noqa: PLC0415
+
+    with ipc.open_file(path) as reader:
+        for i in range(reader.num_record_batches):
+            df = reader.get_batch(i).to_pandas()
+            for start in range(0, len(df), chunksize):
+                part = df.iloc[start : start + chunksize]
+                yield part[cols] if cols is not None else part
+
+
+def write_table(df: pd.DataFrame, path: Path, *, partition_by_date: bool = False) -> None:
+    """Write `df` in the format implied by `path`.
+
+    `partition_by_date` writes a Parquet dataset directory with one `time=YYYY-MM-DD/` folder per date
+    (rows without a date are dropped, as they cannot be placed in a partition).
+    """
+    writer = TableAppender(path, partition_by_date=partition_by_date)
+    try:
+        writer.write(df)
+    finally:
+        writer.close()
+
+
+class TableAppender:
+    """Append DataFrame chunks to one output table without holding earlier chunks.
+
+    The first chunk fixes the column order (and, for Arrow formats, the schema); later chunks are
+    aligned to it. `columns`, when known up front, fixes the order instead and lets `close` write
+    a header-only CSV (or an empty Arrow file) if no chunk arrives.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        partition_by_date: bool = False,
+        append: bool = False,
+        columns: Optional[Sequence[str]] = None,
+    ):
+        self.path = path
+        self.format = "parquet" if partition_by_date else table_format(path)
+        self.partition_by_date = partition_by_date
+        self.rows_written = 0
+        self._columns: Optional[list[str]] = [str(c) for c in columns] if columns is not None else None
+        self._schema = None
+        self._writer = None
+        self._parts = 0
+
+        if partition_by_date and self.format != "parquet":
+            raise ValueError("Date partitioning is only supported for Parquet output.")
+
+        if append and path.exists() and (path.is_dir() or path.stat().st_size > 0):
+            self._open_for_append()
+            return
+
+        # Outputs are rebuilt from scratch: drop a previous file or previous date partitions.
+        if path.is_file():
+            path.unlink()
+        elif path.is_dir():
+            for part_dir in path.glob(f"{PARTITION_COLUMN}=*"):
+                shutil.rmtree(part_dir)
+
+    def _open_for_append(self) -> None:
+        """Continue an existing CSV or date-partitioned Parquet output, keeping its column order."""
+        if self.format == "csv":
+            self._columns = table_columns(self.path)
+            self._parts = 1  # header already present
+        elif self.partition_by_date:
+            pa = _require_pyarrow()
+            import pyarrow.dataset as ds  # type: ignore  # noqa: PLC0415
+
+            schema = ds.dataset(self.path, format="parquet", partitioning="hive").schema
+            data_fields = [f for f in schema if f.name != PARTITION_COLUMN]
+            self._schema = pa.schema(data_fields)
+            self._columns = [PARTITION_COLUMN, *(f.name for f in data_fields)]
+            # Keep part-file names unique across runs.
+            self._parts = sum(1 for _ in self.path.glob(f"{PARTITION_COLUMN}=*/*.parquet"))
+        else:
+            raise ValueError(
+                f"Cannot append to {self.path}: single-file Parquet/Feather outputs are rewritten, not appended. "
+                "Use a .csv output or --partition-by-date."
+            )
+
+    def write(self, df: pd.DataFrame) -> None:
+        if self._columns is None:
+            self._columns = [str(c) for c in df.columns]
+        df = df.reindex(columns=self._columns)
+
+        if self.format == "csv":
+            df.to_csv(self.path, mode="a", header=self._parts == 0, index=False)
+            self._parts += 1
+            self.rows_written += len(df)
+            return
+
+        pa = _require_pyarrow()
+        if self.partition_by_date:
+            self._write_partitions(df)
+        else:
+            if self._schema is None:
+                self._schema = pa.Table.from_pandas(df, preserve_index=False).schema
+            table = pa.Table.from_pandas(df, schema=self._schema, preserve_index=False)
+
+            if self._writer is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                if self.format == "parquet":
+                    import pyarrow.parquet as pq  # type: ignore  # noqa: PLC0415
+
+                    self._writer = pq.ParquetWriter(self.path, self._schema)
+                else:
+                    import pyarrow.ipc as ipc  # type: ignore  # noqa: PLC0415
+
+                    self._writer = ipc.new_file(str(self.path), self._schema)
+            self._writer.write_table(table)
+
+        self._parts += 1
+        self.rows_written += len(df)
+
+    def _write_partitions(self, df: pd.DataFrame) -> None:
+        import pyarrow as pa  # type: ignore  # noqa: PLC0415
+        import pyarrow.parquet as pq  # type: ignore  # noqa: PLC0415
+
+        if PARTITION_COLUMN not in df.columns:
+            raise ValueError(f"Cannot partition by date: no '{PARTITION_COLUMN}' column.")
+
+        days = pd.to_datetime(df[PARTITION_COLUMN], errors="coerce").dt.strftime("%Y-%m-%d")
+        data = df.drop(columns=[PARTITION_COLUMN])
+        if self._schema is None:
+            self._schema = pa.Table.from_pandas(data, preserve_index=False).schema
+
+        for day, part in data.groupby(days, sort=False):
+            part_dir = self.path / f"{PARTITION_COLUMN}={day}"
+            part_dir.mkdir(parents=True, exist_ok=True)
+            table = pa.Table.from_pandas(part, schema=self._schema, preserve_index=False)
+            pq.write_table(table, part_dir / f"part-{self._parts:05d}.parquet")
+
+    def close(self) -> None:
+        if self._parts == 0 and not self.partition_by_date:
+            if self._columns is not None:
+                self.write(pd.DataFrame(columns=self._columns))
+            else:
+                print(f"WARNING: no rows to write and no known columns; {self.path} was not created.")
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
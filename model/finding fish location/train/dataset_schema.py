@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+
+"""Compact column dtypes shared by the labeling, training, evaluation and prediction scripts.
+
+- measurements (sst, chlor_a, water_u/v, current_speed, depth columns): float32. Random forests
+  split on float32 anyway, so this halves memory without changing any fitted tree.
+- lat / lon: float64. The land mask bins coordinates on a 1/120 degree grid and common 0.1/0.01
+  degree grid lines sit exactly on cell edges; float32 rounding would move them to the next cell.
+- time: datetime64 (parsed once on read instead of kept as strings).
+- fish_presence and fish_presence_<rule set> labels: uint8.
+
+Columns not listed here keep whatever dtype the reader inferred.
+"""
+
+from __future__ import annotations
+
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+
+COORDINATE_COLUMNS = ("lat", "lon")
+MEASUREMENT_COLUMNS = (
+    "sst",
+    "chlor_a",
+    "water_u",
+    "water_v",
+    "current_speed",
+    "elevation",
+    "depth",
+    "bathymetry",
+    "bathymetry_depth_m",
+)
+TIME_COLUMN = "time"
+LABEL_COLUMN = "fish_presence"
+LABEL_PREFIX = LABEL_COLUMN + "_"
+
+MEASUREMENT_DTYPE = np.float32
+COORDINATE_DTYPE = np.float64
+LABEL_DTYPE = np.uint8
+
+
+def column_dtype(name: str) -> Optional[np.dtype]:
+    """Schema dtype for a numeric column, or None for time/unknown columns."""
+    name = str(name).strip().lower()
+    if name in MEASUREMENT_COLUMNS:
+        return np.dtype(MEASUREMENT_DTYPE)
+    if name in COORDINATE_COLUMNS:
+        return np.dtype(COORDINATE_DTYPE)
+    if name == LABEL_COLUMN or name.startswith(LABEL_PREFIX):
+        return np.dtype(LABEL_DTYPE)
+    return None
+
+
+def apply_schema(df: pd.DataFrame) -> pd.DataFrame:
+    """Cast known columns of `df` to the schema dtypes in place and return it.
+
+    Readers parse CSV columns untyped and rely on this cast, so malformed measurement cells
+    ("NaN ", "--") become NaN instead of failing the parse.
+    """
+    for col in df.columns:
+        dtype = column_dtype(col)
+        if str(col).strip().lower() == TIME_COLUMN:
+            if not pd.api.types.is_datetime64_any_dtype(df[col]):
+                df[col] = pd.to_datetime(df[col], errors="coerce")
+        elif dtype is None or df[col].dtype == dtype:
+            continue
+        elif dtype == LABEL_DTYPE:
+            labels = pd.to_numeric(df[col], errors="coerce")
+            if labels.isna().any():
+                raise ValueError(f"Label column '{col}' has missing or non-numeric values.")
+            df[col] = labels.astype(dtype)
+        else:
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype(dtype)
+    return df
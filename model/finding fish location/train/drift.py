@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+
+"""Input drift against the training distribution: PSI and KS per feature, streamed.
+
+`build_reference` summarizes each training feature as a quantile sketch: the 1%..99% quantiles
+used as bin edges, plus the training row count in each of the bins they define. Two outer bins
+catch values below the training minimum or above its maximum. The summary is a small JSON file
+saved next to the model.
+
+`DriftMonitor` bins every incoming batch against those edges and keeps only the per-bin counts.
+Memory is O(bins) per feature however many rows stream through, and `report` scores everything
+seen so far:
+- PSI over deciles of the training distribution (<0.1 stable, 0.1-0.25 moderate, >0.25 drift).
+- KS: the largest gap between the training and incoming CDFs at the percentile edges, compared
+  with the two-sample critical value at `alpha`. It is exact at the edges, and a lower bound on
+  the full-resolution statistic.
+
+Usage:
+  python drift.py --reference models/rf_fish_zone_model_drift.json --data todays_inputs.csv --report drift.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+
+DRIFT_FORMAT_VERSION = 1
+# Percentile edges (1..99) -> 100 inner bins; PSI merges them into deciles.
+QUANTILE_STEPS = 100
+PSI_BINS = 10
+PSI_WARN = 0.1
+PSI_ALERT = 0.25
+KS_ALPHA = 0.01
+# Keeps empty bins from making PSI infinite.
+_PSI_EPS = 1e-4
+
+
+def drift_path_for(model_path: Path) -> Path:
+    return model_path.with_name(f"{model_path.stem}_drift.json")
+
+
+def _bin_counts(values: np.ndarray, edges: np.ndarray, lo: float, hi: float) -> tuple[np.ndarray, int]:
+    """Counts over [below min, inner bins split at `edges`, above max] and the NaN count."""
+    values = np.asarray(values, dtype=np.float64)
+    nan = np.isnan(values)
+    v = values[~nan]
+    inner = np.searchsorted(edges, v, side="right") + 1
+    idx = np.where(v < lo, 0, np.where(v > hi, len(edges) + 2, inner))
+    return np.bincount(idx, minlength=len(edges) + 3), int(nan.sum())
+
+
+def build_reference(df, columns: list[str]) -> dict:
+    """Quantile sketch of each column of `df` (training rows)."""
+    features = {}
+    for col in columns:
+        values = np.asarray(df[col], dtype=np.float64)
+        finite = values[~np.isnan(values)]
+        if not len(finite):
+            continue
+        lo, hi = float(finite.min()), float(finite.max())
+        edges = np.quantile(finite, np.arange(1, QUANTILE_STEPS) / QUANTILE_STEPS)
+        counts, _ = _bin_counts(finite, edges, lo, hi)
+        features[col] = {
+            "min": lo,
+            "max": hi,
+            "mean": float(finite.mean()),
+            "std": float(finite.std()),
+            "edges": edges.tolist(),
+            "counts": counts.tolist(),
+            "nan": int(np.isnan(values).sum()),
+        }
+    return {"version": DRIFT_FORMAT_VERSION, "n_rows": int(len(df)), "features": features}
+
+
+def save_reference(path: Path, reference: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(reference))
+
+
+def load_reference(path: Path) -> dict:
+    reference = json.loads(path.read_text())
+    if reference.get("version") != DRIFT_FORMAT_VERSION:
+        raise ValueError(f"Unsupported drift reference version in {path}; re-run training.")
+    return reference
+
+
+def psi(expected: np.ndarray, actual: np.ndarray) -> float:
+    """Population stability index between two count vectors over the same bins."""
+    e = np.maximum(expected / max(expected.sum(), 1), _PSI_EPS)
+    a = np.maximum(actual / max(actual.sum(), 1), _PSI_EPS)
+    return float(np.sum((a - e) * np.log(a / e)))
+
+
+def ks_critical(n: int, m: int, alpha: float = KS_ALPHA) -> float:
+    """Two-sample KS critical value (asymptotic) for sample sizes `n` and `m`."""
+    return math.sqrt(-0.5 * math.log(alpha / 2)) * math.sqrt((n + m) / (n * m))
+
+
+def _decile_counts(counts: np.ndarray) -> np.ndarray:
+    # Outer bins join the first/last decile; every 10 inner (percentile) bins form one decile.
+    inner = counts[1:-1].copy()
+    inner[0] += counts[0]
+    inner[-1] += counts[-1]
+    return np.add.reduceat(inner, np.arange(0, QUANTILE_STEPS, QUANTILE_STEPS // PSI_BINS))
+
+
+class DriftMonitor:
+    """Accumulates binned counts of incoming batches and scores them against a reference."""
+
+    def __init__(self, reference: dict, columns: Optional[list[str]] = None):
+        self.reference = reference
+        features = reference["features"]
+        self.columns = [c for c in (columns or list(features)) if c in features]
+        self._edges = {c: np.asarray(features[c]["edges"]) for c in self.columns}
+        self._counts = {c: np.zeros(len(features[c]["counts"]), dtype=np.int64) for c in self.columns}
+        self._nan = dict.fromkeys(self.columns, 0)
+
+    def update(self, batch) -> None:
+        """Add a DataFrame (or mapping of column -> values) of new rows."""
+        for col in self.columns:
+            if col not in batch:
+                continue
+            ref = self.reference["features"][col]
+            counts, n_nan = _bin_counts(batch[col], self._edges[col], ref["min"], ref["max"])
+            self._counts[col] += counts
+            self._nan[col] += n_nan
+
+    def report(self, *, alpha: float = KS_ALPHA) -> dict:
+        """Per-feature PSI, KS, out-of-range share and a status of ok / moderate / drift."""
+        out = {}
+        for col in self.columns:
+            ref = self.reference["features"][col]
+            expected = np.asarray(ref["counts"], dtype=np.float64)
+            actual = self._counts[col].astype(np.float64)
+            n, m = int(expected.sum()), int(actual.sum())
+            if m == 0:
+                continue
+
+            psi_value = psi(_decile_counts(expected), _decile_counts(actual))
+            ks = float(np.max(np.abs(np.cumsum(expected) / n - np.cumsum(actual) / m)))
+            critical = ks_critical(n, m, alpha)
+            if psi_value > PSI_ALERT or (ks > critical and psi_value > PSI_WARN):
+                status = "drift"
+            elif psi_value > PSI_WARN or ks > critical:
+                status = "moderate"
+            else:
+                status = "ok"
+            out[col] = {
+                "rows": m,
+                "psi": psi_value,
+                "ks": ks,
+                "ks_critical": critical,
+                "out_of_range": float((actual[0] + actual[-1]) / m),
+                "nan": self._nan[col],
+                "status": status,
+            }
+        return out
+
+
+def format_report(report: dict) -> str:
+    lines = [f"{'feature':<14}{'rows':>10}{'PSI':>9}{'KS':>8}{'KS crit':>9}{'out of range':>14}  status"]
+    for col, r in report.items():
+        lines.append(
+            f"{col:<14}{r['rows']:>10,}{r['psi']:>9.3f}{r['ks']:>8.3f}{r['ks_critical']:>9.3f}"
+            f"{r['out_of_range'] * 100:>13.2f}%  {r['status']}"
+        )
+    return "\n".join(lines)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare new model inputs with the training distribution (PSI/KS).")
+    parser.add_argument("--reference", type=Path, required=True, help="<model stem>_drift.json saved by training.")
+    parser.add_argument("--data", type=Path, required=True, help="New inputs (CSV, Parquet or Feather).")
+    parser.add_argument("--chunksize", type=int, default=200_000, help="Rows per streamed chunk (default: 200000).")
+    parser.add_argument("--alpha", type=float, default=KS_ALPHA, help="KS significance level (default: 0.01).")
+    parser.add_argument("--report", type=Path, default=None, help="Optional JSON report path.")
+    args = parser.parse_args()
+
+    from dataset_io import iter_table_chunks, table_columns  # noqa: PLC0415
+
+    monitor = DriftMonitor(load_reference(args.reference))
+    columns = [c for c in monitor.columns if c in set(table_columns(args.data))]
+    for chunk in iter_table_chunks(args.data, args.chunksize, columns, typed=True):
+        monitor.update(chunk)
+
+    report = monitor.report(alpha=args.alpha)
+    print(format_report(report))
+    if args.report is not None:
+        args.report.write_text(json.dumps(report, indent=2))
+    return 1 if any(r["status"] == "drift" for r in report.values()) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+
+"""Evaluation charts as independent render tasks for `models/evaluate_rf_model.py`.
+
+Each chart is a top-level function that draws one PNG from a small dict of precomputed inputs
+(arrays and scalars), so charts can run in a process pool without shipping the model or dataset.
+A chart is skipped when its output exists and the hash of its inputs matches the one recorded in
+`.chart_hashes.json` in the output folder by the previous run.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+import numpy as np
+
+
+DPI = 180
+HASH_FILE = ".chart_hashes.json"
+# Bump when a chart's drawing code changes, so cached PNGs are re-rendered.
+CHART_STYLE_VERSION = 1
+
+
+def _pyplot():
+    import matplotlib  # noqa: PLC0415
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt  # noqa: PLC0415
+
+    return plt
+
+
+def _save(fig, path: Path) -> None:
+    fig.tight_layout()
+    fig.savefig(path, dpi=DPI)
+    _pyplot().close(fig)
+
+
+def confusion_chart(path: Path, *, matrix: np.ndarray) -> None:
+    from sklearn.metrics import ConfusionMatrixDisplay  # noqa: PLC0415
+
+    fig, ax = _pyplot().subplots(figsize=(5, 5))
+    ConfusionMatrixDisplay(confusion_matrix=matrix).plot(ax=ax, values_format="d", colorbar=False)
+    ax.set_title("Confusion Matrix")
+    _save(fig, path)
+
+
+def roc_chart(path: Path, *, fpr: np.ndarray, tpr: np.ndarray, auc: float) -> None:
+    fig, ax = _pyplot().subplots(figsize=(6, 5))
+    ax.plot(fpr, tpr, label=f"AUC={auc:.3f}")
+    ax.plot([0, 1], [0, 1], linestyle="--", linewidth=1)
+    ax.set_xlabel("False Positive Rate")
+    ax.set_ylabel("True Positive Rate")
+    ax.set_title("ROC Curve")
+    ax.legend(loc="lower right")
+    _save(fig, path)
+
+
+def pr_chart(path: Path, *, precision: np.ndarray, recall: np.ndarray, ap: float) -> None:
+    fig, ax = _pyplot().subplots(figsize=(6, 5))
+    ax.plot(recall, precision, label=f"AP={ap:.3f}")
+    ax.set_xlabel("Recall")
+    ax.set_ylabel("Precision")
+    ax.set_title("Precision-Recall Curve")
+    ax.legend(loc="lower left")
+    _save(fig, path)
+
+
+def calibration_chart(path: Path, *, frac_pos: np.ndarray, mean_pred: np.ndarray) -> None:
+    fig, ax = _pyplot().subplots(figsize=(6, 5))
+    ax.plot(mean_pred, frac_pos, marker="o", label="Model")
+    ax.plot([0, 1], [0, 1], linestyle="--", linewidth=1, label="Perfect")
+    ax.set_xlabel("Mean predicted probability")
+    ax.set_ylabel("Fraction of positives")
+    ax.set_title("Calibration Curve")
+    ax.legend(loc="upper left")
+    _save(fig, path)
+
+
+def probability_hist_chart(path: Path, *, proba_neg: np.ndarray, proba_pos: np.ndarray) -> None:
+    fig, ax = _pyplot().subplots(figsize=(6, 5))
+    ax.hist(proba_neg, bins=30, alpha=0.7, label="True=0")
+    ax.hist(proba_pos, bins=30, alpha=0.7, label="True=1")
+    ax.set_xlabel("Predicted probability (class=1)")
+    ax.set_ylabel("Count")
+    ax.set_title("Predicted Probability Distribution")
+    ax.legend(loc="upper center")
+    _save(fig, path)
+
+
+def threshold_chart(path: Path, *, thresholds: np.ndarray, curves: dict[str, np.ndarray], best_f1: float) -> None:
+    fig, ax = _pyplot().subplots(figsize=(7, 5))
+    for label, values in curves.items():
+        ax.plot(thresholds, values, label=label)
+    ax.axvline(best_f1, linestyle="--", linewidth=1, color="gray")
+    ax.set_xlabel("Threshold")
+    ax.set_ylabel("Score")
+    ax.set_title("Metrics vs Threshold")
+    ax.set_ylim(0, 1.0)
+    ax.legend(loc="best")
+    _save(fig, path)
+
+
+def logloss_chart(path: Path, *, per_sample_nll: np.ndarray) -> None:
+    fig, ax = _pyplot().subplots(figsize=(6, 5))
+    ax.hist(per_sample_nll, bins=40, alpha=0.85)
+    ax.set_xlabel("Per-sample negative log-likelihood")
+    ax.set_ylabel("Count")
+    ax.set_title("Log Loss Distribution")
+    _save(fig, path)
+
+
+def importances_chart(path: Path, *, names: list[str], values: np.ndarray) -> None:
+    fig, ax = _pyplot().subplots(figsize=(7, 4))
+    ax.bar(range(len(values)), values)
+    ax.set_xticks(range(len(values)))
+    ax.set_xticklabels(names, rotation=35, ha="right")
+    ax.set_ylabel("Importance")
+    ax.set_title("Feature Importances")
+    _save(fig, path)
+
+
+def attribution_chart(path: Path, *, names: list[str], shares: dict[str, np.ndarray]) -> None:
+    """Side-by-side bars per feature; each method is scaled to sum to 1 so they share one axis."""
+    fig, ax = _pyplot().subplots(figsize=(8, 4.5))
+    width = 0.8 / max(len(shares), 1)
+    positions = np.arange(len(names))
+    for i, (label, values) in enumerate(shares.items()):
+        total = values.sum()
+        ax.bar(positions + i * width, values / total if total > 0 else values, width, label=label)
+    ax.set_xticks(positions + width * (len(shares) - 1) / 2)
+    ax.set_xticklabels(names, rotation=35, ha="right")
+    ax.set_ylabel("Share of total")
+    ax.set_title("Feature Attribution")
+    ax.legend(loc="best")
+    _save(fig, path)
+
+
+# name -> (output file, render function)
+CHARTS: dict[str, tuple[str, Callable[..., None]]] = {
+    "confusion": ("rf_confusion_matrix.png", confusion_chart),
+    "roc": ("rf_roc_curve.png", roc_chart),
+    "pr": ("rf_pr_curve.png", pr_chart),
+    "calibration": ("rf_calibration_curve.png", calibration_chart),
+    "probability": ("rf_probability_hist.png", probability_hist_chart),
+    "threshold": ("rf_metrics_vs_threshold.png", threshold_chart),
+    "logloss": ("rf_logloss_distribution.png", logloss_chart),
+    "importances": ("rf_feature_importances.png", importances_chart),
+    "attribution": ("rf_feature_attribution.png", attribution_chart),
+}
+
+
+def parse_chart_selection(value: str) -> list[str]:
+    """`all`, `none` or a comma-separated list of chart names."""
+    value = value.strip().lower()
+    if value == "all":
+        return list(CHARTS)
+    if value == "none":
+        return []
+    names = [v.strip() for v in value.split(",") if v.strip()]
+    unknown = [n for n in names if n not in CHARTS]
+    if unknown:
+        raise ValueError(f"Unknown charts {unknown}; choose from all, none, {', '.join(CHARTS)}.")
+    return list(dict.fromkeys(names))
+
+
+def inputs_hash(name: str, inputs: dict[str, Any]) -> str:
+    """Stable digest of a chart's inputs (array bytes, dtypes and shapes included)."""
+    digest = hashlib.sha256(f"{name}:{CHART_STYLE_VERSION}:{DPI}".encode())
+
+    def feed(key: str, value: Any) -> None:
+        digest.update(key.encode())
+        if isinstance(value, dict):
+            for k in sorted(value):
+                feed(f"{key}.{k}", value[k])
+        elif isinstance(value, np.ndarray):
+            arr = np.ascontiguousarray(value)
+            digest.update(f"{arr.dtype.str}{arr.shape}".encode())
+            digest.update(arr.tobytes())
+        else:
+            digest.update(json.dumps(value, default=str).encode())
+
+    for key in sorted(inputs):
+        feed(key, inputs[key])
+    return digest.hexdigest()
+
+
+def _render(name: str, path: str, inputs: dict[str, Any]) -> str:
+    CHARTS[name][1](Path(path), **inputs)
+    return name
+
+
+def render_charts(
+    tasks: dict[str, dict[str, Any]], output_dir: Path, *, jobs: Optional[int] = None
+) -> tuple[list[str], list[str]]:
+    """Render `{chart name: inputs}` into `output_dir`; returns (rendered, skipped unchanged) names."""
+    hash_path = output_dir / HASH_FILE
+    try:
+        previous = json.loads(hash_path.read_text())
+    except (OSError, ValueError):
+        previous = {}
+
+    hashes = {name: inputs_hash(name, inputs) for name, inputs in tasks.items()}
+    todo, skipped = [], []
+    for name in tasks:
+        out = output_dir / CHARTS[name][0]
+        if out.exists() and previous.get(out.name) == hashes[name]:
+            skipped.append(name)
+        else:
+            todo.append(name)
+
+    workers = max(1, min(jobs or os.cpu_count() or 1, len(todo)))
+    args = [(name, str(output_dir / CHARTS[name][0]), tasks[name]) for name in todo]
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            rendered = list(pool.map(_render, *zip(*args)))
+    else:
+        rendered = [_render(*a) for a in args]
+
+    # Rendered and skipped charts both match their current inputs; charts not selected keep their entries.
+    previous.update({CHARTS[name][0]: hashes[name] for name in tasks})
+    hash_path.write_text(json.dumps(previous, indent=2, sort_keys=True))
+    return rendered, skipped
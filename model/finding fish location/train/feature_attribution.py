@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+
+"""Feature attribution for the fish-zone forest: permutation importance and tree-path contributions.
+
+Impurity-based `feature_importances_` favour features with many distinct split points (lat/lon).
+- Permutation importance is the drop in test score (ROC AUC for binary models, else accuracy) when
+  one feature column is shuffled. All repeats for a feature are stacked into one batch and scored
+  with a single `predict_proba` call. Features are spread over a process pool whose workers load
+  the model once.
+- Tree-path contributions split every predicted probability into a bias plus one share per feature,
+  following each row's path through the compiled forest. See `CompiledForest.path_contributions`.
+
+Both run on a random subsample of at most `max_samples` test rows, so the cost does not grow with
+the test set.
+"""
+
+from __future__ import annotations
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Optional, Union
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import accuracy_score, roc_auc_score
+
+from compiled_forest import compile_pipeline
+
+
+ATTRIBUTION_METHODS = ("none", "permutation", "contributions", "all")
+
+# Set in each worker process by `_init_worker`: model, feature names, features, labels.
+_WORKER: dict[str, Any] = {}
+
+
+def subsample(n_rows: int, max_samples: Optional[int], seed: int) -> np.ndarray:
+    """Sorted positions of at most `max_samples` of `n_rows` rows (all rows when None or larger)."""
+    if max_samples is None or max_samples >= n_rows:
+        return np.arange(n_rows)
+    return np.sort(np.random.default_rng(seed).choice(n_rows, size=max_samples, replace=False))
+
+
+def _positive_index(classes: np.ndarray) -> int:
+    return int(np.flatnonzero(classes == 1)[0]) if 1 in classes else len(classes) - 1
+
+
+def _score(proba: np.ndarray, classes: np.ndarray, y: np.ndarray) -> float:
+    if len(classes) == 2 and len(np.unique(y)) == 2:
+        return float(roc_auc_score(y, proba[:, _positive_index(classes)]))
+    return float(accuracy_score(y, classes[np.argmax(proba, axis=1)]))
+
+
+def _load_model(model: Union[str, Path, Any]):
+    if not isinstance(model, (str, Path)):
+        return model
+    from predict_fish_zone import load_artifact  # noqa: PLC0415
+
+    loaded, _ = load_artifact(Path(model))
+    inner = getattr(loaded, "named_steps", {}).get("model")
+    if inner is not None:
+        inner.set_params(n_jobs=1)  # the pool supplies the parallelism
+    return loaded
+
+
+def _init_worker(model, columns: list[str], X: np.ndarray, y: np.ndarray) -> None:
+    _WORKER.update(model=_load_model(model), columns=columns, X=X, y=y)
+
+
+def _permute_feature(feature: int, n_repeats: int, seed: int) -> np.ndarray:
+    """Scores with column `feature` shuffled, one per repeat, from one stacked prediction batch."""
+    model, X, y = _WORKER["model"], _WORKER["X"], _WORKER["y"]
+    rng = np.random.default_rng([seed, feature])
+    n = len(X)
+    batch = np.tile(X, (n_repeats, 1))
+    for r in range(n_repeats):
+        batch[r * n : (r + 1) * n, feature] = X[rng.permutation(n), feature]
+
+    # Named columns, as the pipeline was fitted on a DataFrame.
+    proba = model.predict_proba(pd.DataFrame(batch, columns=_WORKER["columns"]))
+    classes = np.asarray(model.classes_)
+    return np.array([_score(proba[r * n : (r + 1) * n], classes, y) for r in range(n_repeats)])
+
+
+def permutation_importance(
+    model,
+    feature_columns: list[str],
+    X: np.ndarray,
+    y: np.ndarray,
+    *,
+    n_repeats: int = 5,
+    n_jobs: Optional[int] = None,
+    seed: int = 42,
+    model_path: Optional[Path] = None,
+) -> tuple[float, np.ndarray]:
+    """Baseline score and an (n_features, n_repeats) array of score drops.
+
+    With more than one job, workers load `model_path` (a .pkl or .forest) themselves instead of
+    receiving a pickled copy of `model`; without a path the pool is not used.
+    """
+    X = np.asarray(X, dtype=np.float64)
+    y = np.asarray(y)
+    columns = list(feature_columns)
+    baseline = _score(model.predict_proba(pd.DataFrame(X, columns=columns)), np.asarray(model.classes_), y)
+
+    n_features = X.shape[1]
+    workers = max(1, min(n_jobs if n_jobs and n_jobs > 0 else (os.cpu_count() or 1), n_features))
+    if workers > 1 and model_path is not None:
+        init = (model_path, columns, X, y)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=init) as pool:
+            scores = list(pool.map(_permute_feature, range(n_features), [n_repeats] * n_features, [seed] * n_features))
+    else:
+        _init_worker(model, columns, X, y)
+        try:
+            scores = [_permute_feature(f, n_repeats, seed) for f in range(n_features)]
+        finally:
+            _WORKER.clear()
+    return baseline, baseline - np.vstack(scores)
+
+
+def path_contributions(model, feature_columns: list[str], X: np.ndarray) -> tuple[float, np.ndarray]:
+    """Tree-path contributions to the positive-class probability (compiles a .pkl pipeline in memory)."""
+    forest = model if hasattr(model, "path_contributions") else compile_pipeline(model, feature_columns)
+    return forest.path_contributions(X, _positive_index(np.asarray(forest.classes)))
+
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+
+from __future__ import annotations
+
+import argparse
+import math
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from scipy.spatial import cKDTree
+
+from dataset_io import iter_table_chunks
+from instrumentation import add_profile_arguments, stage, start_profiling
+from land_mask import SRI_LANKA_BBOX, BBox, sri_lanka_land_mask
+from predict_fish_zone import DEFAULT_BATCH_SIZE, DEFAULT_MODEL_PATH, load_artifact
+
+
+KM_PER_DEGREE_LAT = 111.32
+ENVIRONMENT_COLUMNS = ["sst", "chlor_a", "water_u", "water_v"]
+
+
+def parse_resolution(value: str) -> float:
+    """Parse a grid step: '4km' (converted with 111.32 km per degree) or decimal degrees ('0.05')."""
+    text = str(value).strip().lower()
+    try:
+        if text.endswith("km"):
+            step = float(text[:-2]) / KM_PER_DEGREE_LAT
+        else:
+            step = float(text.rstrip("°").removesuffix("deg"))
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(f"Invalid resolution: {value!r} (use e.g. '4km' or '0.05')") from exc
+    if step <= 0:
+        raise argparse.ArgumentTypeError("Resolution must be positive.")
+    return step
+
+
+def grid_axes(bbox: BBox, step_deg: float) -> tuple[np.ndarray, np.ndarray]:
+    """Cell-centre latitudes (north to south, image row order) and longitudes (west to east)."""
+    n_rows = max(1, math.ceil((bbox.lat_max - bbox.lat_min) / step_deg))
+    n_cols = max(1, math.ceil((bbox.lon_max - bbox.lon_min) / step_deg))
+    lat = bbox.lat_max - (np.arange(n_rows) + 0.5) * step_deg
+    lon = bbox.lon_min + (np.arange(n_cols) + 0.5) * step_deg
+    return lat, lon
+
+
+def load_day_points(path: Path, date: pd.Timestamp | None, bbox: BBox, margin: float, batch_size: int) -> pd.DataFrame:
+    """Read observations for one date near `bbox`, streaming the input in chunks.
+
+    Duplicate (lat, lon) observations for the day are averaged.
+    """
+    keep = []
+    for chunk in iter_table_chunks(path, batch_size, typed=True):
+        chunk.columns = [str(c).strip().lower() for c in chunk.columns]
+        missing = [c for c in ["lat", "lon", *ENVIRONMENT_COLUMNS] if c not in chunk.columns]
+        if missing:
+            raise ValueError(f"Missing required columns: {missing}. Found: {list(chunk.columns)}")
+
+        mask = (
+            chunk["lat"].between(bbox.lat_min - margin, bbox.lat_max + margin)
+            & chunk["lon"].between(bbox.lon_min - margin, bbox.lon_max + margin)
+        )
+        if date is not None:
+            if "time" not in chunk.columns:
+                raise ValueError("--date was given but the input has no 'time' column.")
+            mask &= pd.to_datetime(chunk["time"], errors="coerce").dt.normalize() == date
+        if mask.any():
+            keep.append(chunk.loc[mask, ["lat", "lon", *ENVIRONMENT_COLUMNS]])
+
+    if not keep:
+        return pd.DataFrame(columns=["lat", "lon", *ENVIRONMENT_COLUMNS])
+    return pd.concat(keep, ignore_index=True).groupby(["lat", "lon"], as_index=False).mean()
+
+
+def build_probability_raster(
+    pipeline,
+    feature_columns: list[str],
+    points: pd.DataFrame,
+    lat_axis: np.ndarray,
+    lon_axis: np.ndarray,
+    *,
+    max_distance: float,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Score every sea cell of the grid in one vectorized pass.
+
+    Returns `(probability, land)`: float32 probability of class 1 (NaN for land cells and
+    cells with no observation within `max_distance` degrees) and the boolean land mask.
+    """
+    lat_grid, lon_grid = np.meshgrid(lat_axis, lon_axis, indexing="ij")
+    with stage("land_mask", rows=lat_grid.size):
+        land = sri_lanka_land_mask(lat_grid, lon_grid)
+    probability = np.full(lat_grid.shape, np.nan, dtype=np.float32)
+
+    sea_idx = np.flatnonzero(~land.ravel())
+    if len(points) == 0 or len(sea_idx) == 0:
+        return probability, land
+
+    # Nearest observation for each sea cell (land cells were dropped up front).
+    tree = cKDTree(points[["lat", "lon"]].to_numpy(dtype=float))
+    cell_xy = np.column_stack([lat_grid.ravel()[sea_idx], lon_grid.ravel()[sea_idx]])
+    dist, nearest = tree.query(cell_xy, k=1, distance_upper_bound=max_distance)
+    found = np.isfinite(dist)
+    if not found.any():
+        return probability, land
+
+    cells = sea_idx[found]
+    env = points[ENVIRONMENT_COLUMNS].to_numpy(dtype=float)[nearest[found]]
+    X = pd.DataFrame(env, columns=ENVIRONMENT_COLUMNS)
+    X.insert(0, "lon", cell_xy[found, 1])
+    X.insert(0, "lat", cell_xy[found, 0])
+
+    classes = np.asarray(pipeline.classes_)
+    with stage("predict", rows=len(X)):
+        class_proba = pipeline.predict_proba(X[feature_columns])
+    probability.ravel()[cells] = class_proba[:, int(np.flatnonzero(classes == 1)[0])]
+    return probability, land
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Generate a fish-zone probability raster over the Sri Lanka bounding box for one date "
+            "from gridded SST, chlorophyll and currents (e.g. merged.csv)."
+        )
+    )
+    parser.add_argument(
+        "--input",
+        type=Path,
+        required=True,
+        help="CSV, Parquet or Feather with lat, lon, time, sst, chlor_a, water_u, water_v.",
+    )
+    parser.add_argument("--date", default=None, help="Date to map (YYYY-MM-DD). Default: use all rows.")
+    parser.add_argument(
+        "--model",
+        type=Path,
+        default=DEFAULT_MODEL_PATH,
+        help="Path to the saved model artifact (joblib .pkl or compiled .forest directory).",
+    )
+    parser.add_argument(
+        "--resolution",
+        type=parse_resolution,
+        default=parse_resolution("4km"),
+        help="Grid step, in km ('4km') or decimal degrees ('0.05'). Default: 4km.",
+    )
+    parser.add_argument(
+        "--max-distance",
+        type=float,
+        default=0.25,
+        help="Max distance (degrees) from a grid cell to the nearest observation; farther cells are no-data.",
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=None,
+        help="Output .npz (default: fish_zone_map_<date>.npz next to the input).",
+    )
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Rows read per input chunk.")
+    add_profile_arguments(parser)
+
+    args = parser.parse_args()
+    start_profiling("generate_fish_zone_map", args)
+
+    if not args.input.exists():
+        raise FileNotFoundError(f"Input file not found: {args.input}")
+
+    date = pd.Timestamp(args.date).normalize() if args.date else None
+    out_path = args.output or args.input.with_name(
+        f"fish_zone_map_{date.date() if date is not None else 'all'}.npz"
+    )
+
+    with stage("load_model"):
+        pipeline, feature_columns = load_artifact(args.model)
+    with stage("load") as timed:
+        points = load_day_points(args.input, date, SRI_LANKA_BBOX, args.max_distance, args.batch_size)
+        timed.rows = len(points)
+    lat_axis, lon_axis = grid_axes(SRI_LANKA_BBOX, args.resolution)
+
+    probability, land = build_probability_raster(
+        pipeline, feature_columns, points, lat_axis, lon_axis, max_distance=args.max_distance
+    )
+
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    with stage("write", rows=probability.size):
+        np.savez_compressed(
+            out_path,
+            probability=probability,
+            land=np.packbits(land, axis=None),
+            shape=np.asarray(probability.shape, dtype=np.int64),
+            lat=lat_axis.astype(np.float32),
+            lon=lon_axis.astype(np.float32),
+            resolution_deg=np.float64(args.resolution),
+            date=np.str_(str(date.date()) if date is not None else ""),
+        )
+
+    scored = int(np.isfinite(probability).sum())
+    print(f"Grid {probability.shape[0]} x {probability.shape[1]} at {args.resolution:.4f} deg")
+    print(f"Land cells: {int(land.sum()):,}; scored sea cells: {scored:,}; no-data: {probability.size - scored - int(land.sum()):,}")
+    print(f"Wrote probability raster to {out_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
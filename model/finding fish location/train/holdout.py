@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+
+"""Held-out predictions saved at training time for `models/evaluate_rf_model.py`.
+
+`train_random_forest.py` already scores its test split, so it stores the test row positions, labels
+and class probabilities, plus the forest's out-of-bag probabilities for the training rows, in one
+`.npz` next to the artifact. Evaluation loads that file instead of re-reading the dataset, re-running
+the land mask, re-splitting and re-predicting. A `run_id` shared with the `.pkl` artifact detects a
+file left over from a different training run.
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+
+HOLDOUT_FORMAT_VERSION = 1
+
+
+@dataclass(frozen=True)
+class HoldoutPredictions:
+    """Test rows (positions in the land-filtered dataset) with labels and probabilities.
+
+    `oob_y` / `oob_proba` are the training rows' labels and out-of-bag class probabilities (None when
+    the forest was trained without OOB scoring). `meta` records how the split was made.
+    """
+
+    run_id: str
+    classes: np.ndarray
+    test_index: np.ndarray
+    y_test: np.ndarray
+    proba: np.ndarray
+    oob_y: Optional[np.ndarray]
+    oob_proba: Optional[np.ndarray]
+    meta: dict
+
+    @property
+    def y_pred(self) -> np.ndarray:
+        """Predicted classes, as `pipeline.predict` would return them."""
+        return self.classes[np.argmax(self.proba, axis=1)]
+
+
+def holdout_path_for(model_path: Path) -> Path:
+    return model_path.with_name(f"{model_path.stem}_holdout.npz")
+
+
+def save_holdout(path: Path, holdout: HoldoutPredictions) -> None:
+    arrays = {
+        "classes": holdout.classes,
+        "test_index": holdout.test_index.astype(np.int32),
+        "y_test": holdout.y_test,
+        "proba": holdout.proba,
+    }
+    if holdout.oob_proba is not None:
+        arrays["oob_y"] = holdout.oob_y
+        # OOB probabilities only feed summary metrics, so float32 halves the file.
+        arrays["oob_proba"] = holdout.oob_proba.astype(np.float32)
+    meta = {"version": HOLDOUT_FORMAT_VERSION, "run_id": holdout.run_id, **holdout.meta}
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    np.savez(path, meta=np.str_(json.dumps(meta, sort_keys=True)), **arrays)
+
+
+def load_holdout(path: Path) -> HoldoutPredictions:
+    with np.load(path) as data:
+        meta = json.loads(str(data["meta"]))
+        if meta.pop("version", None) != HOLDOUT_FORMAT_VERSION:
+            raise ValueError(f"Unsupported holdout file version in {path}; re-run training.")
+        return HoldoutPredictions(
+            run_id=meta.pop("run_id"),
+            classes=data["classes"],
+            test_index=data["test_index"],
+            y_test=data["y_test"],
+            proba=data["proba"],
+            oob_y=data["oob_y"] if "oob_y" in data else None,
+            oob_proba=data["oob_proba"] if "oob_proba" in data else None,
+            meta=meta,
+        )
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+
+"""Bookkeeping for incremental (daily append) runs of the pipeline scripts.
+
+A manifest next to each output (`<output>.manifest.json`) records which dates are already in the
+output and a fingerprint of every input as it was last read. On the next run only the new part of
+each input is read:
+- CSV that only grew (same bytes up to the recorded size): just the appended tail is parsed.
+- date-partitioned Parquet directory: just the `time=YYYY-MM-DD/` folders not seen before.
+- anything else (rewritten file, other formats): the whole input is read, and rows for dates already
+  in the manifest are skipped by the caller.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Iterator, Optional
+
+import pandas as pd
+
+from dataset_io import PARTITION_COLUMN, iter_table_chunks, table_columns, table_format
+
+
+MANIFEST_VERSION = 1
+_HASH_BLOCK = 1 << 20
+
+
+def manifest_path_for(output: Path) -> Path:
+    return output.with_name(output.name + ".manifest.json")
+
+
+def load_manifest(output: Path) -> dict:
+    """Return the manifest for `output`, or an empty one if the output or manifest is missing."""
+    path = manifest_path_for(output)
+    if not output.exists() or not path.exists():
+        return {"version": MANIFEST_VERSION, "dates": [], "inputs": {}}
+    manifest = json.loads(path.read_text())
+    if manifest.get("version") != MANIFEST_VERSION:
+        raise ValueError(f"Unsupported manifest version in {path}; delete it to rebuild from scratch.")
+    return manifest
+
+
+def save_manifest(output: Path, manifest: dict) -> None:
+    path = manifest_path_for(output)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(manifest, indent=2, sort_keys=True))
+    tmp.replace(path)
+
+
+def _file_state(path: Path, prev_size: int) -> tuple[dict, Optional[str]]:
+    """Hash `path` in one pass; also return the hash of its first `prev_size` bytes."""
+    digest = hashlib.sha256()
+    prefix_hash = None
+    read = 0
+    with path.open("rb") as fh:
+        while True:
+            want = _HASH_BLOCK
+            if prefix_hash is None and prev_size > read:
+                want = min(want, prev_size - read)
+            block = fh.read(want)
+            if not block:
+                break
+            digest.update(block)
+            read += len(block)
+            if prefix_hash is None and read == prev_size:
+                prefix_hash = digest.copy().hexdigest()
+    if prev_size == 0:
+        prefix_hash = None
+    return {"path": str(path), "size": read, "sha256": digest.hexdigest()}, prefix_hash
+
+
+def _ends_with_newline(path: Path, size: int) -> bool:
+    with path.open("rb") as fh:
+        fh.seek(size - 1)
+        return fh.read(1) == b"\n"
+
+
+def _iter_csv_tail(path: Path, offset: int, chunksize: int) -> Iterator[pd.DataFrame]:
+    columns = table_columns(path)
+    with path.open("rb") as fh:
+        fh.seek(offset)
+        yield from pd.read_csv(fh, header=None, names=columns, chunksize=chunksize)
+
+
+def _iter_partitions(path: Path, days: list[str], chunksize: int) -> Iterator[pd.DataFrame]:
+    for day in days:
+        for chunk in iter_table_chunks(path / f"{PARTITION_COLUMN}={day}", chunksize):
+            chunk[PARTITION_COLUMN] = pd.Timestamp(day)
+            yield chunk
+
+
+def iter_new_chunks(path: Path, prev: Optional[dict], chunksize: int) -> tuple[Iterator[pd.DataFrame], dict, bool]:
+    """Chunks of `path` added since the state `prev` was recorded.
+
+    Returns `(chunks, state, partial)`: `state` is the fingerprint to store for the next run and
+    `partial` tells whether only new data is yielded (False means the whole input is re-read).
+    """
+    prev = prev or {}
+
+    if path.is_dir():
+        days = sorted(p.name.split("=", 1)[1] for p in path.glob(f"{PARTITION_COLUMN}=*") if p.is_dir())
+        seen = set(prev.get("partitions", []))
+        new_days = [d for d in days if d not in seen]
+        return _iter_partitions(path, new_days, chunksize), {"path": str(path), "partitions": days}, bool(seen)
+
+    prev_size = int(prev.get("size", 0)) if prev.get("path") == str(path) else 0
+    state, prefix_hash = _file_state(path, prev_size)
+
+    if table_format(path) == "csv" and prev_size and prefix_hash == prev.get("sha256"):
+        if state["size"] == prev_size:
+            return iter(()), state, True
+        if _ends_with_newline(path, prev_size):
+            return _iter_csv_tail(path, prev_size, chunksize), state, True
+
+    return iter_table_chunks(path, chunksize), state, False
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+
+"""Stage timing and optional profiling shared by the CLI scripts.
+
+Scripts mark their phases with `with stage("fit", rows=len(X)):`. Nothing is recorded unless
+profiling is on: `--profile MODE` on any script, or the `FISH_PROFILE=MODE` environment variable
+for nightly jobs that call several scripts. Modes:
+- stages: wall time, CPU time, peak RSS and rows/s for every stage.
+- tracemalloc: also the peak Python/NumPy allocation inside each stage.
+- cprofile: also a cProfile of the whole run, saved as `<output stem>.prof`. Its top functions are
+  listed in the JSON.
+
+At exit, the run is written as JSON to `--profile-output`, or `$FISH_PROFILE_DIR/<script>_profile.json`
+(default: current directory). Only the standard library is imported here, so the fast-start
+prediction CLI stays light.
+"""
+
+from __future__ import annotations
+
+import argparse
+import atexit
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+try:
+    import resource
+except ImportError:  # not available on Windows; RSS and child CPU are then omitted
+    resource = None
+
+
+PROFILE_MODES = ("stages", "tracemalloc", "cprofile")
+PROFILE_ENV = "FISH_PROFILE"
+PROFILE_DIR_ENV = "FISH_PROFILE_DIR"
+CPROFILE_TOP = 25
+
+_ACTIVE: Optional["_Run"] = None
+
+
+class Stage:
+    """Handle yielded by `stage()`; set `rows` once the row count is known."""
+
+    def __init__(self, name: str, rows: Optional[int] = None):
+        self.name = name
+        self.rows = rows
+
+
+def _peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == "darwin" else peak / 1024  # bytes on macOS, KiB on Linux
+
+
+def _children_cpu() -> float:
+    if resource is None:
+        return 0.0
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+class _Run:
+    def __init__(self, script: str, mode: str, output: Path):
+        self.script = script
+        self.mode = mode
+        self.output = output
+        self.stages: list[dict[str, Any]] = []
+        self._open: list[str] = []
+        self._started_at = datetime.now(timezone.utc).isoformat()
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
+        self._children = _children_cpu()
+        self._profiler = None
+
+        if mode == "tracemalloc":
+            import tracemalloc  # noqa: PLC0415
+
+            tracemalloc.start()
+        elif mode == "cprofile":
+            import cProfile  # noqa: PLC0415
+
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+
+    @contextmanager
+    def stage(self, handle: Stage) -> Iterator[Stage]:
+        tracing = None
+        if self.mode == "tracemalloc":
+            import tracemalloc as tracing  # noqa: PLC0415
+
+            tracing.reset_peak()
+        rss_before = _peak_rss_mb()
+        wall, cpu, children = time.perf_counter(), time.process_time(), _children_cpu()
+        parent = self._open[-1] if self._open else None
+        self._open.append(handle.name)
+        try:
+            yield handle
+        finally:
+            self._open.pop()
+            wall = time.perf_counter() - wall
+            record: dict[str, Any] = {
+                "stage": handle.name,
+                "parent": parent,
+                "wall_s": wall,
+                "cpu_s": time.process_time() - cpu,
+                "children_cpu_s": _children_cpu() - children,
+                "rows": handle.rows,
+                "rows_per_s": handle.rows / wall if handle.rows and wall > 0 else None,
+            }
+            rss_after = _peak_rss_mb()
+            if rss_after is not None:
+                record["peak_rss_mb"] = rss_after
+                record["peak_rss_growth_mb"] = rss_after - rss_before
+            if tracing is not None:
+                record["peak_traced_mb"] = tracing.get_traced_memory()[1] / 2**20
+            self.stages.append(record)
+
+    def summary(self) -> dict[str, dict[str, Any]]:
+        """Stages grouped by name: streamed scripts enter the same stage once per chunk."""
+        out: dict[str, dict[str, Any]] = {}
+        for record in self.stages:
+            total = out.setdefault(record["stage"], {"calls": 0, "wall_s": 0.0, "cpu_s": 0.0, "rows": 0})
+            total["calls"] += 1
+            total["wall_s"] += record["wall_s"]
+            total["cpu_s"] += record["cpu_s"]
+            total["rows"] += record["rows"] or 0
+        for total in out.values():
+            total["rows_per_s"] = total["rows"] / total["wall_s"] if total["rows"] and total["wall_s"] > 0 else None
+        return out
+
+    def finish(self) -> None:
+        report: dict[str, Any] = {
+            "script": self.script,
+            "argv": sys.argv[1:],
+            "mode": self.mode,
+            "started_at": self._started_at,
+            "total": {
+                "wall_s": time.perf_counter() - self._wall,
+                "cpu_s": time.process_time() - self._cpu,
+                "children_cpu_s": _children_cpu() - self._children,
+                "peak_rss_mb": _peak_rss_mb(),
+            },
+            "summary": self.summary(),
+            "stages": self.stages,
+        }
+        if self._profiler is not None:
+            import pstats  # noqa: PLC0415
+
+            self._profiler.disable()
+            prof_path = self.output.with_suffix(".prof")
+            self._profiler.dump_stats(prof_path)
+            stats = pstats.Stats(self._profiler)
+            top = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:CPROFILE_TOP]
+            report["cprofile_file"] = str(prof_path)
+            report["cprofile_top"] = [
+                {"function": f"{file}:{line}({name})", "calls": nc, "tottime_s": tt, "cumtime_s": ct}
+                for (file, line, name), (_, nc, tt, ct, _) in top
+            ]
+        elif self.mode == "tracemalloc":
+            import tracemalloc  # noqa: PLC0415
+
+            tracemalloc.stop()
+
+        self.output.parent.mkdir(parents=True, exist_ok=True)
+        self.output.write_text(json.dumps(report, indent=2))
+        print(f"Profile written to {self.output}", file=sys.stderr)
+
+
+def add_profile_arguments(parser: argparse.ArgumentParser) -> None:
+    group = parser.add_argument_group("profiling")
+    group.add_argument(
+        "--profile",
+        choices=PROFILE_MODES,
+        default=os.environ.get(PROFILE_ENV) or None,
+        help=(
+            "Record per-stage wall/CPU time, peak RSS and rows/s as JSON; tracemalloc adds per-stage "
+            f"allocation peaks, cprofile a function profile (default: ${PROFILE_ENV}, else off)."
+        ),
+    )
+    group.add_argument(
+        "--profile-output",
+        type=Path,
+        default=None,
+        help=f"Profile JSON path (default: ${PROFILE_DIR_ENV} or the current directory, <script>_profile.json).",
+    )
+
+
+def start_profiling(script: str, args: argparse.Namespace) -> None:
+    """Begin recording if `args.profile` is set; the JSON is written when the process exits."""
+    global _ACTIVE
+    mode = getattr(args, "profile", None)
+    if not mode or _ACTIVE is not None:
+        return
+    if mode not in PROFILE_MODES:
+        raise ValueError(f"Unknown profile mode {mode!r} (from ${PROFILE_ENV}); expected one of {PROFILE_MODES}.")
+    output = getattr(args, "profile_output", None)
+    if output is None:
+        output = Path(os.environ.get(PROFILE_DIR_ENV, ".")) / f"{script}_profile.json"
+    _ACTIVE = _Run(script, mode, output)
+    atexit.register(_ACTIVE.finish)
+
+
+@contextmanager
+def stage(name: str, rows: Optional[int] = None) -> Iterator[Stage]:
+    """Time a phase of the current script; a no-op unless profiling was started."""
+    handle = Stage(name, rows)
+    if _ACTIVE is None:
+        yield handle
+        return
+    with _ACTIVE.stage(handle):
+        yield handle
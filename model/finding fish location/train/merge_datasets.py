@@ -3,10 +3,19 @@
 from __future__ import annotations
 
 import argparse
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Iterable, Optional
+from typing import Any, Callable, Iterable, Optional
 
+import numpy as np
 import pandas as pd
+from scipy.spatial import cKDTree
+
+from dataset_io import TableAppender, iter_table_chunks, read_table, write_table
+from instrumentation import add_profile_arguments, stage, start_profiling
+from incremental import iter_new_chunks, load_manifest, save_manifest
 
 
 def _find_first_existing(base_dir: Path, candidates: Iterable[str]) -> Optional[Path]:
@@ -17,42 +26,17 @@ def _find_first_existing(base_dir: Path, candidates: Iterable[str]) -> Optional[
     return None
 
 
-def _normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
-    df = df.copy()
+def _normalize_column_names(df: pd.DataFrame) -> None:
+    """Lower-case and strip column names in place (no data is copied)."""
     df.columns = [str(c).strip().lower() for c in df.columns]
-    return df
-
-
-def _ensure_lat_lon(df: pd.DataFrame) -> pd.DataFrame:
-    df = df.copy()
-    # Strictly support expected column names; keep minimal + predictable.
-    if "lat" not in df.columns or "lon" not in df.columns:
-        raise ValueError(f"Missing required columns. Found columns: {list(df.columns)}")
-
-    df["lat"] = pd.to_numeric(df["lat"], errors="coerce")
-    df["lon"] = pd.to_numeric(df["lon"], errors="coerce")
-    return df
 
 
-def _normalize_lon_range(df: pd.DataFrame) -> pd.DataFrame:
-    """Normalize longitude to the [-180, 180) convention when data appears to be in [0, 360]."""
-    df = df.copy()
-    lon = df["lon"]
+def _lon_needs_wrap(lon: pd.Series) -> bool:
+    """True when longitudes appear to use the [0, 360] convention."""
     finite = lon.dropna()
     if len(finite) == 0:
-        return df
-    if float(finite.min()) >= 0.0 and float(finite.max()) > 180.0:
-        df["lon"] = ((lon + 180.0) % 360.0) - 180.0
-    return df
-
-
-def _maybe_round_lat_lon(df: pd.DataFrame, *, decimals: Optional[int]) -> pd.DataFrame:
-    if decimals is None:
-        return df
-    df = df.copy()
-    df["lat"] = df["lat"].round(decimals)
-    df["lon"] = df["lon"].round(decimals)
-    return df
+        return False
+    return float(finite.min()) >= 0.0 and float(finite.max()) > 180.0
 
 
 def _infer_days_origin(days_series: pd.Series) -> str:
@@ -71,38 +55,525 @@ def _infer_days_origin(days_series: pd.Series) -> str:
     return "1970-01-01"
 
 
-def _normalize_time_to_date(df: pd.DataFrame, *, time_col: str = "time", numeric_origin: Optional[str] = None) -> pd.DataFrame:
-    df = df.copy()
-    if time_col not in df.columns:
-        raise ValueError(f"Missing '{time_col}' column. Found columns: {list(df.columns)}")
+def _is_numeric_time(t: pd.Series) -> bool:
+    return pd.api.types.is_numeric_dtype(t) or pd.to_numeric(t, errors="coerce").notna().mean() > 0.95
 
-    t = df[time_col]
 
+def _time_to_date(t: pd.Series, *, numeric_origin: Optional[str] = None) -> pd.Series:
+    """Convert a time column to normalized (midnight, tz-naive) datetimes."""
     # Case 1: numeric times => interpret as days since some origin (heuristic or user-provided)
-    if pd.api.types.is_numeric_dtype(t) or pd.to_numeric(t, errors="coerce").notna().mean() > 0.95:
+    if _is_numeric_time(t):
         origin = numeric_origin or _infer_days_origin(t)
         days = pd.to_numeric(t, errors="coerce")
         dt = pd.to_datetime(origin) + pd.to_timedelta(days, unit="D")
-        df[time_col] = dt.dt.normalize()
-        return df
+        return dt.dt.normalize()
 
     # Case 2: string timestamps/dates
     dt = pd.to_datetime(t, errors="coerce", utc=True)
     if dt.notna().any():
         # Normalize to date and drop timezone for consistent merging
-        df[time_col] = dt.dt.tz_convert(None).dt.normalize()
-        return df
+        return dt.dt.tz_convert(None).dt.normalize()
 
     # Fallback: keep as-is (will likely not merge well, but avoids hard failure)
+    return t
+
+
+def _read_source(path: Path) -> pd.DataFrame:
+    return read_table(path)
+
+
+def _load_source(path: Path, **normalize_kwargs) -> pd.DataFrame:
+    return _normalize_source(_read_source(path), **normalize_kwargs)
+
+
+def _run_tasks(tasks: list[tuple[Callable[..., Any], tuple, dict]], workers: int) -> list[Any]:
+    """Run independent `(fn, args, kwargs)` tasks, in a process pool when `workers` > 1.
+
+    Results are returned in task order. Sources are independent until the merge, so loading them
+    concurrently makes wall time approach the slowest source instead of the sum.
+    """
+    if workers <= 1 or len(tasks) <= 1:
+        return [fn(*a, **kw) for fn, a, kw in tasks]
+    with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+        futures = [pool.submit(fn, *a, **kw) for fn, a, kw in tasks]
+        return [f.result() for f in futures]
+
+
+def _normalize_source(
+    df: pd.DataFrame,
+    *,
+    has_time: bool = True,
+    time_col: str = "time",
+    numeric_origin: Optional[str] = None,
+    round_decimals: Optional[int] = None,
+    wrap_lon: Optional[bool] = None,
+) -> pd.DataFrame:
+    """Normalize one freshly read source in a single pass, modifying `df` in place.
+
+    Renames columns, coerces lat/lon once (then wraps longitudes to [-180, 180) and optionally
+    rounds them), and converts time to dates. Each step replaces a column instead of copying
+    the frame, so the only allocations are the new lat/lon/time columns.
+    `wrap_lon` forces the longitude decision (streaming chunks of one source must agree).
+    """
+    _normalize_column_names(df)
+
+    # Strictly support expected column names; keep minimal + predictable.
+    if "lat" not in df.columns or "lon" not in df.columns:
+        raise ValueError(f"Missing required columns. Found columns: {list(df.columns)}")
+    if has_time and time_col not in df.columns:
+        raise ValueError(f"Missing '{time_col}' column. Found columns: {list(df.columns)}")
+
+    lat = pd.to_numeric(df["lat"], errors="coerce")
+    lon = pd.to_numeric(df["lon"], errors="coerce")
+
+    # Bring longitudes to a consistent convention before any merge.
+    if wrap_lon is None:
+        wrap_lon = _lon_needs_wrap(lon)
+    if wrap_lon:
+        lon = ((lon + 180.0) % 360.0) - 180.0
+
+    # Optional: make lat/lon joinable across different spatial grids.
+    if round_decimals is not None:
+        lat = lat.round(round_decimals)
+        lon = lon.round(round_decimals)
+
+    df["lat"] = lat
+    df["lon"] = lon
+
+    if has_time:
+        # Normalize time to dates for reliable daily joins
+        df[time_col] = _time_to_date(df[time_col], numeric_origin=numeric_origin)
+
     return df
 
 
-def _read_csv(path: Path) -> pd.DataFrame:
-    return pd.read_csv(path)
+MERGE_KEYS = ["lat", "lon", "time"]
+JOIN_METHODS = ("exact", "nearest", "bilinear")
+
+
+def _nearest_rows(other: pd.DataFrame, lat: np.ndarray, lon: np.ndarray, tolerance: float) -> np.ndarray:
+    """Row position in `other` of the nearest (lat, lon) point for each query, or -1 beyond `tolerance`."""
+    tree = cKDTree(other[["lat", "lon"]].to_numpy(dtype=float))
+    dist, idx = tree.query(np.column_stack([lat, lon]), k=1, distance_upper_bound=tolerance)
+    return np.where(np.isfinite(dist), idx, -1)
+
+
+def _bilinear_values(
+    other: pd.DataFrame, value_cols: list[str], lat: np.ndarray, lon: np.ndarray, tolerance: float
+) -> np.ndarray:
+    """Bilinearly interpolate numeric `value_cols` of a rectilinear grid at the query points.
+
+    The grid axes are the sorted unique lat/lon values; each query finds its cell with a binary
+    search. Queries with a missing corner value, or more than `tolerance` outside the grid, get NaN.
+    """
+    grid = other.groupby(["lat", "lon"], as_index=False)[value_cols].mean()
+    lat_axis = np.unique(grid["lat"].to_numpy(dtype=float))
+    lon_axis = np.unique(grid["lon"].to_numpy(dtype=float))
+
+    # Dense (lat, lon, value) cube; missing grid nodes stay NaN.
+    cube = np.full((len(lat_axis), len(lon_axis), len(value_cols)), np.nan)
+    gi = np.searchsorted(lat_axis, grid["lat"].to_numpy(dtype=float))
+    gj = np.searchsorted(lon_axis, grid["lon"].to_numpy(dtype=float))
+    cube[gi, gj] = grid[value_cols].to_numpy(dtype=float)
+
+    i0 = np.clip(np.searchsorted(lat_axis, lat, side="right") - 1, 0, max(len(lat_axis) - 2, 0))
+    j0 = np.clip(np.searchsorted(lon_axis, lon, side="right") - 1, 0, max(len(lon_axis) - 2, 0))
+    i1 = np.minimum(i0 + 1, len(lat_axis) - 1)
+    j1 = np.minimum(j0 + 1, len(lon_axis) - 1)
+
+    dlat = lat_axis[i1] - lat_axis[i0]
+    dlon = lon_axis[j1] - lon_axis[j0]
+    t = np.clip(np.divide(lat - lat_axis[i0], dlat, out=np.zeros_like(lat), where=dlat > 0), 0.0, 1.0)
+    u = np.clip(np.divide(lon - lon_axis[j0], dlon, out=np.zeros_like(lon), where=dlon > 0), 0.0, 1.0)
+
+    w00 = ((1 - t) * (1 - u))[:, None]
+    w10 = (t * (1 - u))[:, None]
+    w01 = ((1 - t) * u)[:, None]
+    w11 = (t * u)[:, None]
+    values = w00 * cube[i0, j0] + w10 * cube[i1, j0] + w01 * cube[i0, j1] + w11 * cube[i1, j1]
+
+    inside = (
+        (lat >= lat_axis[0] - tolerance)
+        & (lat <= lat_axis[-1] + tolerance)
+        & (lon >= lon_axis[0] - tolerance)
+        & (lon <= lon_axis[-1] + tolerance)
+    )
+    values[~inside] = np.nan
+    return values
+
+
+def _spatial_join(
+    base: pd.DataFrame,
+    other: pd.DataFrame,
+    *,
+    method: str,
+    tolerance: float,
+    by_time: bool = True,
+    keep_unmatched: bool = False,
+) -> pd.DataFrame:
+    """Attach `other`'s value columns to every `base` row from the nearest (or interpolated) point.
+
+    Matching is done per date when `by_time` (KD-tree / binary-search grid index per day, so the
+    cost is O(n log n) rather than a Cartesian product). Base rows with no match within
+    `tolerance` degrees are dropped (inner join) unless `keep_unmatched` (left join, NaN values).
+    """
+    keys = ["lat", "lon", "time"] if by_time else ["lat", "lon"]
+    value_cols = [c for c in other.columns if c not in keys]
+    numeric_cols = [c for c in value_cols if pd.api.types.is_numeric_dtype(other[c])]
+    out_cols = {c: (f"{c}_y" if c in base.columns else c) for c in value_cols}
+
+    if by_time:
+        other_days = {day: part for day, part in other.groupby("time", sort=False)}
+        base_groups = base.groupby("time", sort=False)
+    else:
+        other_days = {None: other}
+        base_groups = [(None, base)]
+
+    pieces = []
+    for day, b in base_groups:
+        o = other_days.get(day)
+        lat = b["lat"].to_numpy(dtype=float)
+        lon = b["lon"].to_numpy(dtype=float)
+        joined: dict[str, np.ndarray] = {}
+
+        if o is None or len(o) == 0:
+            matched = np.zeros(len(b), dtype=bool)
+            for c in value_cols:
+                joined[out_cols[c]] = np.full(len(b), np.nan)
+        else:
+            o = o.reset_index(drop=True)
+            matched = np.ones(len(b), dtype=bool)
+
+            interpolated = numeric_cols if method == "bilinear" else []
+            if interpolated:
+                values = _bilinear_values(o, interpolated, lat, lon, tolerance)
+                matched &= np.isfinite(values).all(axis=1)
+                for k, c in enumerate(interpolated):
+                    joined[out_cols[c]] = values[:, k]
+
+            # Everything not interpolated (all columns for "nearest") comes from the nearest point.
+            picked = [c for c in value_cols if c not in interpolated]
+            if picked:
+                nearest = _nearest_rows(o, lat, lon, tolerance)
+                hit = nearest >= 0
+                matched &= hit
+                for c in picked:
+                    col = o[c].iloc[np.maximum(nearest, 0)].to_numpy()
+                    joined[out_cols[c]] = np.where(hit, col, np.nan) if not hit.all() else col
+
+        piece = pd.concat([b, pd.DataFrame(joined, index=b.index)[list(out_cols.values())]], axis=1)
+        pieces.append(piece if keep_unmatched else piece[matched])
+
+    if not pieces:
+        return base.iloc[0:0].assign(**{name: np.nan for name in out_cols.values()})
+    return pd.concat(pieces, ignore_index=True)
+
+
+def _merge_sources(
+    sst: pd.DataFrame,
+    chl: pd.DataFrame,
+    cur: pd.DataFrame,
+    bathy: Optional[pd.DataFrame],
+    *,
+    join: str,
+    tolerance: float,
+) -> pd.DataFrame:
+    """Join chlorophyll, currents (and bathymetry) onto SST; SST defines the output grid."""
+    if join == "exact":
+        # Merge on lat, lon, time (inner join keeps only aligned observations)
+        merged = pd.merge(sst, chl, on=MERGE_KEYS, how="inner")
+        merged = pd.merge(merged, cur, on=MERGE_KEYS, how="inner")
+        # Merge bathymetry on lat, lon only (optional)
+        if bathy is not None:
+            merged = pd.merge(merged, bathy, on=["lat", "lon"], how="left")
+        return merged
+
+    merged = _spatial_join(sst, chl, method=join, tolerance=tolerance)
+    merged = _spatial_join(merged, cur, method=join, tolerance=tolerance)
+    if bathy is not None:
+        merged = _spatial_join(merged, bathy, method=join, tolerance=tolerance, by_time=False, keep_unmatched=True)
+    return merged
+
+
+def _partition_chunks_by_date(
+    chunks: Iterable[pd.DataFrame],
+    part_dir: Path,
+    *,
+    numeric_origin: Optional[str],
+    round_decimals: Optional[int],
+    wrap_lon: Optional[bool] = None,
+    skip_dates: frozenset[str] = frozenset(),
+) -> tuple[set[str], Optional[str], Optional[bool], set[str]]:
+    """Normalize each chunk and append its rows to one CSV per date under `part_dir`.
+
+    Heuristics that need the whole column (numeric time origin, 0..360 longitudes) are decided
+    on the first chunk, unless given, and then applied to every chunk, so partitions of one
+    source agree. Rows for `skip_dates` are dropped. Returns the dates (YYYY-MM-DD) written, the
+    origin / wrap decisions used and the skipped dates that had rows.
+    """
+    part_dir.mkdir(parents=True, exist_ok=True)
+    dates: set[str] = set()
+    skipped: set[str] = set()
+    origin = numeric_origin
+    first = True
+
+    for chunk in chunks:
+        if first:
+            first = False
+            _normalize_column_names(chunk)
+            if wrap_lon is None and "lon" in chunk.columns:
+                wrap_lon = _lon_needs_wrap(pd.to_numeric(chunk["lon"], errors="coerce"))
+            if origin is None and "time" in chunk.columns and _is_numeric_time(chunk["time"]):
+                origin = _infer_days_origin(chunk["time"])
+
+        chunk = _normalize_source(chunk, numeric_origin=origin, round_decimals=round_decimals, wrap_lon=wrap_lon)
+        # Rows without a parseable date cannot join on time; drop them instead of
+        # collecting them in a bogus partition.
+        chunk = chunk[chunk["time"].notna()]
+        if chunk.empty:
+            continue
+
+        for day, part in chunk.groupby(chunk["time"].dt.strftime("%Y-%m-%d"), sort=False):
+            if day in skip_dates:
+                skipped.add(str(day))
+                continue
+            part_path = part_dir / f"{day}.csv"
+            part.to_csv(part_path, mode="a", header=not part_path.exists(), index=False)
+            dates.add(str(day))
+
+    return dates, origin, wrap_lon, skipped
+
+
+def _partition_source_by_date(
+    path: Path,
+    part_dir: Path,
+    *,
+    chunksize: int,
+    numeric_origin: Optional[str],
+    round_decimals: Optional[int],
+) -> set[str]:
+    """Stream `path` in chunks into per-date partition files; returns the dates written."""
+    dates, _, _, _ = _partition_chunks_by_date(
+        iter_table_chunks(path, chunksize), part_dir, numeric_origin=numeric_origin, round_decimals=round_decimals
+    )
+    return dates
+
+
+def _partition_new_rows(
+    path: Path,
+    prev: Optional[dict],
+    part_dir: Path,
+    *,
+    done: frozenset[str],
+    chunksize: int,
+    numeric_origin: Optional[str],
+    round_decimals: Optional[int],
+) -> tuple[dict, set[str]]:
+    """Partition only the rows added to `path` since `prev`, skipping dates in `done`.
+
+    When the whole input has to be re-read, its staged partitions are rebuilt from scratch, and
+    rows for merged dates are simply old rows. Returns the input's new manifest state and the
+    merged dates that received genuinely new rows.
+    """
+    prev = prev or {}
+    chunks, state, partial = iter_new_chunks(path, prev, chunksize)
+    if not partial:
+        shutil.rmtree(part_dir, ignore_errors=True)
+    _, origin, wrap_lon, skipped = _partition_chunks_by_date(
+        chunks,
+        part_dir,
+        numeric_origin=numeric_origin or prev.get("time_origin"),
+        round_decimals=round_decimals,
+        wrap_lon=prev.get("wrap_lon"),
+        skip_dates=done,
+    )
+    state["time_origin"] = origin
+    state["wrap_lon"] = wrap_lon
+    return state, skipped if partial else set()
+
+
+def _read_partition(part_dir: Path, day: str) -> pd.DataFrame:
+    return pd.read_csv(part_dir / f"{day}.csv", parse_dates=["time"])
+
+
+def _empty_merge_columns(
+    part_dirs: list[Path], bathy: Optional[pd.DataFrame], *, join: str, tolerance: float
+) -> Optional[list[str]]:
+    """Output columns of a merge with no common dates, from the partition headers (None if a source is empty)."""
+    frames = []
+    for part_dir in part_dirs:
+        sample = next(part_dir.glob("*.csv"), None)
+        if sample is None:
+            return None
+        frames.append(pd.read_csv(sample, nrows=0, parse_dates=["time"]))
+    return list(_merge_sources(*frames, bathy, join=join, tolerance=tolerance).columns)
+
+
+def _stream_merge(
+    sst_path: Path,
+    chl_path: Path,
+    cur_path: Path,
+    bathy_path: Optional[Path],
+    out_path: Path,
+    *,
+    workers: int,
+    partition_by_date: bool,
+    chunksize: int,
+    sst_origin: Optional[str],
+    chlorophyll_origin: Optional[str],
+    round_decimals: Optional[int],
+    join: str,
+    tolerance: float,
+    tmp_dir: Optional[Path],
+) -> int:
+    """Merge SST, chlorophyll and currents one date at a time, appending each day to `out_path`.
+
+    Inputs are first split into per-date partition files (one streaming pass per source),
+    so peak memory is bounded by a single day of data rather than the full history.
+    """
+    work_dir = Path(tempfile.mkdtemp(prefix="merge_parts_", dir=tmp_dir))
+    try:
+        tasks = [
+            (
+                _partition_source_by_date,
+                (sst_path, work_dir / "sst"),
+                dict(chunksize=chunksize, numeric_origin=sst_origin, round_decimals=round_decimals),
+            ),
+            (
+                _partition_source_by_date,
+                (chl_path, work_dir / "chlorophyll"),
+                dict(chunksize=chunksize, numeric_origin=chlorophyll_origin, round_decimals=round_decimals),
+            ),
+            (
+                _partition_source_by_date,
+                (cur_path, work_dir / "currents"),
+                dict(chunksize=chunksize, numeric_origin=None, round_decimals=round_decimals),
+            ),
+        ]
+        if bathy_path is not None:
+            # Bathymetry is static (lat/lon only), so it is joined to every date as-is.
+            tasks.append((_load_source, (bathy_path,), dict(has_time=False, round_decimals=round_decimals)))
+
+        results = _run_tasks(tasks, workers)
+        sst_dates, chl_dates, cur_dates = results[:3]
+        bathy = results[3] if bathy_path is not None else None
+
+        # Inner join on time: only dates present in all three sources can produce rows.
+        common = sorted(sst_dates & chl_dates & cur_dates)
+
+        columns = None
+        if not common:
+            part_dirs = [work_dir / name for name in ("sst", "chlorophyll", "currents")]
+            columns = _empty_merge_columns(part_dirs, bathy, join=join, tolerance=tolerance)
+        writer = TableAppender(out_path, partition_by_date=partition_by_date, columns=columns)
+        try:
+            for day in common:
+                merged = _merge_sources(
+                    _read_partition(work_dir / "sst", day),
+                    _read_partition(work_dir / "chlorophyll", day),
+                    _read_partition(work_dir / "currents", day),
+                    bathy,
+                    join=join,
+                    tolerance=tolerance,
+                )
+                writer.write(merged)
+        finally:
+            writer.close()
+        return writer.rows_written
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def _incremental_merge(
+    sst_path: Path,
+    chl_path: Path,
+    cur_path: Path,
+    bathy_path: Optional[Path],
+    out_path: Path,
+    *,
+    workers: int,
+    partition_by_date: bool,
+    chunksize: int,
+    sst_origin: Optional[str],
+    chlorophyll_origin: Optional[str],
+    round_decimals: Optional[int],
+    join: str,
+    tolerance: float,
+) -> tuple[int, list[str], list[str]]:
+    """Merge only dates that are new since the last run and append them to `out_path`.
+
+    New input rows (see incremental.iter_new_chunks) are added to a persistent staging area of
+    per-source, per-date partitions next to the output. A date is merged once all three sources
+    have it, then its staging files are removed, so a source arriving a day late is still joined.
+    Returns `(rows appended, dates merged, already-merged dates that received rows and were skipped)`.
+    """
+    manifest = load_manifest(out_path)
+    staging = out_path.with_name(out_path.name + ".staging")
+    fresh = not manifest["dates"] and not manifest["inputs"]
+    options = {"join": join, "join_tolerance": tolerance, "round_latlon": round_decimals}
+    if fresh:
+        shutil.rmtree(staging, ignore_errors=True)
+    elif manifest.get("options", options) != options:
+        raise ValueError(
+            f"Merge options changed since the last incremental run ({manifest['options']} -> {options}). "
+            "Rebuild without --incremental (or delete the manifest) to apply them."
+        )
+
+    done = set(manifest["dates"])
+    sources = {"sst": (sst_path, sst_origin), "chlorophyll": (chl_path, chlorophyll_origin), "currents": (cur_path, None)}
+    tasks = [
+        (
+            _partition_new_rows,
+            (path, manifest["inputs"].get(name), staging / name),
+            dict(done=frozenset(done), chunksize=chunksize, numeric_origin=origin, round_decimals=round_decimals),
+        )
+        for name, (path, origin) in sources.items()
+    ]
+    if bathy_path is not None:
+        tasks.append((_load_source, (bathy_path,), dict(has_time=False, round_decimals=round_decimals)))
+
+    results = _run_tasks(tasks, workers)
+    bathy = results[3] if bathy_path is not None else None
+
+    staged = [{p.stem for p in (staging / name).glob("*.csv")} for name in sources]
+
+    def drop_staged(day: str) -> None:
+        for name in sources:
+            (staging / name / f"{day}.csv").unlink(missing_ok=True)
+
+    # Rows for dates already in the output cannot be appended without duplicating that date.
+    late = sorted(set().union(*(skipped for _, skipped in results[:3])))
+
+    merged_days = sorted(set.intersection(*staged) - done)
+    columns = None
+    if fresh and not merged_days:
+        columns = _empty_merge_columns([staging / name for name in sources], bathy, join=join, tolerance=tolerance)
+    writer = TableAppender(out_path, partition_by_date=partition_by_date, append=not fresh, columns=columns)
+    try:
+        for day in merged_days:
+            merged = _merge_sources(
+                _read_partition(staging / "sst", day),
+                _read_partition(staging / "chlorophyll", day),
+                _read_partition(staging / "currents", day),
+                bathy,
+                join=join,
+                tolerance=tolerance,
+            )
+            writer.write(merged)
+            drop_staged(day)
+            done.add(day)
+    finally:
+        writer.close()
+
+    manifest["inputs"] = {name: state for name, (state, _) in zip(sources, results[:3])}
+    manifest["dates"] = sorted(done)
+    manifest["options"] = options
+    save_manifest(out_path, manifest)
+    return writer.rows_written, merged_days, late
 
 
 def main() -> int:
-    parser = argparse.ArgumentParser(description="Merge SST, chlorophyll, currents, and bathymetry CSVs into merged.csv")
+    parser = argparse.ArgumentParser(description="Merge SST, chlorophyll, currents, and bathymetry CSVs into merged.csv (or Parquet/Feather)")
     parser.add_argument(
         "--dir",
         default=str(Path.cwd()),
@@ -120,7 +591,15 @@ def main() -> int:
     parser.add_argument(
         "--output",
         default="merged.csv",
-        help="Output CSV filename (default: merged.csv)",
+        help=(
+            "Output filename (default: merged.csv). The suffix picks the format: .csv, .parquet or .feather; "
+            "columnar formats need pyarrow."
+        ),
+    )
+    parser.add_argument(
+        "--partition-by-date",
+        action="store_true",
+        help="Write the output as a Parquet dataset directory with one time=YYYY-MM-DD/ partition per date.",
     )
     parser.add_argument(
         "--sst-origin",
@@ -138,8 +617,58 @@ def main() -> int:
         default=None,
         help="Optional rounding (decimal places) applied to lat/lon before merging to help align different grids.",
     )
+    parser.add_argument(
+        "--join",
+        choices=JOIN_METHODS,
+        default="exact",
+        help=(
+            "How to align chlorophyll/currents/bathymetry to the SST grid: exact (lat, lon, time) keys, "
+            "nearest point per date, or bilinear interpolation from a rectilinear grid (default: exact)."
+        ),
+    )
+    parser.add_argument(
+        "--join-tolerance",
+        type=float,
+        default=0.1,
+        help="Max distance in degrees for --join nearest/bilinear matches (default: 0.1).",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Processes used to read and normalize the input sources concurrently (default: 1, sequential).",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help=(
+            "Stream inputs in chunks, partition them by date on disk and merge one date at a time, "
+            "appending to the output. Keeps memory bounded for multi-year inputs."
+        ),
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help=(
+            "Only merge dates that are new since the last run (tracked in <output>.manifest.json) and append "
+            "them to the existing output. Implies streaming; output must be CSV or --partition-by-date Parquet."
+        ),
+    )
+    parser.add_argument(
+        "--chunksize",
+        type=int,
+        default=500_000,
+        help="Rows read per chunk in --stream mode (default: 500000).",
+    )
+    parser.add_argument(
+        "--tmp-dir",
+        default=None,
+        help="Directory for --stream date partitions (default: system temp dir).",
+    )
+    add_profile_arguments(parser)
 
     args = parser.parse_args()
+    start_profiling("merge_datasets", args)
     base_dir = Path(args.dir).expanduser().resolve()
 
     sst_path = (base_dir / args.sst) if args.sst else _find_first_existing(
@@ -186,53 +715,82 @@ def main() -> int:
             + f". Looked in: {base_dir}"
         )
 
-    sst = _normalize_columns(_read_csv(sst_path))
-    chl = _normalize_columns(_read_csv(chl_path))
-    cur = _normalize_columns(_read_csv(cur_path))
-    bathy = _normalize_columns(_read_csv(bathy_path)) if (not args.skip_bathymetry and bathy_path) else None
-
-    sst = _ensure_lat_lon(sst)
-    chl = _ensure_lat_lon(chl)
-    cur = _ensure_lat_lon(cur)
-    if bathy is not None:
-        bathy = _ensure_lat_lon(bathy)
-
-    # Bring longitudes to a consistent convention before any merge.
-    sst = _normalize_lon_range(sst)
-    chl = _normalize_lon_range(chl)
-    cur = _normalize_lon_range(cur)
-    if bathy is not None:
-        bathy = _normalize_lon_range(bathy)
-
-    # Normalize time to dates for reliable daily joins
-    sst = _normalize_time_to_date(sst, numeric_origin=args.sst_origin)
-    chl = _normalize_time_to_date(chl, numeric_origin=args.chlorophyll_origin)
-    cur = _normalize_time_to_date(cur)
-
-    # Optional: make lat/lon joinable across different spatial grids.
-    sst = _maybe_round_lat_lon(sst, decimals=args.round_latlon)
-    chl = _maybe_round_lat_lon(chl, decimals=args.round_latlon)
-    cur = _maybe_round_lat_lon(cur, decimals=args.round_latlon)
-    if bathy is not None:
-        bathy = _maybe_round_lat_lon(bathy, decimals=args.round_latlon)
-
-    # Merge on lat, lon, time (inner join keeps only aligned observations)
-    merged = pd.merge(sst, chl, on=["lat", "lon", "time"], how="inner")
-    merged = pd.merge(merged, cur, on=["lat", "lon", "time"], how="inner")
-
-    # Merge bathymetry on lat, lon only (optional)
-    if bathy is not None:
-        merged = pd.merge(merged, bathy, on=["lat", "lon"], how="left")
-
+    if args.skip_bathymetry:
+        bathy_path = None
     out_path = (base_dir / args.output).resolve()
-    merged.to_csv(out_path, index=False)
 
-    if len(merged) == 0:
+    if args.incremental:
+        # Loading, merging and appending are interleaved per chunk/date here, so they are timed as one stage.
+        with stage("merge") as timed:
+            n_rows, merged_days, late = _incremental_merge(
+                sst_path,
+                chl_path,
+                cur_path,
+                bathy_path,
+                out_path,
+                workers=args.workers,
+                partition_by_date=args.partition_by_date,
+                chunksize=args.chunksize,
+                sst_origin=args.sst_origin,
+                chlorophyll_origin=args.chlorophyll_origin,
+                round_decimals=args.round_latlon,
+                join=args.join,
+                tolerance=args.join_tolerance,
+            )
+            timed.rows = n_rows
+        print(f"Merged {len(merged_days):,} new date(s)" + (f": {merged_days[0]} .. {merged_days[-1]}" if merged_days else ""))
+        if late:
+            print(f"WARNING: skipped new rows for {len(late):,} date(s) already in the output (e.g. {late[0]}).")
+        print(f"Appended {n_rows:,} rows to {out_path}")
+        return 0
+
+    if args.stream:
+        with stage("merge") as timed:
+            n_rows = _stream_merge(
+                sst_path,
+                chl_path,
+                cur_path,
+                bathy_path,
+                out_path,
+                workers=args.workers,
+                partition_by_date=args.partition_by_date,
+                chunksize=args.chunksize,
+                sst_origin=args.sst_origin,
+                chlorophyll_origin=args.chlorophyll_origin,
+                round_decimals=args.round_latlon,
+                join=args.join,
+                tolerance=args.join_tolerance,
+                tmp_dir=Path(args.tmp_dir).expanduser().resolve() if args.tmp_dir else None,
+            )
+            timed.rows = n_rows
+    else:
+        tasks = [
+            (_load_source, (sst_path,), dict(numeric_origin=args.sst_origin, round_decimals=args.round_latlon)),
+            (_load_source, (chl_path,), dict(numeric_origin=args.chlorophyll_origin, round_decimals=args.round_latlon)),
+            (_load_source, (cur_path,), dict(round_decimals=args.round_latlon)),
+        ]
+        if bathy_path is not None:
+            # Bathymetry is static (lat/lon only), so it is joined to every date as-is.
+            tasks.append((_load_source, (bathy_path,), dict(has_time=False, round_decimals=args.round_latlon)))
+
+        with stage("load") as timed:
+            sources = _run_tasks(tasks, args.workers)
+            timed.rows = sum(len(source) for source in sources)
+        sst, chl, cur = sources[:3]
+        bathy = sources[3] if bathy_path is not None else None
+
+        with stage("merge", rows=len(sst)):
+            merged = _merge_sources(sst, chl, cur, bathy, join=args.join, tolerance=args.join_tolerance)
+        with stage("write", rows=len(merged)):
+            write_table(merged, out_path, partition_by_date=args.partition_by_date)
+        n_rows = len(merged)
+
+    if n_rows == 0:
         print(
             "WARNING: merged dataset has 0 rows. This usually means the inputs do not share exact (lat, lon, time) keys. "
-            "Try `--round-latlon 1` or `--round-latlon 2`, and ensure all sources use compatible longitude conventions.",
+            "Try `--join nearest`, `--round-latlon 1` or `--round-latlon 2`, and ensure all sources use compatible longitude conventions.",
         )
-    print(f"Wrote {len(merged):,} rows to {out_path}")
+    print(f"Wrote {n_rows:,} rows to {out_path}")
     return 0
 
 
@@ -15,7 +15,6 @@ import pandas as pd
 from sklearn.calibration import calibration_curve
 from sklearn.impute import SimpleImputer
 from sklearn.metrics import (
-    ConfusionMatrixDisplay,
     accuracy_score,
     average_precision_score,
     brier_score_loss,
@@ -29,7 +28,6 @@ from sklearn.metrics import (
     roc_auc_score,
     roc_curve,
 )
-from sklearn.model_selection import train_test_split
 from sklearn.pipeline import Pipeline
 
 TRAIN_DIR = Path(__file__).resolve().parents[1]
@@ -37,11 +35,18 @@ if str(TRAIN_DIR) not in sys.path:
     sys.path.insert(0, str(TRAIN_DIR))
 
 # Local import (train folder)
+from dataset_io import read_table, table_columns
+from evaluation_charts import CHARTS, parse_chart_selection, render_charts
+from feature_attribution import ATTRIBUTION_METHODS, path_contributions, permutation_importance, subsample
+from holdout import HoldoutPredictions, holdout_path_for, load_holdout
+from instrumentation import add_profile_arguments, stage, start_profiling
 from land_mask import keep_sea_rows_in_sri_lanka_bbox
+from rf_search import cross_validate
+from splits import SPLIT_METHODS, cv_fold_ids, folds_from_ids, holdout_split, split_columns, split_groups
+from threshold_analysis import optimal_thresholds, threshold_curve
 
 
 def parse_args() -> argparse.Namespace:
-    base_dir = Path(__file__).resolve().parents[1]
     parser = argparse.ArgumentParser(
         description=(
             "Evaluate rf_fish_zone_model.pkl and generate metrics + charts. "
@@ -57,8 +62,12 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument(
         "--data",
         type=Path,
-        default=base_dir / "final_dataset_no_bathymetry.csv",
-        help="Path to the CSV dataset used for evaluation.",
+        default=None,
+        help=(
+            "Path to the dataset used for evaluation (CSV, Parquet or Feather); only read with --recompute, "
+            "--cv-folds, --attribution, or when no saved predictions match the model. Default: the dataset "
+            "recorded by the training run, else final_dataset_no_bathymetry.csv in the train folder."
+        ),
     )
     parser.add_argument(
         "--output-dir",
@@ -68,12 +77,86 @@ def parse_args() -> argparse.Namespace:
     )
     parser.add_argument("--test-size", type=float, default=0.2)
     parser.add_argument("--random-state", type=int, default=42)
+    parser.add_argument(
+        "--split",
+        choices=SPLIT_METHODS,
+        default="random",
+        help="Test-row selection; use the same --split/--tile-deg/--block-days as training.",
+    )
+    parser.add_argument("--tile-deg", type=float, default=1.0, help="Tile size in degrees for --split spatial.")
+    parser.add_argument("--block-days", type=int, default=7, help="Days per block for --split date.")
+    parser.add_argument(
+        "--cv-folds",
+        type=int,
+        default=0,
+        help=(
+            "Also re-fit the model's hyperparameters on K folds of the whole dataset (blocked like --split) "
+            "and report per-fold metrics; folds run in parallel (default: 0 = off)."
+        ),
+    )
+    parser.add_argument(
+        "--thresholds",
+        type=int,
+        default=101,
+        help="Evenly spaced thresholds in [0, 1] for the threshold table and chart (default: 101).",
+    )
+    parser.add_argument("--cost-fp", type=float, default=1.0, help="Cost of a false positive (default: 1).")
+    parser.add_argument("--cost-fn", type=float, default=1.0, help="Cost of a false negative (default: 1).")
+    parser.add_argument(
+        "--charts",
+        default="all",
+        help=(
+            f"Charts to render: all, none, or a comma-separated subset of {', '.join(CHARTS)} "
+            "(default: all). Charts whose inputs did not change since the last run are not redrawn."
+        ),
+    )
+    parser.add_argument("--chart-jobs", type=int, default=None, help="Processes rendering charts (default: all cores).")
+    parser.add_argument(
+        "--attribution",
+        choices=ATTRIBUTION_METHODS,
+        default="none",
+        help=(
+            "Feature attribution on the test rows: permutation importance, tree-path contributions, or all "
+            "(default: none). Reads the test features from the dataset."
+        ),
+    )
+    parser.add_argument(
+        "--attribution-samples",
+        type=int,
+        default=5000,
+        help="Random test rows used for attribution, bounding its run time (default: 5000).",
+    )
+    parser.add_argument("--permutation-repeats", type=int, default=5, help="Shuffles per feature (default: 5).")
+    parser.add_argument(
+        "--attribution-jobs",
+        type=int,
+        default=None,
+        help="Processes for permutation importance, one feature per task (default: all cores).",
+    )
+    parser.add_argument(
+        "--holdout",
+        type=Path,
+        default=None,
+        help="Held-out predictions saved by training (default: <model stem>_holdout.npz next to --model).",
+    )
+    parser.add_argument(
+        "--recompute",
+        action="store_true",
+        help="Ignore saved predictions: re-read --data, re-split and re-predict.",
+    )
+    parser.add_argument("--cv-jobs", type=int, default=None, help="Cores for --cv-folds (default: all).")
     parser.add_argument(
         "--allow-land",
         action="store_true",
         help="If set, do NOT filter out Sri Lankan land points (default filters them out).",
     )
-    return parser.parse_args()
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    try:
+        args.charts = parse_chart_selection(args.charts)
+    except ValueError as exc:
+        parser.error(str(exc))
+    return args
 
 
 def _ensure_dir(path: Path) -> None:
@@ -107,23 +190,25 @@ def _safe_float(x) -> float | None:
         return None
 
 
-def main() -> None:
-    args = parse_args()
-
-    if not args.model.exists():
-        raise FileNotFoundError(f"Model artifact not found: {args.model}")
-    if not args.data.exists():
-        raise FileNotFoundError(f"Dataset not found: {args.data}")
-
-    output_dir = args.output_dir
-    _ensure_dir(output_dir)
-
-    pipeline, feature_columns, target_column, artifact = _load_artifact(args.model)
+def _load_dataset(
+    data: Path, allow_land: bool, extra_columns: list[str], feature_columns: list[str], target_column: str
+):
+    """Read the evaluation columns, apply the land filter; returns (df, X, y)."""
+    if not data.exists():
+        raise FileNotFoundError(f"Dataset not found: {data}")
 
-    df = pd.read_csv(args.data)
+    # Column projection: only features, target and (for the land filter) lat/lon are read.
+    wanted = [*feature_columns, target_column, *extra_columns]
+    if not allow_land:
+        wanted += ["lat", "lon"]
+    available = set(table_columns(data))
+    with stage("load") as timed:
+        df = read_table(data, columns=[c for c in dict.fromkeys(wanted) if c in available], typed=True)
+        timed.rows = len(df)
 
-    if (not args.allow_land) and ("lat" in df.columns) and ("lon" in df.columns):
-        df = keep_sea_rows_in_sri_lanka_bbox(df, lat_col="lat", lon_col="lon")
+    if (not allow_land) and ("lat" in df.columns) and ("lon" in df.columns):
+        with stage("land_mask", rows=len(df)):
+            df = keep_sea_rows_in_sri_lanka_bbox(df, lat_col="lat", lon_col="lon")
 
     missing_cols = [c for c in [*feature_columns, target_column] if c not in df.columns]
     if missing_cols:
@@ -136,41 +221,73 @@ def main() -> None:
     X = df[feature_columns]
     y = df[target_column]
     if y.dtype == "bool":
-        y = y.astype(int)
+        y = y.astype(np.uint8)
 
     # Ensure binary ints where possible
-    if y.nunique() <= 2:
+    if y.nunique() <= 2 and not pd.api.types.is_integer_dtype(y):
         y = y.astype(int)
+    return df, X, y
 
-    X_train, X_test, y_train, y_test = train_test_split(
-        X,
-        y,
-        test_size=args.test_size,
-        random_state=args.random_state,
-        stratify=y if y.nunique() > 1 else None,
-    )
 
-    # If pipeline wasn't fitted (should be), fit defensively
-    # (But normally the model is already trained.)
-    try:
-        _ = pipeline.predict(X_test.iloc[:1])
-    except Exception:
-        pipeline.fit(X_train, y_train)
+def _saved_holdout(args: argparse.Namespace, artifact) -> HoldoutPredictions | None:
+    """The training run's held-out predictions, if saved for this very artifact."""
+    if args.recompute:
+        return None
+    path = args.holdout or holdout_path_for(args.model)
+    if not path.exists():
+        return None
+    holdout = load_holdout(path)
+    run_id = artifact.get("run_id") if isinstance(artifact, dict) else None
+    if holdout.run_id != run_id:
+        print(f"Ignoring {path}: it was saved by a different training run than {args.model.name}.")
+        return None
+    return holdout
 
-    y_pred = pipeline.predict(X_test)
 
-    # Probabilities for positive class (assume binary 0/1)
-    y_proba = None
-    try:
-        proba = pipeline.predict_proba(X_test)
-        if proba.shape[1] == 2:
-            y_proba = proba[:, 1]
-        else:
-            # Multi-class: pick max prob as confidence, and compute macro AUC if possible
-            y_proba = None
-    except Exception:
-        y_proba = None
+def main() -> None:
+    args = parse_args()
+    start_profiling("evaluate_rf_model", args)
+
+    if not args.model.exists():
+        raise FileNotFoundError(f"Model artifact not found: {args.model}")
 
+    output_dir = args.output_dir
+    _ensure_dir(output_dir)
+
+    pipeline, feature_columns, target_column, artifact = _load_artifact(args.model)
+
+    df = X = y = groups = X_test = None
+    holdout = _saved_holdout(args, artifact)
+    if holdout is not None:
+        print(f"Using held-out predictions saved at training time ({holdout.meta['split']} split).")
+        args.data = args.data or Path(holdout.meta["data"])
+        split_info = {**holdout.meta, "data": str(args.data)}
+        y_test, y_pred, proba = holdout.y_test, holdout.y_pred, holdout.proba
+        n_rows = int(split_info["n_rows"])
+    else:
+        args.data = args.data or TRAIN_DIR / "final_dataset_no_bathymetry.csv"
+        df, X, y = _load_dataset(args.data, args.allow_land, split_columns(args.split), feature_columns, target_column)
+        groups = split_groups(df, args.split, tile_deg=args.tile_deg, block_days=args.block_days)
+        _, test_pos = holdout_split(y.to_numpy(), groups, args.test_size, args.random_state)
+        split_info = {
+            "split": args.split,
+            "tile_deg": args.tile_deg,
+            "block_days": args.block_days,
+            "test_size": args.test_size,
+            "data": str(args.data),
+            "allow_land": args.allow_land,
+        }
+        y_test = y.iloc[test_pos]
+        X_test = X.iloc[test_pos]
+        with stage("predict", rows=len(X_test)):
+            proba = pipeline.predict_proba(X_test)
+        y_pred = pipeline.classes_[np.argmax(proba, axis=1)]
+        n_rows = int(len(df))
+
+    # Probabilities for positive class (assume binary 0/1); multi-class models get label metrics only.
+    y_proba = proba[:, 1] if proba.shape[1] == 2 else None
+
+    split = split_info["split"]
     metrics: dict[str, object] = {
         "timestamp": datetime.utcnow().isoformat() + "Z",
         "python": platform.python_version(),
@@ -180,14 +297,25 @@ def main() -> None:
         "pandas": getattr(pd, "__version__", None),
         "sklearn": None,
         "model_path": str(args.model),
-        "data_path": str(args.data),
-        "filtered_land": (not args.allow_land),
-        "n_rows": int(len(df)),
-        "n_test": int(len(X_test)),
+        "data_path": split_info["data"],
+        "filtered_land": (not split_info["allow_land"]),
+        "n_rows": n_rows,
+        "n_test": int(len(y_test)),
+        "split": split,
+        "tile_deg": split_info["tile_deg"] if split == "spatial" else None,
+        "block_days": split_info["block_days"] if split == "date" else None,
         "feature_columns": feature_columns,
         "target_column": target_column,
+        "from_saved_predictions": holdout is not None,
     }
 
+    if holdout is not None and holdout.oob_proba is not None:
+        metrics["oob_accuracy"] = _safe_float(holdout.meta.get("oob_accuracy"))
+        # Rows that were in every bootstrap sample have no OOB estimate (NaN).
+        scored = np.isfinite(holdout.oob_proba).all(axis=1)
+        if holdout.oob_proba.shape[1] == 2 and len(np.unique(holdout.oob_y[scored])) == 2:
+            metrics["oob_roc_auc"] = _safe_float(roc_auc_score(holdout.oob_y[scored], holdout.oob_proba[scored, 1]))
+
     try:
         import sklearn  # noqa: PLC0415
 
@@ -212,6 +340,33 @@ def main() -> None:
         p = np.clip(y_proba, eps, 1 - eps)
         y_arr = np.asarray(y_test)
         per_sample_nll = -(y_arr * np.log(p) + (1 - y_arr) * np.log(1 - p))
+
+        # Threshold analysis: one sort of the probabilities serves every threshold.
+        with stage("thresholds", rows=len(y_proba)):
+            curve = threshold_curve(y_test, y_proba, np.linspace(0.0, 1.0, args.thresholds))
+            best = optimal_thresholds(y_test, y_proba, cost_fp=args.cost_fp, cost_fn=args.cost_fn)
+        metrics["best_f1_threshold"] = best["f1_threshold"]
+        metrics["best_f1"] = best["f1"]
+        metrics["best_f1_precision"] = best["f1_precision"]
+        metrics["best_f1_recall"] = best["f1_recall"]
+        metrics["min_cost_threshold"] = best["cost_threshold"]
+        metrics["min_expected_cost"] = best["expected_cost"]
+        metrics["cost_fp"] = best["cost_fp"]
+        metrics["cost_fn"] = best["cost_fn"]
+        pd.DataFrame(
+            {
+                "threshold": curve.thresholds,
+                "tp": curve.tp,
+                "fp": curve.fp,
+                "fn": curve.fn,
+                "tn": curve.tn,
+                "accuracy": curve.accuracy,
+                "precision": curve.precision,
+                "recall": curve.recall,
+                "f1": curve.f1,
+                "expected_cost": curve.expected_cost(args.cost_fp, args.cost_fn),
+            }
+        ).to_csv(output_dir / "rf_threshold_metrics.csv", index=False)
     else:
         per_sample_nll = None
 
@@ -232,6 +387,74 @@ def main() -> None:
         except Exception:
             pass
 
+    cv_table = None
+    if args.cv_folds > 1 and model is not None:
+        if df is None:
+            df, X, y = _load_dataset(
+                args.data, args.allow_land, split_columns(args.split), feature_columns, target_column
+            )
+            groups = split_groups(df, args.split, tile_deg=args.tile_deg, block_days=args.block_days)
+        fold_id = cv_fold_ids(y.to_numpy(), groups, args.cv_folds, args.random_state)
+        with stage("cross_validate", rows=len(y)):
+            cv_table = cross_validate(
+                X.to_numpy(dtype=np.float64),
+                y.to_numpy(),
+                model.get_params(),
+                folds_from_ids(fold_id),
+                n_jobs=args.cv_jobs,
+                seed=args.random_state,
+            )
+        cv_table.to_csv(output_dir / "rf_cv_folds.csv", index=False)
+        metrics["cv_folds"] = args.cv_folds
+        for name in ("roc_auc", "average_precision", "f1", "accuracy"):
+            metrics[f"cv_{name}_mean"] = _safe_float(cv_table[name].mean())
+            metrics[f"cv_{name}_std"] = _safe_float(cv_table[name].std(ddof=0))
+
+    attribution = None
+    if args.attribution != "none":
+        if X_test is None:
+            data_df, data_X, _ = _load_dataset(
+                args.data, split_info["allow_land"], [], feature_columns, target_column
+            )
+            if len(data_df) != n_rows:
+                raise ValueError(
+                    f"{args.data} now has {len(data_df):,} rows after the land filter, not the "
+                    f"{n_rows:,} it had at training time; use --recompute."
+                )
+            X_test = data_X.iloc[holdout.test_index]
+        rows = subsample(len(X_test), args.attribution_samples, args.random_state)
+        X_sub = X_test.iloc[rows].to_numpy(dtype=np.float64)
+        attribution = pd.DataFrame({"feature": feature_columns})
+        if model is not None and hasattr(model, "feature_importances_"):
+            attribution["impurity_importance"] = np.asarray(model.feature_importances_)
+        if args.attribution in ("permutation", "all"):
+            with stage("permutation_importance", rows=len(rows)):
+                baseline, drops = permutation_importance(
+                    pipeline,
+                    feature_columns,
+                    X_sub,
+                    np.asarray(y_test)[rows],
+                    n_repeats=args.permutation_repeats,
+                    n_jobs=args.attribution_jobs,
+                    seed=args.random_state,
+                    model_path=args.model,
+                )
+            attribution["permutation_mean"] = drops.mean(axis=1)
+            attribution["permutation_std"] = drops.std(axis=1)
+            metrics["permutation_baseline_score"] = baseline
+        if args.attribution in ("contributions", "all"):
+            with stage("path_contributions", rows=len(rows)):
+                bias, contributions = path_contributions(pipeline, feature_columns, X_sub)
+            attribution["contribution_mean_abs"] = np.abs(contributions).mean(axis=0)
+            attribution["contribution_mean"] = contributions.mean(axis=0)
+            metrics["contribution_bias"] = bias
+        metrics["attribution_samples"] = int(len(rows))
+        metrics["feature_attribution"] = {
+            row.pop("feature"): {k: _safe_float(v) for k, v in row.items()}
+            for row in attribution.to_dict(orient="records")
+        }
+        attribution.to_csv(output_dir / "rf_feature_attribution.csv", index=False)
+
     # Save metrics JSON
     (output_dir / "rf_model_metrics.json").write_text(json.dumps(metrics, indent=2, sort_keys=True))
 
@@ -239,133 +462,64 @@ def main() -> None:
     report_txt = classification_report(y_test, y_pred, digits=4, zero_division=0)
     (output_dir / "rf_classification_report.txt").write_text(report_txt)
 
-    # Charts
-    import matplotlib
-
-    matplotlib.use("Agg")
-    import matplotlib.pyplot as plt  # noqa: PLC0415
-
-    # Confusion matrix
-    cm = confusion_matrix(y_test, y_pred)
-    disp = ConfusionMatrixDisplay(confusion_matrix=cm)
-    fig, ax = plt.subplots(figsize=(5, 5))
-    disp.plot(ax=ax, values_format="d", colorbar=False)
-    ax.set_title("Confusion Matrix")
-    fig.tight_layout()
-    fig.savefig(output_dir / "rf_confusion_matrix.png", dpi=180)
-    plt.close(fig)
-
+    # Charts: small precomputed inputs per chart, rendered in parallel; unchanged inputs are skipped.
+    chart_inputs: dict[str, dict] = {"confusion": {"matrix": confusion_matrix(y_test, y_pred)}}
     if y_proba is not None:
-        # ROC curve
         fpr, tpr, _ = roc_curve(y_test, y_proba)
-        fig, ax = plt.subplots(figsize=(6, 5))
-        ax.plot(fpr, tpr, label=f"AUC={metrics.get('roc_auc', 0):.3f}")
-        ax.plot([0, 1], [0, 1], linestyle="--", linewidth=1)
-        ax.set_xlabel("False Positive Rate")
-        ax.set_ylabel("True Positive Rate")
-        ax.set_title("ROC Curve")
-        ax.legend(loc="lower right")
-        fig.tight_layout()
-        fig.savefig(output_dir / "rf_roc_curve.png", dpi=180)
-        plt.close(fig)
-
-        # Precision-Recall curve
         precision, recall, _ = precision_recall_curve(y_test, y_proba)
-        fig, ax = plt.subplots(figsize=(6, 5))
-        ax.plot(recall, precision, label=f"AP={metrics.get('avg_precision', 0):.3f}")
-        ax.set_xlabel("Recall")
-        ax.set_ylabel("Precision")
-        ax.set_title("Precision-Recall Curve")
-        ax.legend(loc="lower left")
-        fig.tight_layout()
-        fig.savefig(output_dir / "rf_pr_curve.png", dpi=180)
-        plt.close(fig)
-
-        # Calibration curve
         frac_pos, mean_pred = calibration_curve(y_test, y_proba, n_bins=10, strategy="uniform")
-        fig, ax = plt.subplots(figsize=(6, 5))
-        ax.plot(mean_pred, frac_pos, marker="o", label="Model")
-        ax.plot([0, 1], [0, 1], linestyle="--", linewidth=1, label="Perfect")
-        ax.set_xlabel("Mean predicted probability")
-        ax.set_ylabel("Fraction of positives")
-        ax.set_title("Calibration Curve")
-        ax.legend(loc="upper left")
-        fig.tight_layout()
-        fig.savefig(output_dir / "rf_calibration_curve.png", dpi=180)
-        plt.close(fig)
-
-        # Probability histogram by class
         y_arr = np.asarray(y_test)
-        fig, ax = plt.subplots(figsize=(6, 5))
-        ax.hist(y_proba[y_arr == 0], bins=30, alpha=0.7, label="True=0")
-        ax.hist(y_proba[y_arr == 1], bins=30, alpha=0.7, label="True=1")
-        ax.set_xlabel("Predicted probability (class=1)")
-        ax.set_ylabel("Count")
-        ax.set_title("Predicted Probability Distribution")
-        ax.legend(loc="upper center")
-        fig.tight_layout()
-        fig.savefig(output_dir / "rf_probability_hist.png", dpi=180)
-        plt.close(fig)
-
-        # Threshold metrics curves
-        thresholds = np.linspace(0.0, 1.0, 101)
-        accs, precs, recs, f1s = [], [], [], []
-        for t in thresholds:
-            pred_t = (y_proba >= t).astype(int)
-            accs.append(accuracy_score(y_test, pred_t))
-            precs.append(precision_score(y_test, pred_t, zero_division=0))
-            recs.append(recall_score(y_test, pred_t, zero_division=0))
-            f1s.append(f1_score(y_test, pred_t, zero_division=0))
-
-        fig, ax = plt.subplots(figsize=(7, 5))
-        ax.plot(thresholds, accs, label="Accuracy")
-        ax.plot(thresholds, precs, label="Precision")
-        ax.plot(thresholds, recs, label="Recall")
-        ax.plot(thresholds, f1s, label="F1")
-        ax.set_xlabel("Threshold")
-        ax.set_ylabel("Score")
-        ax.set_title("Metrics vs Threshold")
-        ax.set_ylim(0, 1.0)
-        ax.legend(loc="best")
-        fig.tight_layout()
-        fig.savefig(output_dir / "rf_metrics_vs_threshold.png", dpi=180)
-        plt.close(fig)
-
-        # "Model loss" chart: per-sample negative log-likelihood distribution
-        if per_sample_nll is not None:
-            fig, ax = plt.subplots(figsize=(6, 5))
-            ax.hist(per_sample_nll, bins=40, alpha=0.85)
-            ax.set_xlabel("Per-sample negative log-likelihood")
-            ax.set_ylabel("Count")
-            ax.set_title("Log Loss Distribution")
-            fig.tight_layout()
-            fig.savefig(output_dir / "rf_logloss_distribution.png", dpi=180)
-            plt.close(fig)
+        chart_inputs.update(
+            {
+                "roc": {"fpr": fpr, "tpr": tpr, "auc": metrics.get("roc_auc", 0)},
+                "pr": {"precision": precision, "recall": recall, "ap": metrics.get("avg_precision", 0)},
+                "calibration": {"frac_pos": frac_pos, "mean_pred": mean_pred},
+                "probability": {"proba_neg": y_proba[y_arr == 0], "proba_pos": y_proba[y_arr == 1]},
+                "threshold": {
+                    "thresholds": curve.thresholds,
+                    "curves": {
+                        "Accuracy": curve.accuracy,
+                        "Precision": curve.precision,
+                        "Recall": curve.recall,
+                        "F1": curve.f1,
+                    },
+                    "best_f1": metrics["best_f1_threshold"],
+                },
+                "logloss": {"per_sample_nll": per_sample_nll},
+            }
+        )
 
     # Feature importance (if available)
     if model is not None and hasattr(model, "feature_importances_"):
         importances = np.asarray(getattr(model, "feature_importances_"))
         order = np.argsort(importances)[::-1]
-        names = [feature_columns[i] for i in order]
-        vals = importances[order]
-
-        fig, ax = plt.subplots(figsize=(7, 4))
-        ax.bar(range(len(vals)), vals)
-        ax.set_xticks(range(len(vals)))
-        ax.set_xticklabels(names, rotation=35, ha="right")
-        ax.set_ylabel("Importance")
-        ax.set_title("Feature Importances")
-        fig.tight_layout()
-        fig.savefig(output_dir / "rf_feature_importances.png", dpi=180)
-        plt.close(fig)
+        chart_inputs["importances"] = {"names": [feature_columns[i] for i in order], "values": importances[order]}
+
+    if attribution is not None:
+        shares = {
+            label: attribution[column].clip(lower=0).to_numpy()
+            for label, column in (
+                ("Impurity", "impurity_importance"),
+                ("Permutation", "permutation_mean"),
+                ("Path contribution", "contribution_mean_abs"),
+            )
+            if column in attribution
+        }
+        chart_inputs["attribution"] = {"names": feature_columns, "shares": shares}
+
+    tasks = {name: inputs for name, inputs in chart_inputs.items() if name in args.charts}
+    if tasks:
+        with stage("plot"):
+            rendered, skipped = render_charts(tasks, output_dir, jobs=args.chart_jobs)
+        print(f"Charts: {len(rendered)} rendered, {len(skipped)} unchanged")
 
     # Human-readable summary
     summary_lines = [
         f"Model: {args.model.name}",
         f"Type: {metrics.get('model_type')}",
-        f"Dataset: {args.data.name}",
+        f"Dataset: {Path(split_info['data']).name}",
         f"Rows used: {metrics.get('n_rows')} (land filtered={metrics.get('filtered_land')})",
-        f"Test size: {args.test_size} (n_test={metrics.get('n_test')})",
+        f"Test size: {split_info['test_size']} (n_test={metrics.get('n_test')}, split={split})",
         "",
         "Metrics:",
         f"- Accuracy: {metrics.get('accuracy')}",
@@ -379,6 +533,23 @@ def main() -> None:
             f"- Average Precision (PR AUC): {metrics.get('avg_precision')}",
             f"- Log loss: {metrics.get('log_loss')}",
             f"- Brier score: {metrics.get('brier_score')}",
+            f"- Best F1 threshold: {metrics.get('best_f1_threshold')} (F1={metrics.get('best_f1')})",
+            f"- Min-cost threshold: {metrics.get('min_cost_threshold')} "
+            f"(expected cost={metrics.get('min_expected_cost')}, FP cost={args.cost_fp}, FN cost={args.cost_fn})",
+        ]
+    if "oob_accuracy" in metrics:
+        summary_lines += [
+            f"- OOB accuracy (training rows): {metrics.get('oob_accuracy')}",
+            f"- OOB ROC AUC (training rows): {metrics.get('oob_roc_auc')}",
+        ]
+    if cv_table is not None:
+        summary_lines += [
+            "",
+            f"{args.cv_folds}-fold CV ({args.split} folds, mean +/- std):",
+            *(
+                f"- {name}: {metrics.get(f'cv_{name}_mean')} +/- {metrics.get(f'cv_{name}_std')}"
+                for name in ("accuracy", "f1", "roc_auc", "average_precision")
+            ),
         ]
 
     summary_lines += [
@@ -389,9 +560,12 @@ def main() -> None:
         "- rf_confusion_matrix.png",
         "- rf_feature_importances.png (if supported)",
         "- rf_roc_curve.png / rf_pr_curve.png / rf_calibration_curve.png / rf_probability_hist.png",
-        "- rf_metrics_vs_threshold.png",
+        "- rf_metrics_vs_threshold.png / rf_threshold_metrics.csv",
+        "- rf_feature_attribution.csv / rf_feature_attribution.png (with --attribution)",
         "- rf_logloss_distribution.png",
     ]
+    if cv_table is not None:
+        summary_lines.append("- rf_cv_folds.csv")
 
     (output_dir / "rf_model_summary.txt").write_text("\n".join(summary_lines) + "\n")
 
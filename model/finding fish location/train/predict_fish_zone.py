@@ -1,12 +1,116 @@
 #!/usr/bin/env python3
 
+# Imports are kept light at module level: a single-row prediction with a compiled .forest model
+# needs only NumPy. pandas (batch I/O), joblib/sklearn (.pkl models) and global_land_mask (only
+# when the land raster cache must be rebuilt) are imported on first use.
+from __future__ import annotations
+
 import argparse
+import json
 from pathlib import Path
+from typing import TYPE_CHECKING, Optional
+
+import numpy as np
+
+from compiled_forest import CompiledForest, is_compiled_forest, load_compiled_forest
+from instrumentation import add_profile_arguments, stage, start_profiling
+from land_mask import is_sri_lanka_land, sri_lanka_land_mask
+
+if TYPE_CHECKING:
+    import pandas as pd
+
 
-import joblib
-import pandas as pd
+DEFAULT_FEATURE_COLUMNS = ["lat", "lon", "sst", "chlor_a", "water_u", "water_v"]
+DEFAULT_MODEL_PATH = Path(__file__).resolve().parent / "models" / "rf_fish_zone_model.pkl"
+DEFAULT_BATCH_SIZE = 100_000
 
-from land_mask import is_sri_lanka_land
+
+def load_artifact(model_path: Path):
+    """Load a saved model artifact and return `(pipeline, feature_columns)`.
+
+    `model_path` may be a joblib .pkl or a compiled `.forest` directory (see compiled_forest.py);
+    both expose `classes_`, `predict` and `predict_proba`.
+    """
+    if not model_path.exists():
+        raise FileNotFoundError(
+            f"Model artifact not found: {model_path}. "
+            "Train the model first (train_random_forest.py) or pass --model."
+        )
+
+    if is_compiled_forest(model_path):
+        forest = load_compiled_forest(model_path)
+        return forest, list(forest.feature_columns)
+
+    import joblib  # noqa: PLC0415
+
+    artifact = joblib.load(model_path)
+
+    # Backward/forward compatibility:
+    # - Newer artifact: {pipeline, feature_columns, target_column}
+    # - Older artifact: pipeline directly
+    if isinstance(artifact, dict) and "pipeline" in artifact:
+        pipeline = artifact["pipeline"]
+        feature_columns = artifact.get("feature_columns", DEFAULT_FEATURE_COLUMNS)
+    else:
+        pipeline = artifact
+        feature_columns = DEFAULT_FEATURE_COLUMNS
+
+    return pipeline, list(feature_columns)
+
+
+class RowScorer:
+    """Scores one observation at a time without building a DataFrame.
+
+    For the {imputer, RandomForest} pipeline that train_random_forest.py saves, sklearn's forest
+    predict_proba re-validates input and dispatches every call through joblib (n_jobs=-1), which
+    dominates single-row latency; walking the fitted trees directly gives the same averaged
+    probabilities. Compiled forests are scored on a NumPy row; anything else goes through the
+    pipeline with a one-row DataFrame.
+    """
+
+    def __init__(self, pipeline, feature_columns: list[str]):
+        self.pipeline = pipeline
+        self.feature_columns = list(feature_columns)
+        self.classes = [int(c) for c in getattr(pipeline, "classes_", [])]
+
+        steps = getattr(pipeline, "named_steps", {})
+        imputer, model = steps.get("imputer"), steps.get("model")
+        statistics = getattr(imputer, "statistics_", None)
+        self._fill_values = None
+        self._estimators = None
+        if statistics is not None and not np.isnan(statistics).any() and hasattr(model, "estimators_"):
+            self._fill_values = np.asarray(statistics, dtype=float)
+            self._estimators = list(model.estimators_)
+
+    @property
+    def has_proba(self) -> bool:
+        return hasattr(self.pipeline, "predict_proba") and 1 in self.classes
+
+    def _frame(self, row: dict):
+        import pandas as pd  # noqa: PLC0415
+
+        return pd.DataFrame([row], columns=self.feature_columns)
+
+    def predict_proba(self, row: dict) -> np.ndarray:
+        x = np.array([[row[c] for c in self.feature_columns]], dtype=float)
+        if isinstance(self.pipeline, CompiledForest):
+            return self.pipeline.predict_proba(x)[0]
+        if self._estimators is None:
+            return np.asarray(self.pipeline.predict_proba(self._frame(row))[0], dtype=np.float64)
+
+        x = np.where(np.isnan(x), self._fill_values, x).astype(np.float32)
+        proba = np.zeros(len(self.classes), dtype=np.float64)
+        for estimator in self._estimators:
+            proba += estimator.predict_proba(x, check_input=False)[0]
+        proba /= len(self._estimators)
+        return proba
+
+    def predict(self, row: dict) -> tuple[int, Optional[float]]:
+        """Return `(predicted class, probability of class 1 or None)`."""
+        if not self.has_proba:
+            return int(self.pipeline.predict(self._frame(row))[0]), None
+        proba = self.predict_proba(row)
+        return self.classes[int(proba.argmax())], float(proba[self.classes.index(1)])
 
 
 def parse_args() -> argparse.Namespace:
@@ -20,19 +124,18 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument(
         "--model",
         type=Path,
-        default=Path(__file__).resolve().parent / "models" / "rf_fish_zone_model.pkl",
-        help="Path to the saved model artifact (joblib .pkl).",
+        default=DEFAULT_MODEL_PATH,
+        help="Path to the saved model artifact (joblib .pkl or compiled .forest directory).",
     )
 
-    parser.add_argument("--lat", type=float, required=True, help="Latitude")
-    parser.add_argument("--lon", type=float, required=True, help="Longitude")
-    parser.add_argument("--sst", type=float, required=True, help="Sea surface temperature")
+    parser.add_argument("--lat", type=float, help="Latitude")
+    parser.add_argument("--lon", type=float, help="Longitude")
+    parser.add_argument("--sst", type=float, help="Sea surface temperature")
     parser.add_argument(
         "--chlorophyll",
         "--chlor-a",
         dest="chlor_a",
         type=float,
-        required=True,
         help="Chlorophyll concentration (chlor_a)",
     )
     parser.add_argument(
@@ -40,7 +143,6 @@ def parse_args() -> argparse.Namespace:
         "--water-u",
         dest="water_u",
         type=float,
-        required=True,
         help="Eastward ocean current component (water_u)",
     )
     parser.add_argument(
@@ -48,15 +150,171 @@ def parse_args() -> argparse.Namespace:
         "--water-v",
         dest="water_v",
         type=float,
-        required=True,
         help="Northward ocean current component (water_v)",
     )
 
-    return parser.parse_args()
+    batch = parser.add_argument_group("batch mode")
+    batch.add_argument(
+        "--input",
+        type=Path,
+        default=None,
+        help=(
+            "CSV, Parquet or Feather file with one row per observation (feature columns as in training). "
+            "When set, writes predictions for every row to --output instead of printing one value."
+        ),
+    )
+    batch.add_argument(
+        "--output",
+        type=Path,
+        default=None,
+        help="Batch output file (.csv, .parquet or .feather). Default: <input stem>_predictions.csv",
+    )
+    batch.add_argument(
+        "--batch-size",
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help=f"Rows scored per chunk; bounds memory in batch mode (default: {DEFAULT_BATCH_SIZE:,}).",
+    )
+    batch.add_argument(
+        "--drift-reference",
+        type=Path,
+        default=None,
+        help=(
+            "Training distribution to check the inputs against (PSI/KS per feature). "
+            "Default: <model stem>_drift.json next to --model, when it exists."
+        ),
+    )
+    batch.add_argument("--drift-report", type=Path, default=None, help="Write the per-feature drift report as JSON.")
+    add_profile_arguments(parser)
+
+    args = parser.parse_args()
+
+    if args.input is None:
+        missing = [
+            flag
+            for flag, value in [
+                ("--lat", args.lat),
+                ("--lon", args.lon),
+                ("--sst", args.sst),
+                ("--chlorophyll", args.chlor_a),
+                ("--u", args.water_u),
+                ("--v", args.water_v),
+            ]
+            if value is None
+        ]
+        if missing:
+            parser.error("the following arguments are required (or pass --input): " + ", ".join(missing))
+    if args.batch_size < 1:
+        parser.error("--batch-size must be >= 1")
+
+    return args
+
+
+def predict_batch(pipeline, feature_columns: list[str], df: pd.DataFrame) -> tuple[np.ndarray, np.ndarray]:
+    """Return `(prediction, probability_of_1)` for every row of `df`.
+
+    Rows on Sri Lankan land (per `lat`/`lon`) are not scored: prediction 0, probability 0.
+    """
+    n = len(df)
+    pred = np.zeros(n, dtype=np.int64)
+    proba = np.zeros(n, dtype=np.float64)
+
+    if "lat" in df.columns and "lon" in df.columns:
+        with stage("land_mask", rows=n):
+            sea = ~sri_lanka_land_mask(
+                df["lat"].to_numpy(dtype=float, na_value=np.nan),
+                df["lon"].to_numpy(dtype=float, na_value=np.nan),
+            )
+    else:
+        sea = np.ones(n, dtype=bool)
+
+    if not sea.any():
+        return pred, proba
+
+    X = df.loc[sea, feature_columns] if not sea.all() else df[feature_columns]
+    classes = np.asarray(pipeline.classes_)
+    class_proba = pipeline.predict_proba(X)
+    pred[sea] = classes[class_proba.argmax(axis=1)]
+    if 1 in classes:
+        proba[sea] = class_proba[:, int(np.flatnonzero(classes == 1)[0])]
+    return pred, proba
+
+
+def run_batch(args: argparse.Namespace) -> None:
+    from dataset_io import TableAppender, iter_table_chunks, table_columns  # noqa: PLC0415
+    from drift import DriftMonitor, drift_path_for, format_report, load_reference  # noqa: PLC0415
+
+    if not args.input.exists():
+        raise FileNotFoundError(f"Input file not found: {args.input}")
+
+    with stage("load_model"):
+        pipeline, feature_columns = load_artifact(args.model)
+    reference_path = args.drift_reference or drift_path_for(args.model)
+    monitor = None
+    if reference_path.exists():
+        monitor = DriftMonitor(load_reference(reference_path), feature_columns)
+    elif args.drift_reference is not None:
+        raise FileNotFoundError(f"Drift reference not found: {reference_path}")
+    out_path = args.output or args.input.with_name(f"{args.input.stem}_predictions.csv")
+
+    writer = TableAppender(out_path, columns=list(dict.fromkeys([*table_columns(args.input), "prediction", "probability"])))
+    n_rows = 0
+    n_positive = 0
+    try:
+        # Read untyped: the input columns are written back out and must keep their full precision.
+        # The models cast the features to float32 themselves.
+        chunks = iter_table_chunks(args.input, args.batch_size)
+        while True:
+            # Reading is timed separately from scoring, so the chunks are pulled by hand.
+            with stage("load") as timed:
+                chunk = next(chunks, None)
+                timed.rows = 0 if chunk is None else len(chunk)
+            if chunk is None:
+                break
+            missing_cols = [c for c in feature_columns if c not in chunk.columns]
+            if missing_cols:
+                raise ValueError(
+                    "Missing required columns in input: "
+                    + ", ".join(missing_cols)
+                    + f". Available columns: {', '.join(map(str, chunk.columns))}"
+                )
+
+            if monitor is not None:
+                with stage("drift", rows=len(chunk)):
+                    monitor.update(chunk)
+            with stage("predict", rows=len(chunk)):
+                pred, proba = predict_batch(pipeline, feature_columns, chunk)
+            chunk["prediction"] = pred
+            chunk["probability"] = proba
+            with stage("write", rows=len(chunk)):
+                writer.write(chunk)
+
+            n_rows += len(chunk)
+            n_positive += int(pred.sum())
+    finally:
+        writer.close()
+
+    print(f"Wrote {n_rows:,} predictions to {out_path}")
+    print(f"prediction=1: {n_positive:,} ({(n_positive / max(n_rows, 1)) * 100:.2f}%)")
+
+    if monitor is not None:
+        report = monitor.report()
+        print(f"\nInput drift vs training ({reference_path.name}):")
+        print(format_report(report))
+        flagged = [col for col, r in report.items() if r["status"] != "ok"]
+        if flagged:
+            print(f"WARNING: inputs differ from the training distribution for: {', '.join(flagged)}")
+        if args.drift_report is not None:
+            args.drift_report.write_text(json.dumps(report, indent=2))
 
 
 def main() -> None:
     args = parse_args()
+    start_profiling("predict_fish_zone", args)
+
+    if args.input is not None:
+        run_batch(args)
+        return
 
     # Sea-only guard: if the user passes a coordinate on Sri Lankan land,
     # do not predict a fish zone there.
@@ -64,25 +322,8 @@ def main() -> None:
         print(0)
         return
 
-    if not args.model.exists():
-        raise FileNotFoundError(
-            f"Model artifact not found: {args.model}. "
-            "Train the model first (train_random_forest.py) or pass --model."
-        )
-
-    artifact = joblib.load(args.model)
-
-    # Backward/forward compatibility:
-    # - Newer artifact: {pipeline, feature_columns, target_column}
-    # - Older artifact: pipeline directly
-    if isinstance(artifact, dict) and "pipeline" in artifact:
-        pipeline = artifact["pipeline"]
-        feature_columns = artifact.get(
-            "feature_columns", ["lat", "lon", "sst", "chlor_a", "water_u", "water_v"]
-        )
-    else:
-        pipeline = artifact
-        feature_columns = ["lat", "lon", "sst", "chlor_a", "water_u", "water_v"]
+    with stage("load_model"):
+        pipeline, feature_columns = load_artifact(args.model)
 
     row = {
         "lat": args.lat,
@@ -93,11 +334,11 @@ def main() -> None:
         "water_v": args.water_v,
     }
 
-    X = pd.DataFrame([row], columns=list(feature_columns))
-    pred = pipeline.predict(X)
+    with stage("predict", rows=1):
+        pred, _ = RowScorer(pipeline, feature_columns).predict(row)
 
     # Print only the predicted class (0/1)
-    print(int(pred[0]))
+    print(pred)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+
+"""Random-forest hyperparameter search used by `train_random_forest.py --search`.
+
+Candidates come from a parameter space (random sampling) and are scored with k-fold CV, either all
+on the full folds (`random`) or by successive halving (`halving`: every round trains the remaining
+candidates on `factor` times more rows and keeps the best 1/`factor`).
+
+Each fold is imputed once (median, fitted on the fold's training rows, as in the saved pipeline)
+and cached as float32 `.npy` files that worker processes memory-map, so candidates never re-impute
+or re-pickle the data. (candidate, fold) fits are spread over a process pool; each forest gets
+`cores // workers` threads, so the pool never oversubscribes the machine.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Optional
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.impute import SimpleImputer
+from sklearn.metrics import accuracy_score, average_precision_score, f1_score, roc_auc_score
+from sklearn.model_selection import StratifiedKFold
+
+
+DEFAULT_SEARCH_SPACE: dict[str, list[Any]] = {
+    "n_estimators": [100, 200, 300, 500],
+    "max_depth": [None, 10, 20, 30],
+    "min_samples_split": [2, 5, 10],
+    "min_samples_leaf": [1, 2, 4, 8],
+    "max_features": ["sqrt", 0.5, 1.0],
+    "class_weight": ["balanced", None],
+}
+SEARCH_METHODS = ("random", "halving")
+SCORING = ("roc_auc", "average_precision", "f1", "accuracy")
+
+# Bytes per node in the compiled .forest format (left/right/feature int32, float64 threshold,
+# missing flag, float64 value per class); used to report model size without saving each model.
+_NODE_BYTES_BASE = 3 * 4 + 8 + 1
+# Set per run (--search-jobs, --random-state) rather than searched over.
+_RUN_PARAMS = ("n_jobs", "random_state", "verbose", "warm_start")
+
+
+def load_search_space(path: Path) -> dict[str, list[Any]]:
+    """Read `{"param": [values, ...], ...}`; params it omits keep the default choices."""
+    data = json.loads(path.read_text())
+    if not isinstance(data, dict) or not all(isinstance(v, list) and v for v in data.values()):
+        raise ValueError(f"Search space must map parameter names to non-empty lists: {path}")
+    unknown = sorted(set(data) - set(RandomForestClassifier().get_params()))
+    if unknown:
+        raise ValueError(f"Unknown RandomForestClassifier parameters in search space: {unknown}")
+    reserved = sorted(set(data) & set(_RUN_PARAMS))
+    if reserved:
+        raise ValueError(f"Search space cannot set {reserved}; they are fixed for the whole run, not searched.")
+    return {**DEFAULT_SEARCH_SPACE, **data}
+
+
+def sample_candidates(space: dict[str, list[Any]], n: int, seed: int) -> list[dict[str, Any]]:
+    """Up to `n` distinct parameter combinations drawn uniformly from `space`."""
+    rng = np.random.default_rng(seed)
+    total = math.prod(len(v) for v in space.values())
+    seen: set[tuple] = set()
+    candidates = []
+    while len(candidates) < min(n, total):
+        picks = tuple(int(rng.integers(len(v))) for v in space.values())
+        if picks in seen:
+            continue
+        seen.add(picks)
+        candidates.append({name: values[i] for (name, values), i in zip(space.items(), picks)})
+    return candidates
+
+
+def stratified_folds(y: np.ndarray, n_folds: int, seed: int) -> list[tuple[np.ndarray, np.ndarray]]:
+    splitter = StratifiedKFold(n_splits=n_folds, shuffle=True, random_state=seed)
+    return [(tr.astype(np.int32), va.astype(np.int32)) for tr, va in splitter.split(np.zeros(len(y)), y)]
+
+
+def _cache_folds(X: np.ndarray, y: np.ndarray, folds, cache_dir: Path, seed: int) -> list[dict[str, str]]:
+    """Impute each fold once and store it as .npy files for the workers to memory-map."""
+    rng = np.random.default_rng(seed)
+    cached = []
+    for k, (train_idx, val_idx) in enumerate(folds):
+        imputer = SimpleImputer(strategy="median").fit(X[train_idx])
+        # A fixed shuffled order of the fold's training rows: halving rounds use growing prefixes.
+        order = rng.permutation(len(train_idx))
+        arrays = {
+            "X_train": imputer.transform(X[train_idx[order]]).astype(np.float32),
+            "y_train": y[train_idx[order]],
+            "X_val": imputer.transform(X[val_idx]).astype(np.float32),
+            "y_val": y[val_idx],
+        }
+        paths = {}
+        for name, arr in arrays.items():
+            paths[name] = str(cache_dir / f"fold{k}_{name}.npy")
+            np.save(paths[name], arr)
+        cached.append(paths)
+    return cached
+
+
+def _score(scoring: str, y_true: np.ndarray, proba: np.ndarray, classes: np.ndarray) -> float:
+    pred = classes[proba.argmax(axis=1)]
+    if scoring == "accuracy":
+        return float(accuracy_score(y_true, pred))
+    if scoring == "f1":
+        return float(f1_score(y_true, pred, zero_division=0))
+    if len(classes) < 2 or len(np.unique(y_true)) < 2:
+        return float("nan")
+    positive = proba[:, int(np.flatnonzero(classes == 1)[0])] if 1 in classes else proba[:, -1]
+    if scoring == "roc_auc":
+        return float(roc_auc_score(y_true, positive))
+    return float(average_precision_score(y_true, positive))
+
+
+def _fit_and_score(
+    fold: dict[str, str], params: dict[str, Any], n_samples: int, scoring: tuple[str, ...], threads: int, seed: int
+):
+    """Worker task: fit one candidate on one cached fold; returns (scores, fit seconds, node count)."""
+    X_train = np.load(fold["X_train"], mmap_mode="r")[:n_samples]
+    y_train = np.load(fold["y_train"], mmap_mode="r")[:n_samples]
+    X_val = np.load(fold["X_val"], mmap_mode="r")
+    y_val = np.load(fold["y_val"], mmap_mode="r")
+
+    model = RandomForestClassifier(**params, n_jobs=threads, random_state=seed)
+    started = time.perf_counter()
+    model.fit(X_train, y_train)
+    fit_seconds = time.perf_counter() - started
+
+    proba = model.predict_proba(X_val)
+    scores = tuple(_score(name, np.asarray(y_val), proba, model.classes_) for name in scoring)
+    n_nodes = sum(e.tree_.node_count for e in model.estimators_)
+    return scores, fit_seconds, n_nodes
+
+
+def _pool(cores: int, n_tasks: int) -> tuple[Optional[ProcessPoolExecutor], int]:
+    """Process pool sized for `n_tasks` fits (None when one process suffices) and threads per fit."""
+    workers = max(1, min(cores, n_tasks))
+    return (ProcessPoolExecutor(max_workers=workers) if workers > 1 else None), max(1, cores // workers)
+
+
+def _evaluate(
+    pool: Optional[ProcessPoolExecutor],
+    candidates: list[dict[str, Any]],
+    folds: list[dict[str, str]],
+    n_samples: int,
+    scoring: tuple[str, ...],
+    threads: int,
+    seed: int,
+) -> list[list[tuple[tuple[float, ...], float, int]]]:
+    tasks = [(fold, params, n_samples, scoring, threads, seed) for params in candidates for fold in folds]
+    if pool is None:
+        results = [_fit_and_score(*task) for task in tasks]
+    else:
+        results = list(pool.map(_fit_and_score, *zip(*tasks)))
+    return [results[i * len(folds) : (i + 1) * len(folds)] for i in range(len(candidates))]
+
+
+def run_search(
+    X: np.ndarray,
+    y: np.ndarray,
+    *,
+    method: str = "random",
+    space: Optional[dict[str, list[Any]]] = None,
+    n_candidates: int = 20,
+    folds: Optional[list[tuple[np.ndarray, np.ndarray]]] = None,
+    n_folds: int = 5,
+    scoring: str = "roc_auc",
+    n_jobs: Optional[int] = None,
+    factor: int = 3,
+    min_samples: int = 1000,
+    seed: int = 42,
+    cache_dir: Optional[Path] = None,
+) -> tuple[pd.DataFrame, list[dict[str, Any]]]:
+    """Score candidates with CV; returns `(leaderboard best first, candidate parameter dicts)`.
+
+    `folds` are (train indices, validation indices) into `X`; default: stratified `n_folds`-fold.
+    Leaderboard rows carry the candidate index and parameters, mean/std CV score, mean fit seconds,
+    tree node count and the compiled model size; with halving there is one row per (candidate, round).
+    """
+    if method not in SEARCH_METHODS:
+        raise ValueError(f"Unknown search method {method!r}; expected one of {SEARCH_METHODS}.")
+    if scoring not in SCORING:
+        raise ValueError(f"Unknown scoring {scoring!r}; expected one of {SCORING}.")
+
+    X = np.asarray(X, dtype=np.float64)
+    y = np.asarray(y)
+    folds = folds if folds is not None else stratified_folds(y, n_folds, seed)
+    candidates = sample_candidates(space or DEFAULT_SEARCH_SPACE, n_candidates, seed)
+    n_classes = len(np.unique(y))
+
+    cores = n_jobs if n_jobs and n_jobs > 0 else (os.cpu_count() or 1)
+    max_train = min(len(tr) for tr, _ in folds)
+
+    if method == "halving":
+        rounds = max(1, math.floor(math.log(len(candidates), factor)) + 1)
+        schedule = [max(min(min_samples, max_train), max_train // factor ** (rounds - 1 - r)) for r in range(rounds)]
+    else:
+        schedule = [max_train]
+
+    rows = []
+    with tempfile.TemporaryDirectory(dir=cache_dir) as tmp:
+        cached = _cache_folds(X, y, folds, Path(tmp), seed)
+        alive = list(range(len(candidates)))
+
+        for round_no, n_samples in enumerate(schedule):
+            pool, threads = _pool(cores, len(alive) * len(folds))
+            try:
+                results = _evaluate(pool, [candidates[i] for i in alive], cached, n_samples, (scoring,), threads, seed)
+            finally:
+                if pool is not None:
+                    pool.shutdown()
+
+            round_rows = []
+            for cand, per_fold in zip(alive, results):
+                scores = np.array([r[0][0] for r in per_fold])
+                nodes = float(np.mean([r[2] for r in per_fold]))
+                round_rows.append(
+                    {
+                        "candidate": cand,
+                        "round": round_no,
+                        "n_samples": n_samples,
+                        **{f"param_{k}": str(v) for k, v in candidates[cand].items()},
+                        "mean_score": float(np.nanmean(scores)) if not np.isnan(scores).all() else float("nan"),
+                        "std_score": float(np.nanstd(scores)) if not np.isnan(scores).all() else float("nan"),
+                        "mean_fit_seconds": float(np.mean([r[1] for r in per_fold])),
+                        "mean_nodes": nodes,
+                        "model_mb": nodes * (_NODE_BYTES_BASE + 8 * n_classes) / 1e6,
+                    }
+                )
+            rows.extend(round_rows)
+
+            ranked = sorted(round_rows, key=lambda r: -np.nan_to_num(r["mean_score"], nan=-np.inf))
+            alive = [r["candidate"] for r in ranked[: max(1, math.ceil(len(ranked) / factor))]]
+
+    board = pd.DataFrame(rows)
+    board = board.sort_values(["round", "mean_score"], ascending=[False, False], na_position="last")
+    board.insert(0, "rank", np.arange(1, len(board) + 1))
+    return board.reset_index(drop=True), candidates
+
+
+def cross_validate(
+    X: np.ndarray,
+    y: np.ndarray,
+    params: dict[str, Any],
+    folds: list[tuple[np.ndarray, np.ndarray]],
+    *,
+    scoring: tuple[str, ...] = SCORING,
+    n_jobs: Optional[int] = None,
+    seed: int = 42,
+    cache_dir: Optional[Path] = None,
+) -> pd.DataFrame:
+    """Fit `params` on every fold in parallel; one row per fold with each `scoring` metric.
+
+    Uses the same cached, pre-imputed folds and process pool as the search, so the data is read and
+    imputed once however many folds there are.
+    """
+    unknown = [name for name in scoring if name not in SCORING]
+    if unknown:
+        raise ValueError(f"Unknown scoring {unknown}; expected names from {SCORING}.")
+    params = {k: v for k, v in params.items() if k not in _RUN_PARAMS}
+
+    X = np.asarray(X, dtype=np.float64)
+    y = np.asarray(y)
+    cores = n_jobs if n_jobs and n_jobs > 0 else (os.cpu_count() or 1)
+    with tempfile.TemporaryDirectory(dir=cache_dir) as tmp:
+        cached = _cache_folds(X, y, folds, Path(tmp), seed)
+        n_samples = max(len(tr) for tr, _ in folds)
+        pool, threads = _pool(cores, len(folds))
+        try:
+            (results,) = _evaluate(pool, [params], cached, n_samples, tuple(scoring), threads, seed)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+    rows = [
+        {"fold": k, "n_train": len(tr), "n_val": len(va), **dict(zip(scoring, scores)), "fit_seconds": seconds}
+        for k, ((tr, va), (scores, seconds, _)) in enumerate(zip(folds, results))
+    ]
+    return pd.DataFrame(rows)
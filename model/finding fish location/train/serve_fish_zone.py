@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+
+"""Long-running fish-zone inference service.
+
+Loads the model artifact once and answers predictions over a small HTTP/1.1 API
+(TCP or Unix socket), so callers such as the NestJS backend do not pay
+interpreter start-up, imports and `joblib.load` on every request.
+
+Endpoints:
+- GET  /health   -> {"status": "ok", "model": ..., "feature_columns": [...]}
+- POST /predict  -> body {"lat", "lon", "sst", "chlor_a", "water_u", "water_v"}
+                    (also accepts the CLI aliases "chlorophyll", "u", "v")
+                    returns {"fish_presence": 0|1, "probability": float|null, "land": bool}
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gc
+import json
+import os
+import signal
+import socket
+import stat
+import time
+import traceback
+from pathlib import Path
+
+from land_mask import is_sri_lanka_land, load_land_raster
+from predict_fish_zone import DEFAULT_MODEL_PATH, RowScorer, load_artifact
+
+
+FIELD_ALIASES = {
+    "chlorophyll": "chlor_a",
+    "u": "water_u",
+    "v": "water_v",
+}
+REQUIRED_FIELDS = ["lat", "lon", "sst", "chlor_a", "water_u", "water_v"]
+
+MAX_BODY_BYTES = 64 * 1024
+
+
+class BadRequest(ValueError):
+    pass
+
+
+class FishZonePredictor:
+    """Keeps the fitted pipeline warm and scores one observation at a time."""
+
+    def __init__(self, model_path: Path):
+        self.model_path = model_path
+        self.pipeline, self.feature_columns = load_artifact(model_path)
+        self.scorer = RowScorer(self.pipeline, self.feature_columns)
+
+    def warm_up(self) -> None:
+        """Touch the land raster and run one prediction so the first request is not slow."""
+        load_land_raster()
+        self.predict({"lat": 0.0, "lon": 0.0, "sst": 28.0, "chlor_a": 0.2, "water_u": 0.0, "water_v": 0.0})
+
+    def predict(self, payload: dict) -> dict:
+        row = _parse_row(payload)
+
+        # Sea-only guard, same as predict_fish_zone.py.
+        if is_sri_lanka_land(row["lat"], row["lon"]):
+            return {"fish_presence": 0, "probability": 0.0, "land": True}
+
+        pred, probability = self.scorer.predict(row)
+        return {"fish_presence": pred, "probability": probability, "land": False}
+
+
+def _parse_row(payload: dict) -> dict:
+    if not isinstance(payload, dict):
+        raise BadRequest("Request body must be a JSON object.")
+
+    row = {}
+    for key, value in payload.items():
+        row[FIELD_ALIASES.get(key, key)] = value
+
+    missing = [f for f in REQUIRED_FIELDS if f not in row]
+    if missing:
+        raise BadRequest(f"Missing required fields: {missing}")
+
+    try:
+        return {f: float(row[f]) for f in REQUIRED_FIELDS}
+    except (TypeError, ValueError) as exc:
+        raise BadRequest(f"Fields must be numeric: {exc}") from exc
+
+
+_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+}
+
+
+async def _write_json(writer: asyncio.StreamWriter, status: int, body: dict, *, keep_alive: bool) -> None:
+    data = json.dumps(body).encode("utf-8")
+    head = (
+        f"HTTP/1.1 {status} {_REASONS.get(status, 'Error')}\r\n"
+        "Content-Type: application/json\r\n"
+        f"Content-Length: {len(data)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+        "\r\n"
+    ).encode("ascii")
+    writer.write(head + data)
+    await writer.drain()
+
+
+async def _handle_connection(
+    predictor: FishZonePredictor, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+) -> None:
+    try:
+        while True:
+            request_line = await reader.readline()
+            if not request_line:
+                break
+
+            try:
+                method, target, version = request_line.decode("latin-1").split()
+            except ValueError:
+                await _write_json(writer, 400, {"error": "Malformed request line."}, keep_alive=False)
+                break
+
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+
+            keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+            try:
+                length = int(headers.get("content-length", "0") or 0)
+            except ValueError:
+                length = -1
+            if length < 0:
+                await _write_json(writer, 400, {"error": "Invalid Content-Length header."}, keep_alive=False)
+                break
+            if length > MAX_BODY_BYTES:
+                await _write_json(writer, 413, {"error": "Request body too large."}, keep_alive=False)
+                break
+            body = await reader.readexactly(length) if length else b""
+
+            path = target.split("?", 1)[0]
+            if path == "/health" and method == "GET":
+                status, response = 200, {
+                    "status": "ok",
+                    "model": str(predictor.model_path),
+                    "feature_columns": predictor.feature_columns,
+                }
+            elif path == "/predict" and method == "POST":
+                try:
+                    status, response = 200, predictor.predict(json.loads(body or b"{}"))
+                # JSONDecodeError and UnicodeDecodeError (a non-UTF-8 body) are ValueErrors.
+                except (BadRequest, ValueError, TypeError) as exc:
+                    status, response = 400, {"error": str(exc)}
+                except Exception:
+                    traceback.print_exc()
+                    status, response = 500, {"error": "Internal server error."}
+            elif path in ("/health", "/predict"):
+                status, response = 405, {"error": f"{method} not allowed on {path}"}
+            else:
+                status, response = 404, {"error": f"Unknown path: {path}"}
+
+            await _write_json(writer, status, response, keep_alive=keep_alive)
+            if not keep_alive:
+                break
+    except (asyncio.IncompleteReadError, ConnectionResetError):
+        pass
+    finally:
+        writer.close()
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Serve fish-zone predictions from a warm Random Forest model over HTTP "
+            "(POST /predict with lat, lon, sst, chlor_a, water_u, water_v)."
+        )
+    )
+    parser.add_argument(
+        "--model",
+        type=Path,
+        default=DEFAULT_MODEL_PATH,
+        help="Path to the saved model artifact (joblib .pkl or compiled .forest directory).",
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="TCP host to bind (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="TCP port to bind (default: 8765)")
+    parser.add_argument(
+        "--unix-socket",
+        type=Path,
+        default=None,
+        help="Serve on this Unix domain socket instead of TCP.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help=(
+            "Worker processes accepting on the same socket (default: 1). With a compiled .forest model "
+            "the workers share one memory-mapped copy of the trees."
+        ),
+    )
+    return parser.parse_args()
+
+
+def _listen_socket(args: argparse.Namespace) -> tuple[socket.socket, str]:
+    """Bind the listening socket once, so forked workers can all accept on it."""
+    if args.unix_socket is not None:
+        # Only a stale socket from a previous run is removed; never an unrelated file.
+        if args.unix_socket.exists():
+            if not stat.S_ISSOCK(args.unix_socket.stat().st_mode):
+                raise FileExistsError(f"{args.unix_socket} exists and is not a socket; refusing to replace it.")
+            args.unix_socket.unlink()
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.bind(str(args.unix_socket))
+        sock.listen(128)
+        return sock, f"unix:{args.unix_socket}"
+    sock = socket.create_server((args.host, args.port), backlog=128)
+    return sock, f"http://{args.host}:{args.port}"
+
+
+async def serve(predictor: FishZonePredictor, sock: socket.socket) -> None:
+    def handler(reader, writer):
+        return _handle_connection(predictor, reader, writer)
+
+    if sock.family == socket.AF_UNIX:
+        server = await asyncio.start_unix_server(handler, sock=sock)
+    else:
+        server = await asyncio.start_server(handler, sock=sock)
+    async with server:
+        await server.serve_forever()
+
+
+def _interrupt(signum, frame) -> None:
+    raise KeyboardInterrupt
+
+
+def _run_worker(predictor: FishZonePredictor, sock: socket.socket) -> None:
+    try:
+        asyncio.run(serve(predictor, sock))
+    except KeyboardInterrupt:
+        pass
+
+
+def main() -> None:
+    args = parse_args()
+
+    started = time.perf_counter()
+    predictor = FishZonePredictor(args.model)
+    predictor.warm_up()
+    load_seconds = time.perf_counter() - started
+
+    sock, where = _listen_socket(args)
+    print(
+        f"Loaded {args.model} in {load_seconds:.2f}s; serving on {where} with {args.workers} worker(s)",
+        flush=True,
+    )
+
+    if args.workers <= 1:
+        _run_worker(predictor, sock)
+        return
+
+    # Workers are forked after the model is loaded: a compiled .forest is memory-mapped and a
+    # pickled pipeline is inherited copy-on-write, so N workers share one copy of the trees.
+    # Freezing the GC keeps collections from writing to (and un-sharing) the inherited objects.
+    gc.freeze()
+    pids = []
+    for _ in range(args.workers):
+        pid = os.fork()
+        if pid == 0:
+            _run_worker(predictor, sock)
+            os._exit(0)
+        pids.append(pid)
+
+    # The parent only supervises: on Ctrl-C or SIGTERM it stops the workers and waits for them.
+    signal.signal(signal.SIGTERM, _interrupt)
+    try:
+        for pid in pids:
+            os.waitpid(pid, 0)
+    except KeyboardInterrupt:
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        signal.signal(signal.SIGTERM, signal.SIG_IGN)
+        for pid in pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        for pid in pids:
+            os.waitpid(pid, 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+
+"""Train/test and CV splits that keep neighbouring observations together.
+
+A random row-level split puts adjacent grid cells of the same day on both sides, so test scores
+mostly measure interpolation. The blocked splits assign whole groups instead:
+- spatial: square lat/lon tiles of `tile_deg` degrees
+- date: blocks of `block_days` consecutive days
+
+Groups are shuffled and dealt to folds so every fold gets a similar number of rows. A split is
+stored as one int8 fold id per row (-1 = holdout test row, 0..K-1 = CV fold of a training row),
+which `save_splits` / `load_splits` persist next to the model.
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import StratifiedKFold, train_test_split
+
+
+SPLIT_METHODS = ("random", "spatial", "date")
+HOLDOUT = -1
+
+
+def split_columns(method: str) -> list[str]:
+    """Extra dataset columns a split method needs."""
+    return {"spatial": ["lat", "lon"], "date": ["time"]}.get(method, [])
+
+
+def split_groups(df: pd.DataFrame, method: str, *, tile_deg: float = 1.0, block_days: int = 7) -> Optional[np.ndarray]:
+    """Group id per row for a blocked split (None for `random`). Rows with missing keys form one group."""
+    if method == "random":
+        return None
+    missing = [c for c in split_columns(method) if c not in df.columns]
+    if missing:
+        raise ValueError(f"--split {method} needs columns {missing}.")
+
+    if method == "spatial":
+        lat = np.floor(df["lat"].to_numpy(dtype=float, na_value=np.nan) / tile_deg)
+        lon = np.floor(df["lon"].to_numpy(dtype=float, na_value=np.nan) / tile_deg)
+        keys = np.where(np.isnan(lat) | np.isnan(lon), np.nan, lat * 100_000 + lon)
+    elif method == "date":
+        days = pd.to_datetime(df["time"], errors="coerce").to_numpy(dtype="datetime64[D]")
+        day_no = days.astype("int64").astype(float)
+        keys = np.where(np.isnat(days), np.nan, np.floor(day_no / block_days))
+    else:
+        raise ValueError(f"Unknown split method {method!r}; expected one of {SPLIT_METHODS}.")
+
+    _, groups = np.unique(np.nan_to_num(keys, nan=np.inf), return_inverse=True)
+    return groups.astype(np.int32)
+
+
+def assign_group_folds(groups: np.ndarray, n_folds: int, seed: int) -> np.ndarray:
+    """Deal shuffled groups to `n_folds` folds, largest first, each to the fold with fewest rows."""
+    counts = np.bincount(groups)
+    rng = np.random.default_rng(seed)
+    order = rng.permutation(len(counts))
+    order = order[np.argsort(-counts[order], kind="stable")]
+
+    if len(counts) < n_folds:
+        raise ValueError(f"Only {len(counts)} groups for {n_folds} folds; use smaller tiles/blocks or fewer folds.")
+
+    group_fold = np.empty(len(counts), dtype=np.int8)
+    fold_rows = np.zeros(n_folds, dtype=np.int64)
+    for g in order:
+        k = int(fold_rows.argmin())
+        group_fold[g] = k
+        fold_rows[k] += counts[g]
+    return group_fold[groups]
+
+
+def holdout_split(
+    y: np.ndarray, groups: Optional[np.ndarray], test_size: float, seed: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """Row positions `(train, test)`.
+
+    Without groups this is the stratified `train_test_split` the scripts always used, so random splits
+    are unchanged; with groups, whole groups go to the test side until it holds ~`test_size` of rows.
+    """
+    positions = np.arange(len(y))
+    if groups is None:
+        stratify = y if len(np.unique(y)) > 1 else None
+        train, test = train_test_split(positions, test_size=test_size, random_state=seed, stratify=stratify)
+        return train, test
+
+    counts = np.bincount(groups)
+    if len(counts) < 2:
+        raise ValueError("Only 1 group for a train/test split; use smaller tiles/blocks.")
+    order = np.random.default_rng(seed).permutation(len(counts))
+    # Shuffled groups go to the test side until the running row count reaches test_size of all rows.
+    n_test = int(np.searchsorted(np.cumsum(counts[order]), test_size * len(y))) + 1
+    is_test = np.zeros(len(counts), dtype=bool)
+    is_test[order[: min(n_test, len(counts) - 1)]] = True
+    test = is_test[groups]
+    return positions[~test], positions[test]
+
+
+def cv_fold_ids(y: np.ndarray, groups: Optional[np.ndarray], n_folds: int, seed: int) -> np.ndarray:
+    """Fold id (0..n_folds-1) per row: stratified k-fold without groups, blocked with groups."""
+    if groups is not None:
+        return assign_group_folds(groups, n_folds, seed)
+    fold = np.empty(len(y), dtype=np.int8)
+    splitter = StratifiedKFold(n_splits=n_folds, shuffle=True, random_state=seed)
+    for k, (_, val) in enumerate(splitter.split(np.zeros(len(y)), y)):
+        fold[val] = k
+    return fold
+
+
+def folds_from_ids(fold_id: np.ndarray) -> list[tuple[np.ndarray, np.ndarray]]:
+    """(train positions, validation positions) per fold, ignoring holdout rows."""
+    n_folds = int(fold_id.max()) + 1 if len(fold_id) else 0
+    usable = fold_id >= 0
+    return [
+        (np.flatnonzero(usable & (fold_id != k)).astype(np.int32), np.flatnonzero(fold_id == k).astype(np.int32))
+        for k in range(n_folds)
+    ]
+
+
+def save_splits(path: Path, fold_id: np.ndarray, meta: dict) -> None:
+    """Persist per-row fold ids (int8) with the settings that produced them."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    np.savez_compressed(path, fold=fold_id.astype(np.int8), meta=np.str_(json.dumps(meta, sort_keys=True)))
+
+
+def load_splits(path: Path) -> tuple[np.ndarray, dict]:
+    with np.load(path) as data:
+        return data["fold"], json.loads(str(data["meta"]))
@@ -0,0 +1,11 @@
+"""Shared pytest setup: the train scripts import each other as top-level modules."""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+
+TRAIN_DIR = Path(__file__).resolve().parent.parent
+if str(TRAIN_DIR) not in sys.path:
+    sys.path.insert(0, str(TRAIN_DIR))
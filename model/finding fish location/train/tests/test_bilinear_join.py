@@ -0,0 +1,47 @@
+"""`merge_datasets._bilinear_values` on a small rectilinear grid with known values."""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from merge_datasets import _bilinear_values
+
+
+def _plane_grid() -> pd.DataFrame:
+    # f(lat, lon) = 2 * lat + 3 * lon + 1 is linear, so bilinear interpolation reproduces it exactly.
+    lat, lon = (a.ravel() for a in np.meshgrid([7.0, 7.25, 7.5], [80.0, 80.5, 81.0, 81.5], indexing="ij"))
+    return pd.DataFrame({"lat": lat, "lon": lon, "v": 2 * lat + 3 * lon + 1, "w": -lat})
+
+
+def test_grid_nodes_return_their_own_values():
+    grid = _plane_grid()
+    values = _bilinear_values(grid, ["v", "w"], grid["lat"].to_numpy(), grid["lon"].to_numpy(), 0.1)
+    np.testing.assert_allclose(values, grid[["v", "w"]].to_numpy())
+
+
+def test_points_inside_cells_are_interpolated():
+    lat = np.array([7.1, 7.3, 7.49, 7.125])
+    lon = np.array([80.2, 81.3, 80.01, 80.75])
+    values = _bilinear_values(_plane_grid(), ["v", "w"], lat, lon, 0.1)
+    np.testing.assert_allclose(values[:, 0], 2 * lat + 3 * lon + 1)
+    np.testing.assert_allclose(values[:, 1], -lat)
+
+
+def test_cell_centre_is_mean_of_corners():
+    grid = pd.DataFrame({"lat": [0.0, 0.0, 1.0, 1.0], "lon": [0.0, 1.0, 0.0, 1.0], "v": [1.0, 2.0, 3.0, 10.0]})
+    values = _bilinear_values(grid, ["v"], np.array([0.5]), np.array([0.5]), 0.1)
+    assert values[0, 0] == 4.0
+
+
+def test_outside_tolerance_and_missing_corners_are_nan():
+    grid = _plane_grid()
+    # Within tolerance of the edge: clamped to the edge value; beyond it: NaN.
+    values = _bilinear_values(grid, ["v"], np.array([7.55, 7.7]), np.array([80.0, 80.0]), 0.1)
+    assert values[0, 0] == 2 * 7.5 + 3 * 80.0 + 1
+    assert np.isnan(values[1, 0])
+
+    holey = grid[~((grid["lat"] == 7.25) & (grid["lon"] == 80.5))]
+    values = _bilinear_values(holey, ["v"], np.array([7.1, 7.4]), np.array([80.2, 81.2]), 0.1)
+    assert np.isnan(values[0, 0])
+    assert np.isfinite(values[1, 0])
@@ -0,0 +1,70 @@
+"""`CompiledForest` must reproduce the sklearn pipeline it was compiled from."""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.impute import SimpleImputer
+from sklearn.pipeline import Pipeline
+
+from compiled_forest import compile_pipeline, is_compiled_forest, load_compiled_forest, save_compiled_forest
+
+COLUMNS = ["lat", "lon", "sst", "chlor_a", "water_u", "water_v"]
+
+
+def _data(n: int, seed: int, nan_share: float = 0.05) -> tuple[pd.DataFrame, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(
+        {
+            "lat": rng.uniform(5, 10.8, n),
+            "lon": rng.uniform(79, 82.6, n),
+            "sst": rng.normal(28, 1, n),
+            "chlor_a": rng.lognormal(-1.5, 0.5, n),
+            "water_u": rng.normal(0, 0.3, n),
+            "water_v": rng.normal(0, 0.3, n),
+        }
+    )
+    y = ((X["sst"].between(27, 29) & (X["chlor_a"] > 0.2)) ^ (rng.random(n) < 0.1)).astype(int).to_numpy()
+    X = X.mask(rng.random(X.shape) < nan_share)
+    return X, y
+
+
+@pytest.fixture(scope="module")
+def pipeline():
+    X, y = _data(3000, 0)
+    model = RandomForestClassifier(n_estimators=25, min_samples_leaf=2, random_state=0, n_jobs=1)
+    return Pipeline([("imputer", SimpleImputer(strategy="median")), ("model", model)]).fit(X, y)
+
+
+def test_predict_proba_matches_pipeline(pipeline):
+    X, _ = _data(2000, 1)
+    forest = compile_pipeline(pipeline, COLUMNS)
+    np.testing.assert_allclose(forest.predict_proba(X), pipeline.predict_proba(X), rtol=0, atol=1e-12)
+    np.testing.assert_array_equal(forest.predict(X), pipeline.predict(X))
+
+
+def test_bare_forest_with_missing_values_matches_sklearn():
+    X, y = _data(3000, 2)
+    model = RandomForestClassifier(n_estimators=15, random_state=0, n_jobs=1).fit(X, y)
+    forest = compile_pipeline(model, COLUMNS)
+    X_new, _ = _data(1000, 3, nan_share=0.2)
+    np.testing.assert_allclose(forest.predict_proba(X_new), model.predict_proba(X_new), rtol=0, atol=1e-12)
+
+
+def test_saved_forest_round_trips_from_str_path(pipeline, tmp_path):
+    path = str(tmp_path / "model.forest")
+    save_compiled_forest(compile_pipeline(pipeline, COLUMNS), path)
+    assert is_compiled_forest(path)
+
+    X, _ = _data(500, 4)
+    loaded = load_compiled_forest(path)
+    np.testing.assert_allclose(loaded.predict_proba(X), pipeline.predict_proba(X), rtol=0, atol=1e-12)
+
+
+def test_path_contributions_sum_to_probability(pipeline):
+    X, _ = _data(300, 5)
+    forest = compile_pipeline(pipeline, COLUMNS)
+    bias, contributions = forest.path_contributions(X, 1)
+    np.testing.assert_allclose(bias + contributions.sum(axis=1), forest.predict_proba(X)[:, 1], atol=1e-9)
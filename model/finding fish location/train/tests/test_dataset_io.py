@@ -0,0 +1,24 @@
+"""Typed reads apply the compact schema without rejecting malformed measurement cells."""
+
+from __future__ import annotations
+
+import numpy as np
+
+from dataset_io import iter_table_chunks, read_table
+
+
+CSV = """time,lat,lon,sst,fish_presence
+2020-01-01,6.0,80.0,28.5,1
+2020-01-01,6.1,80.0,NaN ,0
+2020-01-02,6.2,80.0,--,1
+"""
+
+
+def test_typed_csv_read_coerces_malformed_measurements(tmp_path):
+    path = tmp_path / "final.csv"
+    path.write_text(CSV)
+
+    for df in (read_table(path, typed=True), next(iter_table_chunks(path, 10, typed=True))):
+        assert df["sst"].dtype == np.float32 and df["lat"].dtype == np.float64
+        assert df["fish_presence"].dtype == np.uint8
+        assert df["sst"].iloc[0] == np.float32(28.5) and df["sst"].iloc[1:].isna().all()
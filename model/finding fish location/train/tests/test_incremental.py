@@ -0,0 +1,95 @@
+"""`--incremental` merge and labeling, run over growing inputs, must equal a full rebuild."""
+
+from __future__ import annotations
+
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+TRAIN_DIR = Path(__file__).resolve().parent.parent
+DAYS = ["2020-01-01", "2020-01-02", "2020-01-03", "2020-01-04"]
+
+
+def _source(days: list[str], values: dict[str, float], seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    lat, lon = (a.ravel() for a in np.meshgrid([6.0, 7.0, 8.5], [79.5, 81.9, 82.3], indexing="ij"))
+    frames = []
+    for day in days:
+        noisy = {col: base + rng.normal(0, abs(base) / 2 + 0.05, len(lat)) for col, base in values.items()}
+        frames.append(pd.DataFrame({"time": day, "lat": lat, "lon": lon, **noisy}).round(4))
+    return pd.concat(frames, ignore_index=True)
+
+
+SOURCES = {
+    "sst.csv": ({"sst": 28.0}, 0),
+    "chlorophyll.csv": ({"chlor_a": 0.25}, 1),
+    "currents.csv": ({"water_u": 0.2, "water_v": -0.1}, 2),
+}
+
+
+def _run(script: str, *args: str) -> str:
+    command = [sys.executable, str(TRAIN_DIR / script), *args]
+    return subprocess.run(command, check=True, capture_output=True, text=True).stdout
+
+
+def _merge_and_label(directory: Path, *extra: str) -> None:
+    _run("merge_datasets.py", "--dir", str(directory), "--skip-bathymetry", "--output", "merged.csv", *extra)
+    merged, final = str(directory / "merged.csv"), str(directory / "final.csv")
+    _run("create_final_dataset.py", "--input", merged, "--output", final, "--skip-bathymetry", *extra)
+
+
+def _write_sources(directory: Path, days_for: dict[str, list[str]], suffix: str = ".csv") -> None:
+    directory.mkdir(exist_ok=True)
+    for name, (values, seed) in SOURCES.items():
+        full = _source(DAYS, values, seed)
+        part = full[full["time"].isin(days_for.get(name, DAYS))].reset_index(drop=True)
+        path = directory / Path(name).with_suffix(suffix)
+        part.to_parquet(path, index=False) if suffix == ".parquet" else part.to_csv(path, index=False)
+
+
+def _read_sorted(path: Path) -> pd.DataFrame:
+    return pd.read_csv(path).sort_values(["time", "lat", "lon"]).reset_index(drop=True)
+
+
+def test_incremental_runs_match_full_rebuild(tmp_path):
+    inc = tmp_path / "incremental"
+    # Day 1: currents for day 2 arrive late, so day 2 must wait in staging until the next run.
+    _write_sources(inc, {"sst.csv": DAYS[:2], "chlorophyll.csv": DAYS[:2], "currents.csv": DAYS[:1]})
+    for _ in range(2):  # a repeated run with no new input must not append anything
+        _merge_and_label(inc, "--incremental")
+    assert set(pd.read_csv(inc / "merged.csv")["time"]) == {DAYS[0]}
+
+    # Grown CSVs: the remaining days are appended to every input.
+    _write_sources(inc, {})
+    _merge_and_label(inc, "--incremental")
+
+    full = tmp_path / "full"
+    _write_sources(full, {})
+    _merge_and_label(full)
+
+    pd.testing.assert_frame_equal(_read_sorted(inc / "merged.csv"), _read_sorted(full / "merged.csv"))
+    final = _read_sorted(full / "final.csv")
+    assert set(final["time"]) == set(DAYS) and final["fish_presence"].any()
+    pd.testing.assert_frame_equal(_read_sorted(inc / "final.csv"), final)
+
+
+def test_incremental_full_reread_does_not_duplicate_staged_rows(tmp_path):
+    # A single Parquet file is re-read whole on every run; staged dates must not pile up copies.
+    inc = tmp_path / "incremental"
+    names = [arg for name in SOURCES for arg in (f"--{Path(name).stem}", Path(name).stem + ".parquet")]
+    _write_sources(inc, {"sst.csv": DAYS[:2], "chlorophyll.csv": DAYS[:2], "currents.csv": DAYS[:1]}, ".parquet")
+    merge = ("merge_datasets.py", "--dir", str(inc), "--skip-bathymetry", "--output", "merged.csv", "--incremental")
+    for _ in range(3):  # no "skipped new rows" warning either: re-read rows for merged dates are not new
+        assert "WARNING" not in _run(*merge, *names)
+
+    _write_sources(inc, {}, ".parquet")
+    _run(*merge, *names)
+
+    full = tmp_path / "full"
+    _write_sources(full, {})
+    _run("merge_datasets.py", "--dir", str(full), "--skip-bathymetry", "--output", "merged.csv")
+    pd.testing.assert_frame_equal(_read_sorted(inc / "merged.csv"), _read_sorted(full / "merged.csv"))
@@ -0,0 +1,52 @@
+"""The cached bbox raster must agree with `global_land_mask.globe.is_land` everywhere in the bbox."""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+import land_mask
+from land_mask import SRI_LANKA_BBOX, build_land_raster, is_sri_lanka_land, save_land_raster, sri_lanka_land_mask
+
+globe = pytest.importorskip("global_land_mask.globe")
+
+
+def _grid(step: float) -> tuple[np.ndarray, np.ndarray]:
+    bbox = SRI_LANKA_BBOX
+    lat = np.round(np.arange(bbox.lat_min, bbox.lat_max + 1e-9, step), 4)
+    lon = np.round(np.arange(bbox.lon_min, bbox.lon_max + 1e-9, step), 4)
+    return tuple(a.ravel() for a in np.meshgrid(lat, lon, indexing="ij"))
+
+
+@pytest.fixture(scope="module")
+def raster(tmp_path_factory):
+    # Round-trip through the on-disk cache, as the scripts load it.
+    path = tmp_path_factory.mktemp("raster") / "land.npz"
+    save_land_raster(build_land_raster(), path)
+    return land_mask.load_land_raster(path)
+
+
+@pytest.mark.parametrize("step", [0.1, 0.05, 0.01])
+def test_raster_matches_globe_on_grid_points(raster, step):
+    lat, lon = _grid(step)
+    np.testing.assert_array_equal(raster.classify(lat, lon), globe.is_land(lat, lon))
+
+
+def test_raster_matches_globe_on_random_points(raster):
+    rng = np.random.default_rng(0)
+    bbox = SRI_LANKA_BBOX
+    lat = rng.uniform(bbox.lat_min, bbox.lat_max, 200_000)
+    lon = rng.uniform(bbox.lon_min, bbox.lon_max, 200_000)
+    np.testing.assert_array_equal(raster.classify(lat, lon), globe.is_land(lat, lon))
+
+
+def test_scalar_and_vector_lookups_agree():
+    lat, lon = _grid(0.1)
+    scalar = np.array([is_sri_lanka_land(a, b) for a, b in zip(lat, lon)])
+    np.testing.assert_array_equal(scalar, sri_lanka_land_mask(lat, lon))
+    np.testing.assert_array_equal(scalar, globe.is_land(lat, lon))
+
+
+def test_outside_bbox_and_nan_are_sea():
+    assert not sri_lanka_land_mask([np.nan, 7.0, 20.0], [80.5, np.nan, 80.5]).any()
+    assert not is_sri_lanka_land(20.0, 80.5)
@@ -0,0 +1,21 @@
+"""Blocked holdout splits keep groups whole and hold out about `test_size` of the rows."""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from splits import holdout_split
+
+
+@pytest.mark.parametrize("test_size", [0.2, 0.3, 0.4])
+def test_grouped_holdout_matches_test_size(test_size):
+    rng = np.random.default_rng(0)
+    groups = rng.integers(0, 200, 20_000)
+    y = rng.integers(0, 2, len(groups))
+
+    train, test = holdout_split(y, groups, test_size, seed=7)
+
+    assert len(train) + len(test) == len(y) and not set(groups[train]) & set(groups[test])
+    largest_group = np.bincount(groups).max()
+    assert abs(len(test) - test_size * len(y)) <= largest_group
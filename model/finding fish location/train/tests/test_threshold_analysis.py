@@ -0,0 +1,51 @@
+"""The sort-once threshold engine against sklearn's per-threshold metrics."""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+from sklearn.metrics import accuracy_score, confusion_matrix, f1_score, precision_score, recall_score
+
+from threshold_analysis import candidate_thresholds, optimal_thresholds, threshold_curve
+
+
+def _scores(n: int, seed: int) -> tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    y = (rng.random(n) < 0.3).astype(int)
+    # Rounded so many rows tie on a threshold, as forest probabilities do.
+    scores = np.clip(rng.normal(0.35 + 0.3 * y, 0.2), 0, 1).round(2)
+    return y, scores
+
+
+@pytest.mark.parametrize("seed", [0, 1])
+def test_curve_matches_sklearn_at_every_threshold(seed):
+    y, scores = _scores(2000, seed)
+    thresholds = np.concatenate([np.linspace(0.0, 1.0, 101), [-0.5, 1.5], scores[:20]])
+    curve = threshold_curve(y, scores, thresholds)
+
+    for k, t in enumerate(thresholds):
+        pred = (scores >= t).astype(int)
+        tn, fp, fn, tp = confusion_matrix(y, pred, labels=[0, 1]).ravel()
+        assert (curve.tp[k], curve.fp[k], curve.fn[k], curve.tn[k]) == (tp, fp, fn, tn)
+        assert curve.accuracy[k] == pytest.approx(accuracy_score(y, pred), abs=1e-15)
+        assert curve.precision[k] == pytest.approx(precision_score(y, pred, zero_division=0), abs=1e-15)
+        assert curve.recall[k] == pytest.approx(recall_score(y, pred, zero_division=0), abs=1e-15)
+        assert curve.f1[k] == pytest.approx(f1_score(y, pred, zero_division=0), abs=1e-15)
+
+
+def test_optimal_thresholds_match_brute_force():
+    y, scores = _scores(1500, 2)
+    best = optimal_thresholds(y, scores, cost_fp=1.0, cost_fn=4.0)
+
+    candidates = candidate_thresholds(scores)
+    f1 = [f1_score(y, (scores >= t).astype(int), zero_division=0) for t in candidates]
+    cost = [(((scores >= t) & (y == 0)).sum() + 4.0 * ((scores < t) & (y == 1)).sum()) / len(y) for t in candidates]
+    assert best["f1_threshold"] == candidates[int(np.argmax(f1))]
+    assert best["f1"] == pytest.approx(max(f1), abs=1e-15)
+    assert best["cost_threshold"] == candidates[int(np.argmin(cost))]
+    assert best["expected_cost"] == pytest.approx(min(cost), abs=1e-15)
+
+
+def test_mismatched_shapes_are_rejected():
+    with pytest.raises(ValueError):
+        threshold_curve([0, 1, 1], [0.2, 0.8], [0.5])
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+
+"""Confusion counts and metrics for many decision thresholds from a single sort.
+
+Scores are sorted once; with cumulative positive counts over that order, the rows predicted positive
+at threshold `t` (score >= t) are a suffix found by binary search, so TP/FP/FN/TN for any number of
+thresholds cost one `searchsorted`. Metrics use sklearn's `zero_division=0` conventions, so they
+match `precision_score(y, score >= t)` and friends exactly.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class ThresholdCurve:
+    """Confusion counts per threshold (a row is predicted positive when its score >= threshold)."""
+
+    thresholds: np.ndarray
+    tp: np.ndarray
+    fp: np.ndarray
+    fn: np.ndarray
+    tn: np.ndarray
+
+    @property
+    def n(self) -> int:
+        return int(self.tp[0] + self.fp[0] + self.fn[0] + self.tn[0]) if len(self.tp) else 0
+
+    @property
+    def accuracy(self) -> np.ndarray:
+        return _ratio(self.tp + self.tn, np.full(len(self.tp), self.n))
+
+    @property
+    def precision(self) -> np.ndarray:
+        return _ratio(self.tp, self.tp + self.fp)
+
+    @property
+    def recall(self) -> np.ndarray:
+        return _ratio(self.tp, self.tp + self.fn)
+
+    @property
+    def f1(self) -> np.ndarray:
+        return _ratio(2 * self.tp, 2 * self.tp + self.fp + self.fn)
+
+    def expected_cost(self, cost_fp: float = 1.0, cost_fn: float = 1.0) -> np.ndarray:
+        """Mean misclassification cost per row."""
+        return _ratio(cost_fp * self.fp + cost_fn * self.fn, np.full(len(self.tp), self.n))
+
+
+def _ratio(num: np.ndarray, den: np.ndarray) -> np.ndarray:
+    num = np.asarray(num, dtype=np.float64)
+    den = np.asarray(den, dtype=np.float64)
+    return np.divide(num, den, out=np.zeros_like(num), where=den > 0)
+
+
+def threshold_curve(y_true, scores, thresholds) -> ThresholdCurve:
+    """Confusion counts of binary labels `y_true` (positive = 1) at each of `thresholds`."""
+    y = np.asarray(y_true) == 1
+    s = np.asarray(scores, dtype=np.float64)
+    if y.shape != s.shape:
+        raise ValueError(f"Labels and scores differ in shape: {y.shape} vs {s.shape}.")
+
+    order = np.argsort(s, kind="stable")
+    s_sorted = s[order]
+    # positives_below[i] = positives among the i lowest scores
+    positives_below = np.concatenate(([0], np.cumsum(y[order], dtype=np.int64)))
+
+    thresholds = np.asarray(thresholds, dtype=np.float64)
+    below = np.searchsorted(s_sorted, thresholds, side="left")
+    n_pos = int(positives_below[-1])
+    tp = n_pos - positives_below[below]
+    fp = (len(s) - below) - tp
+    return ThresholdCurve(thresholds=thresholds, tp=tp, fp=fp, fn=n_pos - tp, tn=below - positives_below[below])
+
+
+def candidate_thresholds(scores) -> np.ndarray:
+    """Every threshold that gives a distinct prediction: the distinct scores plus one above the maximum."""
+    s = np.unique(np.asarray(scores, dtype=np.float64))
+    top = np.nextafter(s[-1], np.inf) if len(s) else 1.0
+    return np.append(s, top)
+
+
+def optimal_thresholds(y_true, scores, *, cost_fp: float = 1.0, cost_fn: float = 1.0) -> dict[str, float]:
+    """Best threshold by F1 and by expected cost over all distinct thresholds (ties: lowest threshold)."""
+    curve = threshold_curve(y_true, scores, candidate_thresholds(scores))
+    f1 = curve.f1
+    cost = curve.expected_cost(cost_fp, cost_fn)
+    best_f1 = int(np.argmax(f1))
+    best_cost = int(np.argmin(cost))
+    return {
+        "f1_threshold": float(curve.thresholds[best_f1]),
+        "f1": float(f1[best_f1]),
+        "f1_precision": float(curve.precision[best_f1]),
+        "f1_recall": float(curve.recall[best_f1]),
+        "cost_threshold": float(curve.thresholds[best_cost]),
+        "expected_cost": float(cost[best_cost]),
+        "cost_fp": float(cost_fp),
+        "cost_fn": float(cost_fn),
+    }
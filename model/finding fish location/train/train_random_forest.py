@@ -1,17 +1,33 @@
 #!/usr/bin/env python3
 
 import argparse
+import uuid
 from pathlib import Path
 
 import joblib
-import pandas as pd
+import numpy as np
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.impute import SimpleImputer
 from sklearn.metrics import accuracy_score, classification_report
-from sklearn.model_selection import train_test_split
 from sklearn.pipeline import Pipeline
 
+from compiled_forest import compile_pipeline, save_compiled_forest
+from dataset_io import read_table, table_columns
+from drift import build_reference, drift_path_for, save_reference
+from holdout import HoldoutPredictions, holdout_path_for, save_holdout
+from instrumentation import add_profile_arguments, stage, start_profiling
 from land_mask import keep_sea_rows_in_sri_lanka_bbox
+from rf_search import SCORING, SEARCH_METHODS, load_search_space, run_search
+from splits import (
+    HOLDOUT,
+    SPLIT_METHODS,
+    cv_fold_ids,
+    folds_from_ids,
+    holdout_split,
+    save_splits,
+    split_columns,
+    split_groups,
+)
 
 
 DEFAULT_FEATURE_COLUMNS = [
@@ -37,7 +53,7 @@ def parse_args() -> argparse.Namespace:
         "--data",
         type=Path,
         default=Path(__file__).with_name("final_dataset_no_bathymetry.csv"),
-        help="Path to the CSV dataset.",
+        help="Path to the dataset: CSV, Parquet (file or date-partitioned directory) or Feather.",
     )
     parser.add_argument(
         "--output",
@@ -46,14 +62,51 @@ def parse_args() -> argparse.Namespace:
         help="Where to save the trained model artifact (joblib-serialized .pkl).",
     )
 
+    parser.add_argument(
+        "--compiled-output",
+        type=Path,
+        default=None,
+        help=(
+            "Where to export the compiled flat-array forest used by the NumPy runtime "
+            "(default: the --output path with a .forest suffix)."
+        ),
+    )
+    parser.add_argument(
+        "--skip-compiled",
+        action="store_true",
+        help="If set, only save the joblib artifact and skip the compiled forest export.",
+    )
+
     parser.add_argument("--test-size", type=float, default=0.2)
     parser.add_argument("--random-state", type=int, default=42)
+    parser.add_argument(
+        "--split",
+        choices=SPLIT_METHODS,
+        default="random",
+        help=(
+            "How test (and --search CV) rows are chosen: random rows, whole lat/lon tiles (spatial) or "
+            "whole blocks of days (date). Blocked splits keep neighbouring cells out of the test set."
+        ),
+    )
+    parser.add_argument("--tile-deg", type=float, default=1.0, help="Tile size in degrees for --split spatial.")
+    parser.add_argument("--block-days", type=int, default=7, help="Days per block for --split date.")
+    parser.add_argument(
+        "--splits-output",
+        type=Path,
+        default=None,
+        help="Per-row fold ids (.npz; default: <output stem>_splits.npz next to --output).",
+    )
 
     parser.add_argument("--n-estimators", type=int, default=300)
     parser.add_argument("--max-depth", type=int, default=None)
     parser.add_argument("--min-samples-split", type=int, default=2)
     parser.add_argument("--min-samples-leaf", type=int, default=1)
     parser.add_argument("--class-weight", type=str, default="balanced")
+    parser.add_argument(
+        "--no-oob",
+        action="store_true",
+        help="Skip out-of-bag scoring (saves the OOB pass over the training rows).",
+    )
 
     parser.add_argument(
         "--features",
@@ -74,20 +127,63 @@ def parse_args() -> argparse.Namespace:
         help="If set, do NOT filter out Sri Lankan land points (default filters them out).",
     )
 
+    search = parser.add_argument_group("hyperparameter search")
+    search.add_argument(
+        "--search",
+        choices=SEARCH_METHODS,
+        default=None,
+        help=(
+            "Search hyperparameters with k-fold CV on the training split before the final fit: "
+            "random (every candidate on full folds) or halving (successive halving over training rows). "
+            "The best candidate replaces the --n-estimators/--max-depth/... values."
+        ),
+    )
+    search.add_argument("--search-candidates", type=int, default=20, help="Candidates sampled (default: 20).")
+    search.add_argument(
+        "--search-space",
+        type=Path,
+        default=None,
+        help='JSON {"param": [values, ...]} overriding the default RandomForestClassifier choices.',
+    )
+    search.add_argument("--cv-folds", type=int, default=5, help="CV folds for --search (default: 5).")
+    search.add_argument("--search-scoring", choices=SCORING, default="roc_auc", help="CV metric (default: roc_auc).")
+    search.add_argument(
+        "--search-jobs",
+        type=int,
+        default=None,
+        help="Cores shared by the (candidate, fold) process pool and the forests (default: all).",
+    )
+    search.add_argument(
+        "--leaderboard",
+        type=Path,
+        default=None,
+        help="Leaderboard CSV (default: <output stem>_search_leaderboard.csv next to --output).",
+    )
+    add_profile_arguments(parser)
+
     return parser.parse_args()
 
 
 def main() -> None:
     args = parse_args()
+    start_profiling("train_random_forest", args)
 
     if not args.data.exists():
         raise FileNotFoundError(f"Dataset not found: {args.data}")
 
-    df = pd.read_csv(args.data)
+    # Column projection: only features, target and (for the land filter) lat/lon are read.
+    wanted = [*args.features, args.target, *split_columns(args.split)]
+    if not args.allow_land:
+        wanted += ["lat", "lon"]
+    available = set(table_columns(args.data))
+    with stage("load") as timed:
+        df = read_table(args.data, columns=[c for c in dict.fromkeys(wanted) if c in available], typed=True)
+        timed.rows = len(df)
 
     if (not args.allow_land) and ("lat" in df.columns) and ("lon" in df.columns):
         before = len(df)
-        df = keep_sea_rows_in_sri_lanka_bbox(df, lat_col="lat", lon_col="lon")
+        with stage("land_mask", rows=before):
+            df = keep_sea_rows_in_sri_lanka_bbox(df, lat_col="lat", lon_col="lon")
         removed = before - len(df)
         if removed:
             print(f"Removed {removed:,} Sri Lankan land rows (kept sea only).")
@@ -105,25 +201,54 @@ def main() -> None:
 
     # Ensure binary/int labels (common in classification metrics)
     if y.dtype == "bool":
-        y = y.astype(int)
+        y = y.astype(np.uint8)
 
-    X_train, X_test, y_train, y_test = train_test_split(
-        X,
-        y,
-        test_size=args.test_size,
-        random_state=args.random_state,
-        stratify=y if y.nunique() > 1 else None,
-    )
+    with stage("split", rows=len(y)):
+        groups = split_groups(df, args.split, tile_deg=args.tile_deg, block_days=args.block_days)
+        train_pos, test_pos = holdout_split(y.to_numpy(), groups, args.test_size, args.random_state)
+    X_train, X_test = X.iloc[train_pos], X.iloc[test_pos]
+    y_train, y_test = y.iloc[train_pos], y.iloc[test_pos]
+    if args.split != "random":
+        print(f"{args.split} split: {len(train_pos):,} train / {len(test_pos):,} test rows")
 
-    model = RandomForestClassifier(
-        n_estimators=args.n_estimators,
-        random_state=args.random_state,
-        max_depth=args.max_depth,
-        min_samples_split=args.min_samples_split,
-        min_samples_leaf=args.min_samples_leaf,
-        n_jobs=-1,
-        class_weight=None if args.class_weight.lower() == "none" else args.class_weight,
-    )
+    # One int8 per row: HOLDOUT for test rows, otherwise the row's CV fold (0 without --search).
+    fold_id = np.full(len(y), HOLDOUT, dtype=np.int8)
+    fold_id[train_pos] = 0
+
+    params = {
+        "n_estimators": args.n_estimators,
+        "max_depth": args.max_depth,
+        "min_samples_split": args.min_samples_split,
+        "min_samples_leaf": args.min_samples_leaf,
+        "class_weight": None if args.class_weight.lower() == "none" else args.class_weight,
+    }
+    if args.search:
+        train_groups = None if groups is None else groups[train_pos]
+        fold_id[train_pos] = cv_fold_ids(y_train.to_numpy(), train_groups, args.cv_folds, args.random_state)
+        with stage("search", rows=len(y_train)):
+            board, candidates = run_search(
+                X_train.to_numpy(dtype=np.float64),
+                y_train.to_numpy(),
+                method=args.search,
+                space=load_search_space(args.search_space) if args.search_space else None,
+                n_candidates=args.search_candidates,
+                folds=folds_from_ids(fold_id[train_pos]),
+                scoring=args.search_scoring,
+                n_jobs=args.search_jobs,
+                seed=args.random_state,
+            )
+        leaderboard_path = args.leaderboard or args.output.with_name(f"{args.output.stem}_search_leaderboard.csv")
+        leaderboard_path.parent.mkdir(parents=True, exist_ok=True)
+        board.to_csv(leaderboard_path, index=False)
+
+        shown = ["rank", "round", "n_samples", "mean_score", "std_score", "mean_fit_seconds", "model_mb"]
+        print(f"Search leaderboard ({args.search}, {args.cv_folds}-fold {args.search_scoring}):")
+        print(board[shown + [c for c in board.columns if c.startswith("param_")]].head(10).to_string(index=False))
+        print(f"Saved leaderboard to: {leaderboard_path}\n")
+        params.update(candidates[int(board.iloc[0]["candidate"])])
+
+    oob = not args.no_oob and params.get("bootstrap", True)
+    model = RandomForestClassifier(**{"oob_score": oob, **params}, random_state=args.random_state, n_jobs=-1)
 
     pipeline = Pipeline(
         steps=[
@@ -132,25 +257,79 @@ def main() -> None:
         ]
     )
 
-    pipeline.fit(X_train, y_train)
+    with stage("fit", rows=len(y_train)):
+        pipeline.fit(X_train, y_train)
 
-    y_pred = pipeline.predict(X_test)
+    with stage("predict", rows=len(y_test)):
+        proba = pipeline.predict_proba(X_test)
+    y_pred = model.classes_[np.argmax(proba, axis=1)]
 
     acc = accuracy_score(y_test, y_pred)
     print(f"Accuracy: {acc:.4f}")
+    if oob:
+        print(f"OOB accuracy: {model.oob_score_:.4f}")
     print("\nClassification report:")
     print(classification_report(y_test, y_pred, digits=4, zero_division=0))
 
+    oob_proba = None
+    if oob:
+        oob_proba = model.oob_decision_function_
+        # Kept in the holdout file instead: the pickle would otherwise grow with the training set.
+        del model.oob_decision_function_
+
+    run_id = uuid.uuid4().hex
     artifact = {
         "pipeline": pipeline,
         "feature_columns": list(args.features),
         "target_column": args.target,
+        "run_id": run_id,
     }
 
     args.output.parent.mkdir(parents=True, exist_ok=True)
-    joblib.dump(artifact, args.output)
+    with stage("save"):
+        joblib.dump(artifact, args.output)
     print(f"\nSaved model artifact to: {args.output}")
 
+    splits_path = args.splits_output or args.output.with_name(f"{args.output.stem}_splits.npz")
+    split_meta = {
+        "split": args.split,
+        "tile_deg": args.tile_deg,
+        "block_days": args.block_days,
+        "test_size": args.test_size,
+        "random_state": args.random_state,
+        "cv_folds": args.cv_folds if args.search else 0,
+        "allow_land": args.allow_land,
+        "data": str(args.data.resolve()),
+        "n_rows": int(len(fold_id)),
+    }
+    save_splits(splits_path, fold_id, split_meta)
+    print(f"Saved split fold ids to: {splits_path}")
+
+    holdout_path = holdout_path_for(args.output)
+    holdout = HoldoutPredictions(
+        run_id=run_id,
+        classes=model.classes_,
+        test_index=test_pos,
+        y_test=y_test.to_numpy(),
+        proba=proba,
+        oob_y=y_train.to_numpy() if oob else None,
+        oob_proba=oob_proba,
+        meta={**split_meta, "oob_accuracy": float(model.oob_score_) if oob else None},
+    )
+    save_holdout(holdout_path, holdout)
+    print(f"Saved held-out predictions to: {holdout_path}")
+
+    drift_path = drift_path_for(args.output)
+    with stage("drift_reference", rows=len(X_train)):
+        save_reference(drift_path, build_reference(X_train, list(args.features)))
+    print(f"Saved drift reference to: {drift_path}")
+
+    if not args.skip_compiled:
+        compiled_path = args.compiled_output or args.output.with_suffix(".forest")
+        with stage("compile"):
+            save_compiled_forest(compile_pipeline(pipeline, list(args.features)), compiled_path)
+        print(f"Saved compiled forest to: {compiled_path}")
+
 
 if __name__ == "__main__":
     main()